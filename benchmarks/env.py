@@ -0,0 +1,48 @@
+import argparse
+import multiprocessing
+import random
+import time
+from typing import List
+
+from src.env import ACTION_COUNT, DungeonEnv, SubprocessVectorEnv, VectorEnv
+from src.simulator import PLAYER_CLASSES
+
+def random_actions(masks, count: int, rng: random.Random) -> List[int]: # a random legal action for every game
+    actions = []
+    for row in range(count):
+        start = row * ACTION_COUNT
+        actions.append(rng.choice([i for i in range(ACTION_COUNT) if masks[start + i]]))
+    return actions
+
+def single(player_class, steps: int, seed: int) -> float:
+    env = DungeonEnv(player_class, seed)
+    rng = random.Random(seed)
+    observation, info = env.reset()
+    start = time.perf_counter()
+    for i in range(steps):
+        observation, reward, terminated, truncated, info = env.step(random_actions(info["action_mask"], 1, rng)[0])
+        if terminated or truncated:
+            observation, info = env.reset()
+    return steps / (time.perf_counter() - start)
+
+def vector(env, steps: int, seed: int) -> float:
+    rng = random.Random(seed)
+    observations, masks = env.reset()
+    start = time.perf_counter()
+    for i in range(steps):
+        observations, rewards, terminated, truncated, masks = env.step(random_actions(masks, len(env), rng))
+    return steps * len(env) / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Environment steps per second, alone, vectorised, and over worker processes.")
+    parser.add_argument("--envs", type=int, default=1024, help="games per vector")
+    parser.add_argument("--steps", type=int, default=20, help="vector steps to time")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    player_class = PLAYER_CLASSES["Warrior"]
+    print(f"single env:                      {single(player_class, args.envs * args.steps // 4, args.seed):9.0f} steps/s")
+    print(f"vector of {args.envs}:                {vector(VectorEnv(args.envs, player_class, args.seed), args.steps, args.seed):9.0f} steps/s")
+    env = SubprocessVectorEnv(args.envs, player_class, args.seed, workers=args.workers)
+    print(f"vector of {args.envs} on {args.workers} workers:    {vector(env, args.steps, args.seed):9.0f} steps/s")
+    env.close()
@@ -0,0 +1,87 @@
+import argparse
+import random
+import time
+from typing import List, Optional
+
+from src.abstract_classes import Action, Creature, Player, Policy, Tracker
+from src.enemies import Goblin
+from src.game import next_turn, play_round
+from src.player_classes import Mage
+
+class ImmortalMage(Mage): # so that the horde can be fought to the end
+    def take_damage(self, damage, attacker: Optional[Creature] = None) -> None:
+        pass
+
+class FireBallPolicy(Policy): # hits the whole horde every turn, and never runs out of mana
+    def choose_action(self, player: Player) -> Action:
+        player.mp_current = player.mp_max
+        return next(action for action in player.actions if action.is_multi_target)
+
+    def choose_target(self, player: Player, action: Action, targets: List[Creature]) -> Creature:
+        return targets[0]
+
+    def choose_level_up(self, player: Player) -> str:
+        return "intelligence"
+
+def battle(size: int, seed: int, initiative: bool) -> None:
+    tracker = Tracker(seed, verbose=False)
+    player = ImmortalMage("Mage", tracker)
+    player.policy = FireBallPolicy()
+    if initiative:
+        tracker.use_initiative()
+    for i in range(size):
+        tracker.add_active_creature(Goblin(tracker))
+    turns = 0
+    acted = 0
+    start = time.perf_counter()
+    # play until the first horde is gone; next_turn would spawn a new encounter after that
+    while tracker.active_creatures:
+        acted += 1 + len(tracker.active_creatures)
+        play_round(tracker)
+        if tracker.active_creatures:
+            next_turn(tracker)
+        turns += 1
+    elapsed = time.perf_counter() - start
+    print(f"{size:6} goblins: cleared in {turns} turns, {elapsed:6.2f}s, {elapsed / acted * 1e6:5.2f} us per creature action")
+
+def scheduling(size: int, acts: int, churn: float, seed: int) -> None:
+    # the timeline alone: acts that do nothing, by goblins of mixed speed, with a share of them
+    # dying each turn and as many new ones joining
+    tracker = Tracker(seed, verbose=False)
+    ImmortalMage("Mage", tracker)
+    rng = random.Random(seed)
+    goblins = [Goblin(tracker) for i in range(size + int(size * churn) * (acts // size + 1))]
+    for goblin in goblins:
+        goblin.dexterity = rng.randint(6, 24)
+    spares = goblins[size:]
+    for goblin in goblins[:size]:
+        tracker.add_active_creature(goblin)
+    tracker.use_initiative()
+    timeline = tracker.initiative
+    acted = 0
+    start = time.perf_counter()
+    while acted < acts:
+        for creature in timeline.due(tracker.turn + 1):
+            acted += 1
+        for i in range(int(size * churn)):
+            tracker.remove_active_creature(tracker.active_creatures[rng.randrange(size)])
+            tracker.add_active_creature(spares.pop())
+        tracker.turn += 1
+    elapsed = time.perf_counter() - start
+    print(f"{size:6} goblins: {acted} acts over {tracker.turn} turns, {elapsed / acted * 1e6:5.2f} us per act scheduled, "
+          f"{len(timeline)} entries for {len(tracker.creatures)} creatures")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time horde battles of growing size; the cost per creature should stay flat.")
+    parser.add_argument("sizes", type=int, nargs="*", default=[100, 1000, 10000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--initiative", action="store_true", help="order the acts by speed on the initiative timeline")
+    parser.add_argument("--scheduling", action="store_true", help="time the initiative timeline alone instead of whole battles")
+    parser.add_argument("--acts", type=int, default=200000, help="acts to schedule per size, with --scheduling")
+    parser.add_argument("--churn", type=float, default=0.01, help="share of the horde replaced each turn, with --scheduling")
+    args = parser.parse_args()
+    for size in args.sizes:
+        if args.scheduling:
+            scheduling(size, args.acts, args.churn, args.seed)
+        else:
+            battle(size, args.seed, args.initiative)
@@ -0,0 +1,49 @@
+import argparse
+import copy
+import gc
+import time
+import tracemalloc
+
+from src.abstract_classes import NPC, Tracker
+from src.game import ENEMY_CLASSES
+from src.player_classes import Warrior
+
+def unshare(creature: NPC) -> None:
+    # what every creature carried before actions were shared: its own instance of each action, bound to
+    # it, and its own weight table (and, from its first turn, its own sampler, which is not counted here)
+    actions = {}
+    for action, weight in creature.actions.items():
+        action = copy.copy(action)
+        action.user = creature
+        actions[action] = weight
+    creature.actions = actions
+
+def footprint(creature_class, count: int, shared: bool = True):
+    # (bytes, gc-tracked objects, microseconds) per creature, over a batch of them kept alive together
+    tracker = Tracker(0, verbose=False)
+    Warrior("Warrior", tracker)
+    gc.collect()
+    objects = len(gc.get_objects())
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    creatures = [creature_class(tracker) for i in range(count)]
+    if not shared:
+        for creature in creatures:
+            unshare(creature)
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    tracked = len(gc.get_objects()) - objects - 1 # less the list holding them
+    del creatures
+    return size / count, tracked / count, elapsed / count * 1e6
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory, gc-tracked objects and construction time per enemy, "
+                                                 "with per-creature action tables (before) and shared ones (after).")
+    parser.add_argument("--count", type=int, default=10000)
+    args = parser.parse_args()
+    for name, creature_class in ENEMY_CLASSES.items():
+        for label, shared in (("before", False), ("after", True)):
+            size, tracked, micros = footprint(creature_class, args.count, shared)
+            print(f"{name:10} {label:6} {size:8.0f} bytes  {tracked:5.1f} gc objects  {micros:6.2f} us per creature (traced)")
@@ -0,0 +1,62 @@
+import argparse
+import io
+import time
+from typing import Callable, Tuple
+
+from src.abstract_classes import GameOver, Tracker
+from src.events import EventBus, Sink, TextSink
+from src.game import new_encounter, play_turn
+from src.policies import RandomPolicy
+from src.renderer import TerminalRenderer
+from src.simulator import PLAYER_CLASSES
+
+class CountingDevice(io.RawIOBase): # stands in for a terminal: counts the writes that reach it and drops the bytes
+    writes: int
+
+    def __init__(self):
+        self.writes = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.writes += 1
+        return len(data)
+
+def play(make_sink: Callable[[io.TextIOBase], Sink], games: int, seed: int) -> Tuple[float, int, int]:
+    device = CountingDevice()
+    # line buffered, as stdout is on a terminal, so every newline would otherwise be a write of its own
+    stream = io.TextIOWrapper(io.BufferedWriter(device), line_buffering=True)
+    turns = 0
+    start = time.perf_counter()
+    for game in range(games):
+        sink = make_sink(stream)
+        tracker = Tracker(seed + game, events=EventBus(sink))
+        player = PLAYER_CLASSES["Warrior"]("Warrior", tracker)
+        player.policy = RandomPolicy(seed + game)
+        try:
+            new_encounter(tracker)
+            while True:
+                play_turn(tracker)
+        except GameOver:
+            pass
+        sink.close()
+        turns += tracker.turn
+    elapsed = time.perf_counter() - start
+    return elapsed, turns, device.writes
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare line-at-a-time narration with the buffered renderer.")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    sinks = {
+        "text sink": TextSink,
+        "renderer": TerminalRenderer,
+        "every 10th turn": lambda stream: TerminalRenderer(stream, every=10),
+        "summaries": lambda stream: TerminalRenderer(stream, summaries=True),
+        "panel": lambda stream: TerminalRenderer(stream, panel=True),
+    }
+    for name, make_sink in sinks.items():
+        elapsed, turns, writes = play(make_sink, args.games, args.seed)
+        print(f"{name:16} {elapsed / turns * 1e6:7.1f} us per turn  {writes / turns:6.2f} writes per turn")
@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import random
+import re
+import statistics
+import time
+import tracemalloc
+from typing import List
+
+from src.server import PROMPT, serve
+
+MENU_OPTION = re.compile(rb"^\d+: ")
+
+async def read_prompt(reader: asyncio.StreamReader) -> bytes:
+    try:
+        return await reader.readuntil(PROMPT.encode())
+    except asyncio.IncompleteReadError as error:
+        return error.partial
+
+def count_options(text: bytes) -> int: # the menu is the run of numbered lines just above the prompt
+    options = 0
+    for line in reversed(text.splitlines()[:-1]):
+        if not MENU_OPTION.match(line):
+            break
+        options += 1
+    return max(options, 1)
+
+async def client(port: int, rng: random.Random, turns: int, latencies: List[float], ready: List[int], idle: asyncio.Event) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    await read_prompt(reader)
+    writer.write(f"{rng.randint(1, 4)}\n".encode())
+    await read_prompt(reader)
+    writer.write(b"Bench\n")
+    text = await read_prompt(reader)
+    ready.append(1)
+    await idle.wait()
+    for turn in range(turns):
+        options = count_options(text)
+        start = time.perf_counter()
+        writer.write(f"{rng.randint(1, options)}\n".encode())
+        await writer.drain()
+        text = await read_prompt(reader)
+        latencies.append(time.perf_counter() - start)
+        if not text.endswith(PROMPT.encode()): # the player died
+            break
+    writer.close()
+
+async def run(sessions: int, turns: int, seed: int) -> None:
+    tracemalloc.start()
+    server = await serve(port=0)
+    port = server.sockets[0].getsockname()[1]
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    ready: List[int] = []
+    idle = asyncio.Event()
+    baseline = tracemalloc.get_traced_memory()[0]
+    clients = [asyncio.create_task(client(port, random.Random(rng.getrandbits(64)), turns, latencies, ready, idle)) for i in range(sessions)]
+    # wait until every session is parked on its first decision before measuring
+    while len(ready) < sessions:
+        await asyncio.sleep(0.01)
+    opened = tracemalloc.get_traced_memory()[0]
+    idle.set()
+    start = time.perf_counter()
+    await asyncio.gather(*clients)
+    elapsed = time.perf_counter() - start
+    server.close()
+    await server.wait_closed()
+    tracemalloc.stop()
+    # both ends of every connection live in this process, so this is an upper bound on server-side memory
+    print(f"{sessions} idle sessions: {(opened - baseline) / sessions / 1024:.1f} KiB per session (client and server side)")
+    print(f"{len(latencies)} decisions in {elapsed:.2f}s ({len(latencies) / elapsed:.0f} decisions/s)")
+    if latencies:
+        latencies.sort()
+        print(f"decision round trip: median {statistics.median(latencies) * 1000:.2f}ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the game server with loopback clients.")
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(run(args.sessions, args.turns, args.seed))
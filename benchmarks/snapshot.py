@@ -0,0 +1,38 @@
+import copy
+import timeit
+
+from src.abstract_classes import Tracker
+from src.enemies import Goblin, DarkMage, Shaman
+from src.player_classes import Mage
+from src.snapshot import Snapshot
+
+CALLS = 20000
+
+def encounter(enemies: int) -> Tracker:
+    tracker = Tracker(0, verbose=False)
+    Mage("Mage", tracker)
+    for creature_class in (Goblin, DarkMage, Shaman)[:enemies]:
+        tracker.add_active_creature(creature_class(tracker))
+    return tracker
+
+def per_call(function) -> float:
+    return min(timeit.repeat(function, number=CALLS, repeat=5)) / CALLS
+
+if __name__ == "__main__":
+    print("cost of copying a game with 1 to 3 enemies")
+    for enemies in (1, 2, 3):
+        tracker = encounter(enemies)
+        snapshot = Snapshot.capture(tracker)
+        scratch = snapshot.restore()
+        data = snapshot.to_bytes()
+        capture = per_call(lambda: Snapshot.capture(tracker))
+        restore = per_call(lambda: snapshot.restore(scratch))
+        deepcopy = min(timeit.repeat(lambda: copy.deepcopy(tracker), number=CALLS // 100, repeat=5)) / (CALLS // 100)
+        print(f"{enemies} enemies: capture {capture * 1e6:5.2f} us  restore in place {restore * 1e6:5.2f} us  "
+              f"clone {(capture + restore) * 1e6:5.2f} us  deepcopy {deepcopy * 1e6:7.1f} us")
+        bare = Snapshot.capture(tracker, rng=False)
+        print(f"  without the generator state: capture {per_call(lambda: Snapshot.capture(tracker, rng=False)) * 1e6:5.2f} us  "
+              f"restore in place {per_call(lambda: bare.restore(scratch)) * 1e6:5.2f} us")
+        print(f"  restore to a new tracker {per_call(lambda: snapshot.restore()) * 1e6:6.1f} us  "
+              f"save {per_call(snapshot.to_bytes) * 1e6:5.2f} us  load {per_call(lambda: Snapshot.from_bytes(data)) * 1e6:5.2f} us  "
+              f"{len(data)} bytes")
@@ -0,0 +1,38 @@
+import timeit
+
+from src.abstract_classes import Tracker
+from src.enemies import Goblin
+from src.player_classes import Warrior, Rogue, Mage, Priest
+
+ATTACKS = 100000
+
+def setup(player_class):
+    tracker = Tracker(0, verbose=False)
+    player = player_class(player_class.__name__, tracker)
+    target = Goblin(tracker)
+    target.hp_current = float("inf")
+    return player, player.actions[0], target
+
+def per_call(function) -> float:
+    return min(timeit.repeat(function, number=ATTACKS, repeat=5)) / ATTACKS
+
+def time_attacks(player_class, invalidate: bool) -> float:
+    player, action, target = setup(player_class)
+    def clear():
+        player.invalidate_stats()
+        target.invalidate_stats()
+    if not invalidate:
+        return per_call(lambda: player.make_attack(action, target))
+    def attack():
+        clear()
+        player.make_attack(action, target)
+    # the cost of clearing the cache is not part of the saving, so take it back out
+    return per_call(attack) - per_call(clear)
+
+if __name__ == "__main__":
+    print("make_attack per call, recomputing derived stats every attack vs. cached")
+    for player_class in (Warrior, Rogue, Mage, Priest):
+        uncached = time_attacks(player_class, True)
+        cached = time_attacks(player_class, False)
+        print(f"{player_class.__name__:8} uncached {uncached * 1e9:7.0f} ns  cached {cached * 1e9:7.0f} ns  "
+              f"saving {(uncached - cached) * 1e9:5.0f} ns ({1 - cached / uncached:.0%})")
@@ -0,0 +1,175 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.abstract_classes import Tracker
+from src.distributions import attack_distribution
+from src.enemies import Goblin, DarkMage, Shaman
+from src.game import new_encounter, next_turn
+from src.simulator import PLAYER_CLASSES, Simulator
+from src.snapshot import clone
+
+SEED = 0
+MEMORY_SLACK = 4096 # bytes; peaks this close to the baseline are allocator noise, not regressions
+
+# a case builds fresh game objects from SEED and returns the step to time, and optionally a step
+# whose cost is included in the first but is not what is being measured
+Case = Callable[[], Tuple[Callable[[], object], Optional[Callable[[], object]]]]
+
+def sturdy_tracker(player_class=PLAYER_CLASSES["Warrior"]) -> Tracker:
+    tracker = Tracker(SEED, verbose=False)
+    player = player_class(player_class.__name__, tracker)
+    player.hp_current = float("inf") # nothing in these cases should end the game
+    return tracker
+
+def make_attack_case():
+    tracker = sturdy_tracker()
+    target = Goblin(tracker)
+    target.hp_current = float("inf")
+    action = tracker.player.actions[0]
+    return lambda: tracker.player.make_attack(action, target), None
+
+def choose_action_case():
+    tracker = sturdy_tracker()
+    creatures = [Goblin(tracker), DarkMage(tracker), Shaman(tracker)]
+    for creature in creatures:
+        tracker.add_active_creature(creature)
+    def act():
+        for creature in creatures:
+            creature.choose_action()
+        reset()
+    def reset(): # buffs and debuffs would otherwise pile up over the run
+        tracker.effects.clear()
+        for creature in creatures:
+            creature.hp_current = float("inf")
+            if hasattr(creature, "mp_current"):
+                creature.mp_current = 1000
+    return act, reset
+
+def damage_preview_case():
+    tracker = sturdy_tracker(PLAYER_CLASSES["Rogue"])
+    target = Goblin(tracker)
+    player = tracker.player
+    def preview(): # what the menu shows for each action, once the tables are warm
+        for action in player.actions[:2]:
+            attack_distribution(player, action, target).preview(target.hp_current)
+    return preview, None
+
+def next_turn_case():
+    tracker = sturdy_tracker(PLAYER_CLASSES["Mage"])
+    for creature_class in (Goblin, DarkMage, Shaman):
+        tracker.add_active_creature(creature_class(tracker))
+    return lambda: next_turn(tracker), None
+
+def new_encounter_case():
+    tracker = sturdy_tracker()
+    def spawn():
+        new_encounter(tracker)
+        clear()
+    def clear():
+        for creature in list(tracker.active_creatures):
+            tracker.remove_active_creature(creature)
+    return spawn, clear
+
+def clone_case():
+    tracker = sturdy_tracker(PLAYER_CLASSES["Mage"])
+    for creature_class in (Goblin, DarkMage, Shaman):
+        tracker.add_active_creature(creature_class(tracker))
+    scratch = clone(tracker)
+    return lambda: clone(tracker, scratch), None
+
+def game_case(player_class_name: str) -> Case:
+    def case():
+        simulator = Simulator(PLAYER_CLASSES[player_class_name], seed=SEED)
+        return lambda: simulator.run(1), None
+    return case
+
+# name: (case, calls per timed round, unit reported)
+CASES: Dict[str, Tuple[Case, int, str]] = {
+    "make_attack": (make_attack_case, 20000, "call"),
+    "npc_choose_action": (choose_action_case, 5000, "3 calls"),
+    "damage_preview": (damage_preview_case, 20000, "2 actions"),
+    "next_turn": (next_turn_case, 20000, "turn"),
+    "new_encounter": (new_encounter_case, 10000, "spawn"),
+    "clone": (clone_case, 10000, "clone"),
+}
+for name in PLAYER_CLASSES:
+    CASES[f"game_{name.lower()}"] = (game_case(name), 20, "game")
+
+def per_call(step: Callable[[], object], number: int, repeat: int) -> float:
+    best = float("inf")
+    for i in range(repeat):
+        start = time.perf_counter()
+        for j in range(number):
+            step()
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+def run_case(case: Case, number: int, repeat: int, warmup: int) -> Dict[str, float]:
+    step, overhead = case()
+    for i in range(warmup):
+        step()
+        if overhead is not None:
+            overhead()
+    # the loop and call overhead of the timer itself, and any reset step, are taken back out
+    empty = per_call(lambda: None, number, repeat)
+    seconds = per_call(step, number, repeat) - empty
+    if overhead is not None:
+        seconds -= per_call(overhead, number, repeat) - empty
+    tracemalloc.start()
+    step, overhead = case()
+    start = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    for j in range(number):
+        step()
+    peak = tracemalloc.get_traced_memory()[1] - start
+    tracemalloc.stop()
+    return {"seconds": max(seconds, 0.0), "peak_bytes": peak}
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]
+        if result["seconds"] > before["seconds"] * (1 + threshold):
+            regressions.append(f"{name}: {before['seconds'] * 1e6:.2f}us -> {result['seconds'] * 1e6:.2f}us "
+                               f"({result['seconds'] / before['seconds'] - 1:+.0%})")
+        if result["peak_bytes"] > before["peak_bytes"] * (1 + threshold) + MEMORY_SLACK:
+            regressions.append(f"{name}: peak memory {before['peak_bytes'] / 1024:.1f} KiB -> {result['peak_bytes'] / 1024:.1f} KiB")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the combat hot paths and whole games, and check them against a baseline.")
+    parser.add_argument("cases", nargs="*", help=f"cases to run (default: all of {', '.join(CASES)})")
+    parser.add_argument("--repeat", type=int, default=5, help="timed rounds per case; the fastest is kept")
+    parser.add_argument("--warmup", type=int, default=100, help="untimed calls before timing")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply the calls per round, for quicker or steadier runs")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare against a saved baseline and exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown or memory growth over the baseline (default 0.10)")
+    args = parser.parse_args()
+    for name in args.cases:
+        if name not in CASES:
+            parser.error(f"unknown case {name}")
+    results = {}
+    for name in args.cases or CASES:
+        case, number, unit = CASES[name]
+        number = max(int(number * args.scale), 1)
+        results[name] = result = run_case(case, number, args.repeat, min(args.warmup, number))
+        rate = f"{1 / result['seconds']:10.0f}/s" if result["seconds"] else "         -"
+        print(f"{name:20} {result['seconds'] * 1e6:10.2f} us per {unit:8} {rate}   peak {result['peak_bytes'] / 1024:8.1f} KiB")
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "cases": results}, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file)["cases"], args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
@@ -1,10 +1,23 @@
-import random
+import argparse
 
-from src.enemies import *
+from src.abstract_classes import GameOver
+from src.events import EventBus
+from src.game import new_encounter, play_turn
+from src.mcts import MCTSPolicy
 from src.player_classes import *
+from src.policies import GreedyPolicy, RandomPolicy
+from src.renderer import TerminalRenderer
 
+AUTOPILOTS = {"random": RandomPolicy, "greedy": GreedyPolicy, "search": MCTSPolicy}
 
 def main():
+    parser = argparse.ArgumentParser(description="Play the dungeon in the terminal.")
+    parser.add_argument("--autopilot", choices=AUTOPILOTS.keys(), help="let a policy play after you pick a class and name")
+    parser.add_argument("--every", type=int, default=1, metavar="N", help="only draw every Nth turn")
+    parser.add_argument("--summaries", action="store_true", help="only draw a summary of each encounter")
+    parser.add_argument("--panel", action="store_true", help="keep hp and mp in a panel that is redrawn in place")
+    parser.add_argument("--initiative", action="store_true", help="act in order of speed, from dexterity, rather than you first")
+    args = parser.parse_args()
     print("""Welcome to the dungeon!
 
 Please select a character class.
@@ -38,7 +51,7 @@ Please enter a number to select your class:
     while name.strip() == "":
         print("Please name your character:")
         name = input("> ")
-    tracker = Tracker()
+    tracker = Tracker(events=EventBus(TerminalRenderer(every=args.every, summaries=args.summaries, panel=args.panel)))
     player : Player
     match choice:
         case "1":
@@ -49,37 +62,19 @@ Please enter a number to select your class:
             player = Mage(name, tracker)
         case "4":
             player = Priest(name, tracker)
+    if args.autopilot:
+        player.policy = AUTOPILOTS[args.autopilot]()
+    if args.initiative:
+        tracker.use_initiative()
     print(player.describe())
-    new_encounter(tracker)
-    while True: # continue until player dies
-        player.choose_action()
-        for creature in tracker.active_creatures:
-            creature.choose_action()
-        next_turn(tracker)
-
-def next_turn(tracker: Tracker):
-    tracker.player.reset_modifiers()
-    tracker.player.regen()
-    print(tracker.player.describe())
-    for creature in tracker.active_creatures:
-        creature.reset_modifiers()
-        print(creature.describe())
-    if tracker.active_creatures == []:
+    try:
         new_encounter(tracker)
-
-def new_encounter(tracker: Tracker):
-    enemy_chances = {
-        Goblin: 10,
-        DarkMage: 3,
-        Shaman: 3
-    }
-    print("As you advance deeper into the dungeon, new enemies emerge to fight...")
-    num_spawned = random.randint(1, 3)
-    for i in range(num_spawned):
-        creature_class = random.choices(list(enemy_chances.keys()), list(enemy_chances.values()))[0]
-        creature = creature_class(tracker)
-        print(creature.describe())
-        tracker.add_active_creature(creature)
+        while True: # continue until player dies
+            play_turn(tracker)
+    except GameOver:
+        exit(0)
+    finally:
+        tracker.events.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
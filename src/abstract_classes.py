@@ -1,147 +1,210 @@
 import random
-from typing import Dict, List, Collection
+import time
+from typing import TYPE_CHECKING, Dict, Hashable, List, Collection, Optional
 from abc import ABC, abstractmethod
 
-class Action(ABC):
+from .combat import hit_chance
+from .distributions import attack_distribution
+from .creature_store import ALLIES, ENEMIES, CreatureStore, Handle
+from .effects import STACK, Effect, EffectScheduler
+from .initiative import InitiativeScheduler
+from .events import (EventBus, Status, ActionUsed, AttackHit, AttackMissed, DamageTaken, Healed, Buffed,
+                     Debuffed, Died, Regenerated, XpGained, LevelledUp, SpellFailed)
+from .profiler import Profiler
+from .renderer import TerminalRenderer
+from .rng import RngService
+from .sampling import AliasTable
+from .stats import CACHED_STATS, Modifiers, base_stat, cached_stat
+
+if TYPE_CHECKING: # encounters builds on this module
+    from .encounters import EncounterPipeline
+
+class Action(ABC): # a definition shared by everyone who has the action, told who uses it each time
     name: str
-    base_power: float
-    power_variance: float
     is_multi_target: bool = False
-    user: "Creature"
-    @property
-    def power(self):
-        return self.base_power - (self.power_variance / 2) + (self.power_variance * random.random())
-
-    def __init__(self, user: "Creature"):
-        self.user = user
 
     @abstractmethod
     def describe(self) -> str:
         pass
 
-class Attack(Action):
-    @property
-    def power_variance(self):
-        return self.user.damage_range_base
+class PoweredAction(Action): # an action with an amount, of damage or healing, rolled each time it is used
+    variance: float = 0 # the spread of power, where it does not depend on the user
+
+    @abstractmethod
+    def base_power(self, user: "Creature") -> float:
+        pass
+
+    def power_variance(self, user: "Creature") -> float:
+        return self.variance
+
+    def power(self, user: "Creature") -> float:
+        variance = self.power_variance(user)
+        return self.base_power(user) - (variance / 2) + (variance * user.rng.random())
+
+class Attack(PoweredAction):
+    def power_variance(self, user: "Creature") -> float:
+        return user.damage_range_base
 
     @abstractmethod
     def describe(self):
         pass
 
-class Healing(Action):
+class Healing(PoweredAction):
     @abstractmethod
     def describe(self):
         pass
 
 class Spell(Action):
     mp_cost: int
-    user: "SpellcasterMixin"
     @abstractmethod
     def describe(self):
         pass
 
 class Buff(Action):
     buff_effects: Dict[str, int]
+    duration: int = 1 # turns the effects last; 1 is until the start of next turn
+    stacking: str = STACK
     @abstractmethod
     def describe(self):
         pass
 
 class Debuff(Action):
     debuff_effects: Dict[str, int]
+    duration: int = 1
+    stacking: str = STACK
     @abstractmethod
     def describe(self):
         pass
 
+MODIFIER_NAMES = ("attack", "defence", "damage_base", "damage_range", "crit_chance", "crit_mult")
+
 class Creature(ABC):
     name: str
-    strength: int
-    dexterity: int
-    constitution: int
-    intelligence: int
+    strength: int = base_stat()
+    dexterity: int = base_stat()
+    constitution: int = base_stat()
+    intelligence: int = base_stat()
     hp_current: int
     xp: int
     tracker: "Tracker"
+    serial: int # numbers the creature's random stream within the game
+    rng: random.Random # its own stream, so its draws do not depend on anyone else's
     actions: Collection[Action]
-    modifiers: Dict[str, int] = {"attack": 0, "defence": 0, "damage_base": 0, "damage_range": 0, "crit_chance": 0, "crit_mult": 0}
-    @property
+    faction: str
+    buffs_first: bool # whether an action's buffs land on its user before its attack, or only after it
+    # kept up to date by the CreatureStore while the creature is in play
+    handle: Optional[Handle] = None
+    store_index: int = -1
+    faction_index: int = -1
+    dying: bool = False
+    modifiers: Modifiers # the sum of the effects on this creature
+    effects: Dict[Hashable, Effect] # kept by the tracker's EffectScheduler
+    timeline_entry: Optional[tuple] = None # its next act, when the tracker has an InitiativeScheduler
+    # derived stats are cached until a base stat or a modifier changes
+    @cached_stat()
     def hp_max(self) -> int:
         return self.constitution * 10
-    @property
+    @cached_stat("attack")
     def attack(self):
         return ((self.strength + self.dexterity) / 2.0) + self.modifiers["attack"]
-    @property
+    @cached_stat("defence")
     def defence(self):
         return ((self.dexterity + self.constitution) / 2.0) + self.modifiers["defence"]
-    @property
+    @cached_stat("damage_base")
     def damage_base(self):
         return self.strength + (self.dexterity / 2.0) + self.modifiers["damage_base"]
-    @property
+    @cached_stat("damage_base", "damage_range")
     def damage_range_base(self):
         return (self.damage_base * 0.15) + self.modifiers["damage_range"]
-    @property
+    @cached_stat("crit_chance")
     def crit_chance(self):
         return ((self.dexterity / 10.0) + self.modifiers["crit_chance"]) / 100
-    @property
+    @cached_stat("crit_mult")
     def crit_mult(self):
         return 1 + (self.dexterity / 10.0) + self.modifiers["crit_mult"]
+    @cached_stat()
+    def speed(self):
+        return max(self.dexterity, 1)
 
     def __init__(self, name: str, strength: int, dexterity: int, constitution: int, intelligence: int, tracker: "Tracker") -> None:
         self.name = name
+        self.modifiers = Modifiers(self, dict.fromkeys(MODIFIER_NAMES, 0))
+        self.effects = {}
         self.strength = strength
         self.dexterity = dexterity
         self.constitution = constitution
         self.intelligence = intelligence
         self.hp_current = self.hp_max
         self.tracker = tracker
+        self.serial, self.rng = tracker.rngs.spawn()
+
+    def invalidate_stats(self) -> None:
+        cache = self.__dict__
+        for stat in CACHED_STATS.intersection(cache):
+            del cache[stat]
 
     def make_attack(self, action: Attack, target: "Creature") -> None:
-        # max means hit chance won't drop below 0.05
-        hit_chance = max(0.5 + ((self.attack - target.defence) / (2.0 * self.attack)), 0.05)
-        if random.random() <= hit_chance:
-            dmg = action.power
-            if random.random() <= self.crit_chance:
+        if self.rng.random() <= hit_chance(self.attack, target.defence):
+            dmg = action.power(self)
+            crit = self.rng.random() <= self.crit_chance
+            if crit:
                 dmg *= self.crit_mult
             dmg = int(dmg)
-            target.take_damage(dmg)
-            print(f"{self.name} attacks {target.name} with {action.name} for {dmg} damage")
-        else:
-            print(f"{self.name} attacks {target.name} but misses")
+            target.take_damage(dmg, self)
+            if self.tracker.events.active:
+                self.tracker.events.emit(AttackHit(self.name, target.name, action.name, dmg, crit))
+        elif self.tracker.events.active:
+            self.tracker.events.emit(AttackMissed(self.name, target.name, action.name))
 
     def heal_target(self, action: Healing, target: "Creature") -> None:
-        heal_amt = action.power
+        heal_amt = action.power(self)
         target.hp_current += heal_amt
         if target.hp_max < target.hp_current:
             target.hp_current = target.hp_max
-        print(f"{self.name} heals {target.name} for {heal_amt} hp")
+        if self.tracker.events.active:
+            self.tracker.events.emit(Healed(self.name, target.name, action.name, heal_amt))
 
-    def take_damage(self, damage) -> None:
+    def take_damage(self, damage, attacker: Optional["Creature"] = None) -> None:
         self.hp_current -= damage
+        if self.tracker.events.active:
+            self.tracker.events.emit(DamageTaken(self.name, damage, self.hp_current))
         if self.hp_current <= 0:
-            self.die()
+            self.die(attacker)
 
     def buff_target(self, action: Buff, target: "Creature") -> None:
+        expires = self.tracker.turn + action.duration
         for effect in action.buff_effects:
-            target.modifiers[effect] += action.buff_effects[effect]
-            print(f"{self.name} buffs {effect} by {action.buff_effects[effect]}")
+            self.tracker.effects.apply(target, effect, action.buff_effects[effect], expires, action.name, action.stacking)
+            if self.tracker.events.active:
+                self.tracker.events.emit(Buffed(self.name, target.name, effect, action.buff_effects[effect]))
 
     def debuff_target(self, action: Debuff, target: "Creature") -> None:
+        expires = self.tracker.turn + action.duration
         for effect in action.debuff_effects:
-            target.modifiers[effect] += action.debuff_effects[effect]
-            print(f"{self.name} debuffs {target.name}'s {effect} by {action.debuff_effects[effect]}")
+            self.tracker.effects.apply(target, effect, action.debuff_effects[effect], expires, action.name, action.stacking)
+            if self.tracker.events.active:
+                self.tracker.events.emit(Debuffed(self.name, target.name, effect, action.debuff_effects[effect]))
 
     @abstractmethod
-    def die(self) -> None:
+    def die(self, killer: Optional["Creature"] = None) -> None:
         pass
 
     def describe(self) -> str:
         return f'{self.name} has {self.hp_current} hp.'
 
+    def status(self) -> Status:
+        return Status(self.name, self.hp_current, None)
+
     @abstractmethod
     def choose_action(self) -> None:
         pass
 
     def do_action(self, action: Action, targets: List["Creature"], positive_effect: bool) -> None:
-        print(f"{self.name} uses {action.name}")
+        profiling = self.tracker.profiler.enabled
+        if profiling:
+            start = time.perf_counter_ns()
+        if self.tracker.events.active:
+            self.tracker.events.emit(ActionUsed(self.name, action.name))
         for target in targets:
             # if multiple categories, apply buffs/debuffs first, then attack/heal
             if isinstance(action, Buff) and positive_effect:
@@ -152,31 +215,64 @@ class Creature(ABC):
                 self.make_attack(action, target)
             if isinstance(action, Healing) and positive_effect:
                 self.heal_target(action, target)
+        self.tracker.creatures.process_deaths()
+        if profiling:
+            self.tracker.profiler.record_action(action, start)
 
     @abstractmethod
     def choose_target(self, action: Action) -> List["Creature"]:
         pass
 
-    def reset_modifiers(self) -> None:
-        for modifier in self.modifiers:
-            self.modifiers[modifier] = 0
-
 class NPC(Creature):
+    # A class's action table and its sampler are shared by all its creatures, until one of them changes
+    # a weight; that creature then gets copies of its own.
+    faction = ENEMIES
+    buffs_first = False # see choose_target
     actions: Dict[Action, int]
+    action_sampler: Optional[AliasTable] = None # built from actions on the first turn
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.action_sampler = None # so that no class samples from its parent's table
 
     def __init__(self, name: str, strength: int, dexterity: int, constitution: int, intelligence: int, tracker: "Tracker") -> None:
         super().__init__(name, strength, dexterity, constitution, intelligence, tracker)
 
     def choose_action(self) -> None:
-        action = random.choices(list(self.actions.keys()), list(self.actions.values()))[0]
-        if isinstance(action, Spell) and isinstance(self, SpellcasterMixin):
-            can_cast = self.try_cast_spell(action)
-            if not can_cast:
-                self.actions[action] = 0
-                self.choose_action()
+        if self.action_sampler is None:
+            cls = type(self)
+            cls.action_sampler = AliasTable(cls.actions)
+        action = self.action_sampler.sample(self.rng)
+        while action is not None:
+            if isinstance(action, Spell) and isinstance(self, SpellcasterMixin):
+                if self.try_cast_spell(action):
+                    return
+                # NPCs never regain mana, so a spell they can't afford now is never cast again
+                self.set_action_weight(action, 0)
+                action = self.action_sampler.sample(self.rng)
+            else:
+                self.choose_target(action)
                 return
-        else:
-            self.choose_target(action)
+
+    def set_action_weight(self, action: Action, weight: int) -> None:
+        if self.actions[action] == weight:
+            return
+        if "actions" not in self.__dict__: # copy on write
+            self.actions = dict(self.actions)
+            self.actions[action] = weight
+            self.action_sampler = AliasTable(self.actions)
+            return
+        self.actions[action] = weight
+        self.action_sampler.set_weight(action, weight)
+
+    def set_action_weights(self, weights: Collection[int]) -> None: # in the order of the class's actions
+        shared = type(self).actions
+        if all(weight == shared_weight for weight, shared_weight in zip(weights, shared.values())):
+            self.__dict__.pop("actions", None) # back to the shared table
+            self.__dict__.pop("action_sampler", None)
+            return
+        for action, weight in zip(shared, weights):
+            self.set_action_weight(action, weight)
 
     def choose_target(self, action: Action) -> None:
         if isinstance(action, Attack) or isinstance(action, Debuff):
@@ -184,38 +280,50 @@ class NPC(Creature):
         if isinstance(action, Healing) or isinstance(action, Buff):
             self.do_action(action, self.tracker.active_creatures if action.is_multi_target else [self], True)
 
-    def die(self) -> None:
-        self.tracker.active_creatures.remove(self)
-        print(f"{self.name} is dead")
+    def die(self, killer: Optional[Creature] = None) -> None:
+        self.tracker.creatures.defer_death(self, killer)
+
+    def settle_death(self, killer: Optional[Creature] = None) -> None: # once the action that killed it is over
+        self.tracker.effects.dispel(self)
+        if self.tracker.events.active:
+            self.tracker.events.emit(Died(self.name, killer.name if killer is not None else None, False))
         self.tracker.player.gain_xp(self.xp)
-        print(f"{self.tracker.player.name} gained {self.xp} xp")
+        if self.tracker.events.active:
+            self.tracker.events.emit(XpGained(self.tracker.player.name, self.xp))
 
 class Player(Creature):
+    faction = ALLIES
+    buffs_first = True
     actions: List[Action]
+    policy: "Policy"
+    level: int
+    pending_level_ups: int
+    level_ups: List[str] # the attribute each level up went to, in order
 
     def __init__(self, name: str, strength: int, dexterity: int, constitution: int, intelligence: int, tracker: "Tracker") -> None:
         tracker.player = self
         super().__init__(name, strength, dexterity, constitution, intelligence, tracker)
+        tracker.creatures.add(self)
         self.xp = 0
+        self.level = 1
+        self.pending_level_ups = 0
+        self.level_ups = []
+        self.policy = ConsolePolicy()
 
     def choose_action(self) -> None:
-        print("Choose an action by entering the number:")
-        for i in range(len(self.actions)):
-            print(f"{i + 1}: {self.actions[i].describe()}")
-        choice = -1
-        while choice not in range(len(self.actions)):
-            try:
-                choice = int(input("> ")) - 1
-            except ValueError:
-                print("Please enter a number:")
-        action = self.actions[choice]
-        if isinstance(action, Spell) and isinstance(self, SpellcasterMixin):
-            can_cast = self.try_cast_spell(action)
-            if not can_cast:
-                self.choose_action()
-            return
-        else:
-            self.choose_target(action)
+        profiler = self.tracker.profiler
+        while True: # until the policy picks something the player can do; a spell it cannot afford is asked again
+            if profiler.enabled:
+                start = time.perf_counter_ns()
+                action = self.policy.choose_action(self)
+                profiler.record_phase("player_decision", start)
+            else:
+                action = self.policy.choose_action(self)
+            if not (isinstance(action, Spell) and isinstance(self, SpellcasterMixin)):
+                self.choose_target(action)
+                return
+            if self.try_cast_spell(action):
+                return
 
     def choose_target(self, action: Action) -> None:
         if isinstance(action, Healing) or isinstance(action, Buff):
@@ -224,17 +332,13 @@ class Player(Creature):
             if action.is_multi_target:
                 self.do_action(action, self.tracker.active_creatures, False)
             else:
-                print("Choose a target by entering the number:")
-                for i in range(len(self.tracker.active_creatures)):
-                    print(f"{i + 1}: {self.tracker.active_creatures[i].name}")
-                choice = -1
-                while choice not in range(len(self.tracker.active_creatures)):
-                    try:
-                        choice = int(input("> ")) - 1
-                    except ValueError:
-                        print("Please enter a number:")
-                        choice = input("> ")
-                target = self.tracker.active_creatures[choice]
+                profiler = self.tracker.profiler
+                if profiler.enabled:
+                    start = time.perf_counter_ns()
+                    target = self.policy.choose_target(self, action, self.tracker.active_creatures)
+                    profiler.record_phase("player_decision", start)
+                else:
+                    target = self.policy.choose_target(self, action, self.tracker.active_creatures)
                 self.do_action(action, [target], False)
 
     def gain_xp(self, xp: int) -> None:
@@ -244,54 +348,50 @@ class Player(Creature):
             self.level_up()
 
     def level_up(self) -> None:
-        print(f"""You level up! Choose an attribute to increase by entering the number:
-1: Strength     (currently {self.strength})
-2: Dexterity    (currently {self.dexterity})
-3: constitution (currently {self.constitution})
-4: Intelligence (currently {self.intelligence})""")
-        choice = 0
-        while choice not in range(1, 5):
-            try:
-                choice = int(input("> "))
-            except ValueError:
-                print("Please enter a number:")
-        match choice:
-            case 1:
-                self.strength += 1
-            case 2:
-                self.dexterity += 1
-            case 3:
-                self.constitution += 1
-            case 4:
-                self.intelligence += 1
+        attribute = self.policy.choose_level_up(self)
+        if attribute is None: # the policy will answer later through apply_level_up
+            self.pending_level_ups += 1
+            return
+        self.apply_level_up(attribute)
+
+    def apply_level_up(self, attribute: str) -> None:
+        setattr(self, attribute, getattr(self, attribute) + 1)
+        self.level += 1
+        self.level_ups.append(attribute)
         self.hp_current = self.hp_max
+        if self.tracker.events.active:
+            self.tracker.events.emit(LevelledUp(self.name, attribute, self.level))
 
-    def die(self) -> None:
-        print("You are dead! Game over")
-        exit(0)
+    def die(self, killer: Optional[Creature] = None) -> None:
+        cause = killer.name if killer is not None else "unknown"
+        if self.tracker.events.active:
+            self.tracker.events.emit(Died(self.name, cause, True))
+        raise GameOver(cause)
 
     def regen(self):
         hp_regen = max(int(self.constitution / 10), 1)
         self.hp_current += hp_regen
-        print(f"{self.name} recovers {hp_regen} hp")
+        if self.tracker.events.active:
+            self.tracker.events.emit(Regenerated(self.name, "hp", hp_regen))
         if isinstance(self, SpellcasterMixin):
             mp_regen = max(int(self.intelligence / 10), 1)
             self.mp_current += mp_regen
-            print(f"{self.name} recovers {mp_regen} mp")
+            if self.tracker.events.active:
+                self.tracker.events.emit(Regenerated(self.name, "mp", mp_regen))
 
 class SpellcasterMixin(Creature):
     mp_current: int
-    @property
+    @cached_stat()
     def spell_power(self):
         return self.intelligence
-    @property
+    @cached_stat()
     def mp_max(self):
         return self.intelligence * 10
 
     def try_cast_spell(self, spell: Spell) -> bool:
         if spell.mp_cost > self.mp_current:
-            if isinstance(self, Player):
-                print(f"Not enough mana! {spell.name} costs {spell.mp_cost} and you have {self.mp_current}")
+            if isinstance(self, Player) and self.tracker.events.active:
+                self.tracker.events.emit(SpellFailed(self.name, spell.name, spell.mp_cost, self.mp_current))
             return False
         self.mp_current -= spell.mp_cost
         self.choose_target(spell)
@@ -300,19 +400,125 @@ class SpellcasterMixin(Creature):
     def describe(self) -> str:
         return f"{self.name} has {self.hp_current} hp and {self.mp_current} mp"
 
+    def status(self) -> Status:
+        return Status(self.name, self.hp_current, self.mp_current)
+
     @abstractmethod
     def choose_action(self) -> None:
         pass
 
+class GameOver(Exception): # raised when the player dies, so the caller decides whether to exit
+    cause: str
+
+    def __init__(self, cause: str):
+        super().__init__(f"killed by {cause}")
+        self.cause = cause
+
+LEVEL_UP_ATTRIBUTES = ["strength", "dexterity", "constitution", "intelligence"]
+
+class Policy(ABC): # makes the player's decisions
+    @abstractmethod
+    def choose_action(self, player: Player) -> Action:
+        pass
+
+    @abstractmethod
+    def choose_target(self, player: Player, action: Action, targets: List[Creature]) -> Creature:
+        pass
+
+    @abstractmethod
+    def choose_level_up(self, player: Player) -> Optional[str]: # None defers the choice, see Player.apply_level_up
+        pass
+
+class ConsolePolicy(Policy): # flushes the game's narration before each prompt, as it is drawn a turn at a time
+    def choose_action(self, player: Player) -> Action:
+        player.tracker.events.flush()
+        print("Choose an action by entering the number:")
+        for i in range(len(player.actions)):
+            print(f"{i + 1}: {player.actions[i].describe()}")
+            if isinstance(player.actions[i], Attack): # what it would do to each enemy, from the cached damage tables
+                for target in player.tracker.active_creatures:
+                    print(f"     vs {target.name}: {attack_distribution(player, player.actions[i], target).preview(target.hp_current)}")
+        choice = -1
+        while choice not in range(len(player.actions)):
+            try:
+                choice = int(input("> ")) - 1
+            except ValueError:
+                print("Please enter a number:")
+        return player.actions[choice]
+
+    def choose_target(self, player: Player, action: Action, targets: List[Creature]) -> Creature:
+        player.tracker.events.flush()
+        print("Choose a target by entering the number:")
+        for i in range(len(targets)):
+            if isinstance(action, Attack):
+                print(f"{i + 1}: {targets[i].name} ({attack_distribution(player, action, targets[i]).preview(targets[i].hp_current)})")
+            else:
+                print(f"{i + 1}: {targets[i].name}")
+        choice = -1
+        while choice not in range(len(targets)):
+            try:
+                choice = int(input("> ")) - 1
+            except ValueError:
+                print("Please enter a number:")
+        return targets[choice]
+
+    def choose_level_up(self, player: Player) -> str:
+        player.tracker.events.flush()
+        print(f"""You level up! Choose an attribute to increase by entering the number:
+1: Strength     (currently {player.strength})
+2: Dexterity    (currently {player.dexterity})
+3: constitution (currently {player.constitution})
+4: Intelligence (currently {player.intelligence})""")
+        choice = 0
+        while choice not in range(1, 5):
+            try:
+                choice = int(input("> "))
+            except ValueError:
+                print("Please enter a number:")
+        return LEVEL_UP_ATTRIBUTES[choice - 1]
+
 class Tracker: # this helps track the active creatures
-    active_creatures: List[Creature]
+    creatures: CreatureStore # the player and every enemy in play
     player: Player
+    rngs: RngService
+    rng: random.Random # the game's own stream, for what no creature draws
+    events: EventBus
+    effects: EffectScheduler # buffs and debuffs on every creature, until they expire
+    profiler: Profiler # off unless switched on with profiler.enabled
+    turn: int
+    encounters: int
+    waves: Optional["EncounterPipeline"] # rolls and builds the encounters to come, made on the first one
+    initiative: Optional[InitiativeScheduler] # orders each turn's acts by speed; None for player first, then enemies
+
+    def __init__(self, seed: Optional[int] = None, verbose: bool = True, events: Optional[EventBus] = None):
+        self.creatures = CreatureStore()
+        self.rngs = RngService(seed)
+        self.rng = self.rngs.game
+        # verbose only picks the default: narrate to stdout a turn at a time, or build no events at all
+        self.events = events if events is not None else EventBus(TerminalRenderer()) if verbose else EventBus()
+        self.effects = EffectScheduler()
+        self.profiler = Profiler()
+        self.turn = 0
+        self.encounters = 0
+        self.waves = None
+        self.initiative = None
 
-    def __init__(self):
-        self.active_creatures = []
+    @property
+    def active_creatures(self) -> List[Creature]: # the enemies in play, as a live view
+        return self.creatures.factions[ENEMIES]
 
     def add_active_creature(self, creature: Creature):
-        self.active_creatures.append(creature)
+        self.creatures.add(creature)
+        if self.initiative is not None:
+            self.initiative.add(creature, self.turn)
+
+    def use_initiative(self) -> None: # from the next round on, for everyone in play and all who join
+        self.initiative = InitiativeScheduler(self.creatures, self.turn)
+
+    def reseed(self, seed: int) -> None:
+        waiting = self.waves.ready if self.waves is not None and self.waves.ready else []
+        self.rngs.reseed(seed, list(self.creatures) + waiting)
 
     def remove_active_creature(self, creature: Creature):
-        self.active_creatures.remove(creature)
+        self.creatures.remove(creature)
+        self.effects.dispel(creature)
@@ -1,23 +1,21 @@
-from .abstract_classes import Action, Attack, Healing, Buff, Debuff, Spell, Creature
+from .abstract_classes import Action, Attack, Healing, Buff, Debuff, Spell
 
 
 class BasicAttack(Attack):
-    @property
-    def base_power(self):
-        return self.user.damage_base
+    def base_power(self, user):
+        return user.damage_base
 
-    def __init__(self, user: Creature, name: str="Basic Attack"):
+    def __init__(self, name: str="Basic Attack"):
         self.name = name
-        super().__init__(user)
 
     def describe(self):
         return f"{self.name}: A basic attack."
 
 class PowerAttack(Attack, Debuff):
     name = "Power Attack"
-    @property
-    def base_power(self):
-        return self.user.damage_base * 2
+    multiplier = 2
+    def base_power(self, user):
+        return user.damage_base * self.multiplier
     debuff_effects = {"defence": -2}
 
     def describe(self):
@@ -25,10 +23,10 @@ class PowerAttack(Attack, Debuff):
 
 class MinorHeal(Healing, Spell):
     name = "Basic Heal"
-    @property
-    def base_power(self):
-        return self.user.spell_power * 0.8
-    power_variance = 1
+    multiplier = 0.8
+    def base_power(self, user):
+        return user.spell_power * self.multiplier
+    variance = 1
     mp_cost = 5
 
     def describe(self):
@@ -36,9 +34,9 @@ class MinorHeal(Healing, Spell):
 
 class SneakAttack(Attack, Buff):
     name = "Sneak Attack"
-    @property
-    def base_power(self):
-        return self.user.damage_base * 0.8
+    multiplier = 0.8
+    def base_power(self, user):
+        return user.damage_base * self.multiplier
     buff_effects = {"attack": +1, "crit_mult": +10}
 
     def describe(self):
@@ -46,9 +44,9 @@ class SneakAttack(Attack, Buff):
 
 class LightningBolt(Attack, Spell):
     name = "Lightning Bolt"
-    @property
-    def base_power(self):
-        return self.user.spell_power * 3
+    multiplier = 3
+    def base_power(self, user):
+        return user.spell_power * self.multiplier
     mp_cost = 10
 
     def describe(self):
@@ -56,9 +54,9 @@ class LightningBolt(Attack, Spell):
 
 class FireBall(Attack, Spell):
     name = "Fireball"
-    @property
-    def base_power(self):
-        return self.user.spell_power * 1.2
+    multiplier = 1.2
+    def base_power(self, user):
+        return user.spell_power * self.multiplier
     mp_cost = 10
     is_multi_target = True
 
@@ -67,9 +65,9 @@ class FireBall(Attack, Spell):
 
 class DefensiveStrike(Attack, Buff):
     name = "Defensive Strike"
-    @property
-    def base_power(self):
-        return self.user.damage_base * 0.3
+    multiplier = 0.3
+    def base_power(self, user):
+        return user.damage_base * self.multiplier
     buff_effects = {"defence": +3}
 
     def describe(self):
@@ -95,10 +93,10 @@ class MagicBarrier(Buff, Spell):
 class MajorHeal(Healing, Spell):
     name = "Major Heal"
     mp_cost = 20
-    @property
-    def base_power(self):
-        return self.user.spell_power * 2
-    power_variance = 2
+    multiplier = 2
+    def base_power(self, user):
+        return user.spell_power * self.multiplier
+    variance = 2
 
     def describe(self):
         return f"{self.name}: A strong healing spell. Costs {self.mp_cost} MP"
@@ -113,10 +111,10 @@ class Dodge(Buff):
 class GroupHeal(Healing, Spell):
     name = "Group Heal"
     mp_cost = 10
-    @property
-    def base_power(self):
-        return self.user.spell_power * 0.8
-    power_variance = 1
+    multiplier = 0.8
+    def base_power(self, user):
+        return user.spell_power * self.multiplier
+    variance = 1
     is_multi_target = True
 
     def describe(self):
@@ -0,0 +1,309 @@
+import argparse
+import ast
+import inspect
+import itertools
+import json
+import math
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from statistics import NormalDist
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from . import actions, distributions
+from .abstract_classes import Action, GameOver, Tracker
+from .encounters import ENEMY_CLASSES
+from .game import new_encounter, play_turn
+from .policies import POLICIES
+from .rng import derive_seed
+from .simulator import PLAYER_CLASSES
+
+TUNABLE = {**{name: cls for name, cls in inspect.getmembers(actions, inspect.isclass) if issubclass(cls, Action)},
+           **PLAYER_CLASSES, **ENEMY_CLASSES}
+INSIDE = "inside"
+BELOW = "below"
+ABOVE = "above"
+UNDECIDED = "undecided" # still straddling an edge of the band after max_games
+
+Overrides = Tuple[Tuple[str, object], ...] # (path, value) pairs, such as ("PowerAttack.multiplier", 2.5)
+Values = Union[List[object], Tuple[float, float]] # a list to pick from, or a (low, high) range for random search
+Task = Tuple[str, str, Overrides, int, int, int, int, int] # class, policy, overrides, seed, batch, games, encounters, max_turns
+
+MISSING = object()
+
+@contextmanager
+def overridden(overrides: Dict[str, object]):
+    # Sets class attributes for as long as it is open, then puts back what was there. A path is
+    # Class.attribute, or Class.attribute.key for one entry of a dict such as starting_stats or
+    # debuff_effects, which gets a changed copy so the original dict is left alone.
+    saved = []
+    try:
+        for path, value in overrides.items():
+            class_name, attribute, *key = path.split(".")
+            cls = TUNABLE.get(class_name)
+            if cls is None or not hasattr(cls, attribute) or len(key) > 1:
+                raise ValueError(f"{path} is not a tunable parameter")
+            if key:
+                table = dict(getattr(cls, attribute))
+                if key[0] not in table:
+                    raise ValueError(f"{class_name}.{attribute} has no {key[0]}, only {', '.join(table)}")
+                table[key[0]] = value
+                value = table
+            saved.append((cls, attribute, cls.__dict__.get(attribute, MISSING)))
+            setattr(cls, attribute, value)
+        # matchups are keyed on the action objects, which stay the same while what they do changes
+        distributions.matchups.clear()
+        yield
+    finally:
+        for cls, attribute, old in reversed(saved):
+            if old is MISSING:
+                delattr(cls, attribute)
+            else:
+                setattr(cls, attribute, old)
+        distributions.matchups.clear()
+
+def parse_param(text: str) -> Tuple[str, Values]:
+    # PATH=1,2,3 for those values, or PATH=LOW:HIGH for a range to draw from
+    path, _, values = text.partition("=")
+    if not values:
+        raise ValueError(f"{text} gives no values")
+    if ":" in values:
+        low, high = values.split(":")
+        return path, (ast.literal_eval(low), ast.literal_eval(high))
+    return path, [ast.literal_eval(value) for value in values.split(",")]
+
+def grid(params: List[Tuple[str, Values]]) -> List[Overrides]:
+    for path, values in params:
+        if isinstance(values, tuple):
+            raise ValueError(f"{path} is a range, which only random search can draw from")
+    paths = [path for path, values in params]
+    return [tuple(zip(paths, combination)) for combination in itertools.product(*(values for path, values in params))]
+
+def random_search(params: List[Tuple[str, Values]], count: int, rng: random.Random) -> List[Overrides]:
+    # count draws, less any repeats; integer ranges draw integers and others are rounded to two places
+    candidates: Dict[Overrides, None] = {}
+    for i in range(count):
+        candidate = []
+        for path, values in params:
+            if isinstance(values, list):
+                candidate.append((path, rng.choice(values)))
+            elif all(isinstance(bound, int) for bound in values):
+                candidate.append((path, rng.randint(*values)))
+            else:
+                candidate.append((path, round(rng.uniform(*values), 2)))
+        candidates[tuple(candidate)] = None
+    return list(candidates)
+
+def cleared(player_class: str, policy: str, seed: int, policy_seed: int, encounters: int, max_turns: int) -> bool:
+    # whether the player clears that many encounters before dying or running out of turns
+    tracker = Tracker(seed, verbose=False)
+    player = PLAYER_CLASSES[player_class](player_class, tracker)
+    player.policy = POLICIES[policy](policy_seed)
+    try:
+        new_encounter(tracker)
+        while tracker.turn < max_turns:
+            play_turn(tracker)
+            if tracker.encounters - (1 if tracker.active_creatures else 0) >= encounters:
+                return True
+    except GameOver:
+        pass
+    return False
+
+def run_batch(task: Task) -> int: # wins
+    # a batch's games are seeded from the sweep seed and the batch alone, so every candidate meets
+    # the same dungeons and the differences between them are down to the overrides
+    player_class, policy, overrides, seed, batch, games, encounters, max_turns = task
+    with overridden(dict(overrides)):
+        return sum(cleared(player_class, policy, derive_seed(seed, "game", batch, game), derive_seed(seed, "policy", batch, game),
+                           encounters, max_turns)
+                   for game in range(games))
+
+class SequentialTest:
+    # Puts a Wilson score interval around the win rate after each batch and stops once it is wholly
+    # inside the band or wholly outside it. Looking after every batch would let chance through that
+    # many more times, so each look is made at alpha split over the most batches there can be.
+    low: float
+    high: float
+    z: float
+
+    def __init__(self, low: float, high: float, alpha: float, looks: int):
+        self.low = low
+        self.high = high
+        self.z = NormalDist().inv_cdf(1 - alpha / (2 * looks))
+
+    def interval(self, wins: int, games: int) -> Tuple[float, float]:
+        if not games:
+            return 0.0, 1.0
+        rate = wins / games
+        z2 = self.z * self.z
+        centre = (rate + z2 / (2 * games)) / (1 + z2 / games)
+        spread = self.z * math.sqrt(rate * (1 - rate) / games + z2 / (4 * games * games)) / (1 + z2 / games)
+        return max(centre - spread, 0.0), min(centre + spread, 1.0)
+
+    def verdict(self, wins: int, games: int) -> Optional[str]:
+        low, high = self.interval(wins, games)
+        if high < self.low:
+            return BELOW
+        if low > self.high:
+            return ABOVE
+        if low >= self.low and high <= self.high:
+            return INSIDE
+        return None
+
+class Candidate:
+    overrides: Overrides
+    wins: int
+    games: int
+    counted: int # batches added into wins and games, which is always the first ones, in order
+    submitted: int
+    finished: Dict[int, Tuple[int, int]] # (wins, games) of batches back out of order, until their turn
+    verdict: Optional[str]
+
+    def __init__(self, overrides: Overrides):
+        self.overrides = overrides
+        self.wins = self.games = self.counted = self.submitted = 0
+        self.finished = {}
+        self.verdict = None
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.games if self.games else 0.0
+
+    def finish(self, batch: int, wins: int, games: int, test: SequentialTest, max_batches: int) -> None:
+        # batches are counted in order, so the verdict does not depend on which worker was quickest
+        self.finished[batch] = (wins, games)
+        while self.verdict is None and self.counted in self.finished:
+            wins, games = self.finished.pop(self.counted)
+            self.wins += wins
+            self.games += games
+            self.counted += 1
+            self.verdict = test.verdict(self.wins, self.games) or (UNDECIDED if self.counted == max_batches else None)
+
+    def describe(self) -> str:
+        return ", ".join(f"{path}={value}" for path, value in self.overrides) or "(as written)"
+
+class ResultCache:
+    # Each finished batch as a line of JSON, appended and flushed as it comes in, keyed on everything
+    # its games depend on. A sweep that is stopped and run again with the same file takes the batches
+    # it already has from here; a line cut short by the stop is skipped.
+    path: Optional[str]
+    results: Dict[str, int]
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.results = {}
+        self.file = None
+        if path is None:
+            return
+        if os.path.exists(path):
+            with open(path) as file:
+                for line in file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.results[entry["key"]] = entry["wins"]
+        self.file = open(path, "a")
+
+    @staticmethod
+    def key(task: Task) -> str:
+        player_class, policy, overrides, seed, batch, games, encounters, max_turns = task
+        return json.dumps([player_class, policy, sorted(overrides), seed, batch, games, encounters, max_turns])
+
+    def get(self, task: Task) -> Optional[int]:
+        return self.results.get(self.key(task))
+
+    def add(self, task: Task, wins: int) -> None:
+        key = self.key(task)
+        self.results[key] = wins
+        if self.file:
+            self.file.write(json.dumps({"key": key, "wins": wins}) + "\n")
+            self.file.flush()
+
+    def close(self) -> None:
+        if self.file:
+            self.file.close()
+
+def sweep(candidates: List[Candidate], player_class: str, test: SequentialTest, cache: ResultCache, seed: int = 0,
+          policy: str = "random", batch_size: int = 50, max_games: int = 2000, encounters: int = 3, max_turns: int = 1000,
+          workers: int = 1) -> Iterator[Candidate]:
+    # Plays batches of games for every candidate still undecided, a batch each in turn so they all move
+    # along together, and yields each candidate once it has its verdict.
+    max_batches = math.ceil(max_games / batch_size)
+    executor = ProcessPoolExecutor(workers) if workers > 1 else None
+    pending: Dict[Future, Tuple[Candidate, Task]] = {}
+    try:
+        undecided = list(candidates)
+        while undecided:
+            for candidate in undecided:
+                if len(pending) >= 2 * workers or candidate.submitted == max_batches:
+                    continue
+                batch = candidate.submitted
+                candidate.submitted += 1
+                games = min(batch_size, max_games - batch * batch_size)
+                task = (player_class, policy, candidate.overrides, seed, batch, games, encounters, max_turns)
+                wins = cache.get(task)
+                if wins is None and executor:
+                    pending[executor.submit(run_batch, task)] = (candidate, task)
+                    continue
+                if wins is None:
+                    wins = run_batch(task)
+                    cache.add(task, wins)
+                candidate.finish(batch, wins, games, test, max_batches)
+            if pending:
+                done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    candidate, task = pending.pop(future)
+                    cache.add(task, future.result())
+                    candidate.finish(task[4], future.result(), task[5], test, max_batches)
+            yield from (candidate for candidate in undecided if candidate.verdict is not None)
+            undecided = [candidate for candidate in undecided if candidate.verdict is None]
+    finally:
+        if executor:
+            # batches started for candidates that have since been decided are not waited for
+            executor.shutdown(cancel_futures=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep balance parameters and find the settings whose win rate lands in a target band.",
+                                     epilog="Parameters are Class.attribute or Class.attribute.key, for example "
+                                            "PowerAttack.multiplier=1.5,2,2.5  SapMorale.debuff_effects.attack=-5:-2  "
+                                            "Warrior.starting_stats.constitution=13,15  MinorHeal.mp_cost=3,5")
+    parser.add_argument("player_class", choices=PLAYER_CLASSES.keys())
+    parser.add_argument("--param", action="append", default=[], metavar="PATH=VALUES", help="values to try, as 1,2,3 or a LOW:HIGH range (may be repeated)")
+    parser.add_argument("--random", type=int, metavar="N", help="try N random draws instead of the full grid")
+    parser.add_argument("--band", type=float, nargs=2, default=(0.6, 0.8), metavar=("LOW", "HIGH"), help="the win rates to aim for")
+    parser.add_argument("--encounters", type=int, default=3, help="a game is won by clearing this many encounters")
+    parser.add_argument("--policy", choices=POLICIES.keys(), default="random")
+    parser.add_argument("--batch", type=int, default=50, help="games played between looks at a candidate")
+    parser.add_argument("--max-games", type=int, default=2000, help="games per candidate before it is left undecided")
+    parser.add_argument("--alpha", type=float, default=0.05, help="chance of a wrong verdict on any one candidate")
+    parser.add_argument("--max-turns", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--cache", metavar="PATH", help="keep finished batches in this file and reuse any already there")
+    args = parser.parse_args()
+    try:
+        params = [parse_param(param) for param in args.param]
+        overrides = random_search(params, args.random, random.Random(args.seed)) if args.random else grid(params)
+        for candidate in overrides:
+            with overridden(dict(candidate)):
+                pass
+    except (ValueError, SyntaxError) as error:
+        parser.error(str(error))
+    test = SequentialTest(args.band[0], args.band[1], args.alpha, math.ceil(args.max_games / args.batch))
+    cache = ResultCache(args.cache)
+    candidates = [Candidate(candidate) for candidate in overrides]
+    print(f"{len(candidates)} candidates for {args.player_class}, aiming for {args.band[0]:.0%}-{args.band[1]:.0%} "
+          f"of games clearing {args.encounters} encounters")
+    try:
+        for candidate in sweep(candidates, args.player_class, test, cache, args.seed, args.policy, args.batch, args.max_games,
+                               args.encounters, args.max_turns, args.workers):
+            low, high = test.interval(candidate.wins, candidate.games)
+            print(f"{candidate.verdict:9} {candidate.win_rate:6.1%} [{low:5.1%}, {high:5.1%}] over {candidate.games:5} games  {candidate.describe()}")
+    finally:
+        cache.close()
+    middle = sum(args.band) / 2
+    inside = sorted((candidate for candidate in candidates if candidate.verdict == INSIDE), key=lambda candidate: abs(candidate.win_rate - middle))
+    print()
+    print(f"{len(inside)} of {len(candidates)} inside the band" + (f", closest to its middle: {inside[0].describe()}" if inside else ""))
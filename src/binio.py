@@ -0,0 +1,53 @@
+import struct
+from typing import BinaryIO, Tuple
+
+RNG_STATE = 625 # words in a Mersenne Twister state, including the position
+
+class FormatError(Exception): # saved data that cannot be read back; each file format's own error is one
+    pass
+
+def write_str(stream: BinaryIO, text: str) -> None:
+    data = text.encode()
+    stream.write(struct.pack("<H", len(data)))
+    stream.write(data)
+
+def read_str(stream: BinaryIO) -> str:
+    length, = read_struct(stream, "<H")
+    return read_bytes(stream, length).decode()
+
+def read_struct(stream: BinaryIO, layout: str) -> tuple:
+    return struct.unpack(layout, read_bytes(stream, struct.calcsize(layout)))
+
+def read_bytes(stream: BinaryIO, size: int) -> bytes:
+    data = stream.read(size)
+    if len(data) != size:
+        raise FormatError("data is truncated")
+    return data
+
+def varint(value: int) -> bytes: # LEB128: seven bits a byte, lowest first, the top bit set on all but the last
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+def read_varint(data: bytes, offset: int) -> Tuple[int, int]: # (value, offset just past it)
+    value = shift = 0
+    while True:
+        if offset >= len(data):
+            raise FormatError("data is truncated")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def write_generator(stream: BinaryIO, state: tuple) -> None: # a random.Random state, as from getstate
+    version, words, gauss_next = state
+    stream.write(struct.pack(f"<B{RNG_STATE}I?d", version, *words, gauss_next is not None, gauss_next or 0.0))
+
+def read_generator(stream: BinaryIO) -> tuple:
+    values = read_struct(stream, f"<B{RNG_STATE}I?d")
+    return (values[0], values[1:RNG_STATE + 1], values[RNG_STATE + 2] if values[RNG_STATE + 1] else None)
@@ -0,0 +1,5 @@
+def hit_chance(attack: float, defence: float) -> float:
+    # max means hit chance won't drop below 0.05, even once debuffs take attack to zero or below
+    if attack <= 0:
+        return 0.05
+    return max(0.5 + ((attack - defence) / (2.0 * attack)), 0.05)
@@ -0,0 +1,98 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+ALLIES = "allies" # the player's side
+ENEMIES = "enemies"
+
+Handle = Tuple[int, int] # (slot, generation)
+
+class CreatureStore:
+    # Every creature in play, packed densely so that walking them is a plain list walk. Removing one
+    # moves the last creature into its place, so insertion and removal are O(1) but order is not kept.
+    # A handle stays valid until its creature is removed; the slot's generation then moves on, so a
+    # stale handle finds nothing rather than whichever creature reuses the slot.
+    creatures: List["Creature"]
+    factions: Dict[str, List["Creature"]]
+    slots: List[Optional["Creature"]]
+    generations: List[int]
+    free: List[int]
+    dying: List[Tuple["Creature", Optional["Creature"]]] # (creature, killer) in the order they died
+
+    def __init__(self):
+        self.creatures = []
+        self.factions = {ALLIES: [], ENEMIES: []}
+        self.slots = []
+        self.generations = []
+        self.free = []
+        self.dying = []
+
+    def __len__(self) -> int:
+        return len(self.creatures)
+
+    def __iter__(self) -> Iterator["Creature"]:
+        return iter(self.creatures)
+
+    def __contains__(self, creature: "Creature") -> bool:
+        return creature.handle is not None and self.get(creature.handle) is creature
+
+    def faction(self, name: str) -> List["Creature"]: # a live view; change it through the store only
+        return self.factions[name]
+
+    def add(self, creature: "Creature") -> Handle:
+        if self.free:
+            slot = self.free.pop()
+            self.slots[slot] = creature
+        else:
+            slot = len(self.slots)
+            self.slots.append(creature)
+            self.generations.append(0)
+        creature.handle = (slot, self.generations[slot])
+        creature.store_index = len(self.creatures)
+        self.creatures.append(creature)
+        members = self.factions.setdefault(creature.faction, [])
+        creature.faction_index = len(members)
+        members.append(creature)
+        creature.dying = False
+        return creature.handle
+
+    def get(self, handle: Handle) -> Optional["Creature"]:
+        slot, generation = handle
+        if slot < len(self.slots) and self.generations[slot] == generation:
+            return self.slots[slot]
+        return None
+
+    def remove(self, creature: "Creature") -> None:
+        if creature not in self:
+            raise ValueError(f"{creature.name} is not in play")
+        slot = creature.handle[0]
+        self.slots[slot] = None
+        self.generations[slot] += 1
+        self.free.append(slot)
+        creature.handle = None
+        _swap_remove(self.creatures, creature.store_index, "store_index")
+        _swap_remove(self.factions[creature.faction], creature.faction_index, "faction_index")
+
+    def clear(self) -> None:
+        for creature in list(self.creatures):
+            self.remove(creature)
+        self.dying.clear()
+
+    def defer_death(self, creature: "Creature", killer: Optional["Creature"]) -> None:
+        # creatures stay in place until the action that killed them is over, so that nothing walking
+        # the store meanwhile skips one
+        if not creature.dying:
+            creature.dying = True
+            self.dying.append((creature, killer))
+
+    def process_deaths(self) -> None:
+        while self.dying:
+            dying, self.dying = self.dying, []
+            for creature, killer in dying:
+                if creature in self:
+                    self.remove(creature)
+                creature.settle_death(killer)
+
+def _swap_remove(creatures: List["Creature"], index: int, attribute: str) -> None:
+    last = creatures.pop()
+    if index < len(creatures):
+        creatures[index] = last
+        setattr(last, attribute, index)
@@ -0,0 +1,124 @@
+import math
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from .combat import hit_chance
+
+DAMAGE_CACHE_SIZE = 4096 # distinct (attack, defence, crit, power) tuples kept; a game uses a few dozen
+MATCHUP_CACHE_SIZE = 4096 # (attacker stats, action, defender stats) keys, which may share a distribution
+KILL_CACHE_SIZE = 4096
+
+matchups: "OrderedDict[tuple, DamageDistribution]" = OrderedDict() # least recently used first
+
+def truncated_uniform_pmf(low: float, high: float) -> Dict[int, float]:
+    # distribution of int(x) for x uniform on [low, high); int() truncates toward zero
+    if high <= low:
+        return {int(low): 1.0}
+    pmf: Dict[int, float] = {}
+    width = high - low
+    k = math.floor(low)
+    while k < high:
+        overlap = min(high, k + 1) - max(low, k)
+        if overlap > 0:
+            value = k if k >= 0 else k + 1
+            pmf[value] = pmf.get(value, 0.0) + overlap / width
+        k += 1
+    return pmf
+
+class DamageDistribution: # the exact chance of each amount of damage one attack deals, misses included
+    damages: Tuple[int, ...] # in increasing order
+    probabilities: Tuple[float, ...]
+    hit_chance: float
+    crit_chance: float
+    mean: float
+
+    def __init__(self, pmf: Dict[int, float], hit_chance: float, crit_chance: float):
+        self.damages = tuple(sorted(pmf))
+        self.probabilities = tuple(pmf[damage] for damage in self.damages)
+        self.hit_chance = hit_chance
+        self.crit_chance = crit_chance
+        self.mean = sum(damage * p for damage, p in zip(self.damages, self.probabilities))
+
+    def items(self) -> List[Tuple[int, float]]:
+        return list(zip(self.damages, self.probabilities))
+
+    def kill_chance(self, hp: float, attacks: int = 1) -> float: # the chance that this many attacks do at least hp
+        return kill_chance(self, math.ceil(hp), attacks)
+
+    def preview(self, hp: float) -> str:
+        return f"{self.mean:.1f} damage, {self.hit_chance:.0%} to hit, {self.kill_chance(hp):.0%} to kill"
+
+@lru_cache(maxsize=DAMAGE_CACHE_SIZE)
+def damage_distribution(attack: float, defence: float, crit_chance: float, crit_mult: float,
+                        base_power: float, variance: float) -> DamageDistribution:
+    # mirrors Creature.make_attack: a hit, then the power roll, then the crit, then int()
+    hit = min(hit_chance(attack, defence), 1.0)
+    crit = min(max(crit_chance, 0.0), 1.0)
+    low, high = base_power - variance / 2, base_power + variance / 2
+    pmf: Dict[int, float] = {0: 1.0 - hit}
+    for damage, p in truncated_uniform_pmf(low, high).items():
+        pmf[damage] = pmf.get(damage, 0.0) + hit * (1.0 - crit) * p
+    if crit > 0:
+        for damage, p in truncated_uniform_pmf(low * crit_mult, high * crit_mult).items():
+            pmf[damage] = pmf.get(damage, 0.0) + hit * crit * p
+    return DamageDistribution({damage: p for damage, p in pmf.items() if p > 0}, hit, crit)
+
+@contextmanager
+def with_effects(creature, effects: Dict[str, int]):
+    for modifier, amount in effects.items():
+        creature.modifiers[modifier] += amount
+    try:
+        yield
+    finally:
+        for modifier, amount in effects.items():
+            creature.modifiers[modifier] -= amount
+
+def stat_key(creature) -> tuple: # everything its derived stats are computed from
+    return (type(creature), creature.strength, creature.dexterity, creature.constitution, creature.intelligence,
+            *creature.modifiers.values())
+
+def attack_distribution(attacker, action, defender) -> DamageDistribution:
+    # for the creatures as they stand, modifiers included, and with the action's own debuffs on its target,
+    # which land before it strikes, as do its buffs on its user for those whose buffs come first
+    key = (stat_key(attacker), action, stat_key(defender))
+    distribution = matchups.get(key)
+    if distribution is not None:
+        matchups.move_to_end(key)
+        return distribution
+    buffs = getattr(action, "buff_effects", None) if attacker.buffs_first else None
+    debuffs = getattr(action, "debuff_effects", None)
+    if buffs or debuffs:
+        with with_effects(attacker, buffs or {}), with_effects(defender, debuffs or {}):
+            distribution = current_distribution(attacker, action, defender)
+    else:
+        distribution = current_distribution(attacker, action, defender)
+    matchups[key] = distribution
+    if len(matchups) > MATCHUP_CACHE_SIZE:
+        matchups.popitem(last=False)
+    return distribution
+
+def current_distribution(attacker, action, defender) -> DamageDistribution:
+    return damage_distribution(attacker.attack, defender.defence, attacker.crit_chance, attacker.crit_mult,
+                               action.base_power(attacker), action.power_variance(attacker))
+
+@lru_cache(maxsize=KILL_CACHE_SIZE)
+def kill_chance(distribution: DamageDistribution, hp: int, attacks: int) -> float:
+    # convolves the attacks one at a time, setting aside every total that reaches hp as it does,
+    # so only the totals short of it are carried on to the next attack
+    if hp <= 0:
+        return 1.0
+    totals = {0: 1.0}
+    killed = 0.0
+    for i in range(attacks):
+        after: Dict[int, float] = {}
+        for total, p in totals.items():
+            for damage, q in zip(distribution.damages, distribution.probabilities):
+                reached = total + damage
+                if reached >= hp:
+                    killed += p * q
+                else:
+                    after[reached] = after.get(reached, 0.0) + p * q
+        totals = after
+    return killed
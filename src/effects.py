@@ -0,0 +1,94 @@
+import heapq
+from typing import Hashable, List, Tuple
+
+STACK = "stack" # every application counts, and each one wears off on its own
+REFRESH = "refresh" # one effect per source and modifier on a creature; applying it again restarts it
+
+class Effect: # a modifier change on one creature, until the turn it expires
+    __slots__ = ("target", "modifier", "amount", "expires", "source", "stacking", "key", "active")
+    target: "Creature"
+    modifier: str
+    amount: int
+    expires: int # the turn at whose start it wears off
+    source: str # the name of the action that caused it
+    stacking: str
+    key: Hashable # its entry in target.effects
+    active: bool
+
+    def __init__(self, target: "Creature", modifier: str, amount: int, expires: int, source: str, stacking: str, key: Hashable):
+        self.target = target
+        self.modifier = modifier
+        self.amount = amount
+        self.expires = expires
+        self.source = source
+        self.stacking = stacking
+        self.key = key
+        self.active = True
+
+class EffectScheduler:
+    # Every timed effect in play, in a min-heap on the turn it expires, so a turn only touches the
+    # effects that run out in it however many are in play. Effects that end early (refreshed, or on a
+    # creature that left play) stay in the heap and are skipped when they come up; once those are most
+    # of the heap it is rebuilt without them.
+    heap: List[Tuple[int, int, Effect]] # (expires, order applied, effect)
+    applied: int
+    stale: int # entries in the heap whose effect already ended
+
+    def __init__(self):
+        self.heap = []
+        self.applied = 0
+        self.stale = 0
+
+    def __len__(self) -> int: # effects in play
+        return len(self.heap) - self.stale
+
+    def apply(self, target: "Creature", modifier: str, amount: int, expires: int, source: str, stacking: str = STACK) -> Effect:
+        if stacking == REFRESH:
+            key = (source, modifier)
+            old = target.effects.get(key)
+            if old is not None:
+                self.end(old)
+        elif stacking == STACK:
+            key = self.applied
+        else:
+            raise ValueError(f"unknown stacking rule {stacking}")
+        effect = Effect(target, modifier, amount, expires, source, stacking, key)
+        target.effects[key] = effect
+        target.modifiers[modifier] += amount
+        heapq.heappush(self.heap, (expires, self.applied, effect))
+        self.applied += 1
+        return effect
+
+    def expire(self, turn: int) -> None: # ends every effect due by the start of this turn
+        heap = self.heap
+        while heap and heap[0][0] <= turn:
+            effect = heapq.heappop(heap)[2]
+            if effect.active:
+                self._remove(effect)
+            else:
+                self.stale -= 1
+
+    def end(self, effect: Effect) -> None:
+        if effect.active:
+            self._remove(effect)
+            self.stale += 1
+            if self.stale > 64 and self.stale * 2 > len(self.heap):
+                self.heap = [entry for entry in self.heap if entry[2].active]
+                heapq.heapify(self.heap)
+                self.stale = 0
+
+    def dispel(self, target: "Creature") -> None: # ends every effect on a creature
+        for effect in list(target.effects.values()):
+            self.end(effect)
+
+    def clear(self) -> None:
+        for expires, applied, effect in self.heap:
+            if effect.active:
+                self._remove(effect)
+        self.heap = []
+        self.stale = 0
+
+    def _remove(self, effect: Effect) -> None:
+        effect.active = False
+        del effect.target.effects[effect.key]
+        effect.target.modifiers[effect.modifier] -= effect.amount
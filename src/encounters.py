@@ -0,0 +1,121 @@
+import argparse
+import random
+import time
+from collections import Counter, deque
+from itertools import islice
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple, Type
+
+from .abstract_classes import NPC, Player, Tracker
+from .enemies import Goblin, DarkMage, Shaman
+from .sampling import AliasTable
+
+ENEMY_CHANCES = {
+    Goblin: 10,
+    DarkMage: 3,
+    Shaman: 3
+}
+ENEMY_CLASSES = {cls.__name__: cls for cls in ENEMY_CHANCES}
+BUDGET_PER_POWER = 0.36 # enemy xp per point of power; a new character gets about the two enemies the fixed roll gave
+MAX_WAVE_SIZE = 6
+LOOKAHEAD = 2 # waves rolled before they are needed, counting the next one
+
+Wave = Tuple[Type[NPC], ...]
+
+def player_power(player: Player) -> float:
+    # every level up adds an attribute point, and the xp towards the next one counts for up to one more
+    return player.strength + player.dexterity + player.constitution + player.intelligence + player.xp / 100
+
+def default_budget(player: Player) -> float:
+    return player_power(player) * BUDGET_PER_POWER
+
+def roll_wave(rng: random.Random, table: AliasTable, budget: float) -> Wave:
+    # Draws enemies from the table and pays their xp out of a budget of half to one and a half times the
+    # one given, until the next one drawn does not fit. There is always at least one.
+    remaining = budget * (0.5 + rng.random())
+    wave = []
+    while len(wave) < MAX_WAVE_SIZE:
+        enemy = table.sample(rng)
+        if wave and enemy.xp > remaining:
+            break
+        wave.append(enemy)
+        remaining -= enemy.xp
+    return tuple(wave)
+
+def waves(rng: random.Random, weights: Dict[Type[NPC], float], budget: Callable[[], float]) -> Iterator[Wave]:
+    # an endless stream of waves, each rolled against whatever budget() says when it is reached
+    table = AliasTable(weights)
+    while True:
+        yield roll_wave(rng, table, budget())
+
+class EncounterPipeline:
+    # Rolls each game's waves ahead of time from the tracker's own generator. upcoming holds the next
+    # lookahead of them; the first is built as soon as the wave before it is in play, so once that one is
+    # cleared the next can be put straight in. A wave's budget is read from the player when it is rolled,
+    # which is up to lookahead encounters before it is fought. Put one on tracker.waves before the first
+    # encounter to change the weights, the budget or how far ahead it rolls.
+    tracker: Tracker
+    table: AliasTable
+    budget: Callable[[Player], float]
+    lookahead: int
+    upcoming: Deque[Wave]
+    ready: Optional[List[NPC]] # upcoming[0], already built, or None until it is
+
+    def __init__(self, tracker: Tracker, weights: Optional[Dict[Type[NPC], float]] = None,
+                 budget: Callable[[Player], float] = default_budget, lookahead: int = LOOKAHEAD):
+        self.tracker = tracker
+        self.table = AliasTable(weights or ENEMY_CHANCES)
+        self.budget = budget
+        self.lookahead = max(lookahead, 1)
+        self.upcoming = deque()
+        self.ready = None
+
+    def next_wave(self) -> List[NPC]:
+        if not self.upcoming:
+            self.roll()
+        wave = self.upcoming.popleft()
+        creatures, self.ready = self.ready or self.build(wave), None
+        return creatures
+
+    def prepare(self) -> None: # rolls up to lookahead waves and builds the first
+        while len(self.upcoming) < self.lookahead:
+            self.roll()
+        if self.ready is None:
+            self.ready = self.build(self.upcoming[0])
+
+    def roll(self) -> None:
+        self.upcoming.append(roll_wave(self.tracker.rng, self.table, self.budget(self.tracker.player)))
+
+    def build(self, wave: Wave) -> List[NPC]:
+        return [creature_class(self.tracker) for creature_class in wave]
+
+    def reset(self, upcoming: Tuple[Wave, ...]) -> None:
+        # for a restored game; the first wave is built again when it is needed, taking the same streams
+        self.upcoming = deque(upcoming)
+        self.ready = None
+
+def encounter_pipeline(tracker: Tracker) -> EncounterPipeline:
+    if tracker.waves is None:
+        tracker.waves = EncounterPipeline(tracker)
+    return tracker.waves
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Roll waves in bulk, in constant memory, and report what they hold.")
+    parser.add_argument("--count", type=int, default=1000000)
+    parser.add_argument("--power", type=float, default=47, help="player power to budget for (a new Warrior is 47)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    budget = args.power * BUDGET_PER_POWER
+    sizes: Counter = Counter()
+    enemies: Counter = Counter()
+    xp = 0
+    start = time.perf_counter()
+    for wave in islice(waves(random.Random(args.seed), ENEMY_CHANCES, lambda: budget), args.count):
+        sizes[len(wave)] += 1
+        enemies.update(wave)
+        xp += sum(enemy.xp for enemy in wave)
+    elapsed = time.perf_counter() - start
+    print(f"{args.count} waves at budget {budget:.1f} in {elapsed:.2f}s ({args.count / elapsed:.0f} waves/s)")
+    print(f"mean xp per wave: {xp / args.count:.2f}")
+    print("size:    " + "  ".join(f"{size}: {count / args.count:.1%}" for size, count in sorted(sizes.items())))
+    total = sum(enemies.values())
+    print("enemies: " + "  ".join(f"{enemy.__name__}: {count / total:.1%}" for enemy, count in enemies.most_common()))
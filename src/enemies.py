@@ -3,57 +3,42 @@ from .actions import *
 
 class Goblin(NPC):
     xp = 5
+    actions = {
+        BasicAttack("Stab"): 10,
+        SneakAttack(): 3,
+        Dodge(): 3,
+    }
+
+    starting_stats = {"strength": 7, "dexterity": 12, "constitution": 7, "intelligence": 5}
 
     def __init__(self, tracker: Tracker):
-        super().__init__(
-            name="Goblin",
-            strength=7,
-            dexterity=12,
-            constitution=7,
-            intelligence=5,
-            tracker=tracker
-        )
-        self.actions = {
-            BasicAttack(self, "Stab"): 10,
-            SneakAttack(self): 3,
-            Dodge(self): 3,
-        }
+        super().__init__(name="Goblin", tracker=tracker, **self.starting_stats)
 
 class DarkMage(NPC, SpellcasterMixin):
     xp = 10
+    actions = {
+        BasicAttack("Stab"): 3,
+        LightningBolt(): 5,
+        MagicBarrier(): 5,
+    }
+
+    starting_stats = {"strength": 7, "dexterity": 12, "constitution": 6, "intelligence": 12}
 
     def __init__(self, tracker: Tracker):
-        super().__init__(
-            name="Dark Mage",
-            strength=7,
-            dexterity=12,
-            constitution=6,
-            intelligence=12,
-            tracker=tracker
-        )
+        super().__init__(name="Dark Mage", tracker=tracker, **self.starting_stats)
         self.mp_current = self.mp_max
-        self.actions = {
-            BasicAttack(self, "Stab"): 3,
-            LightningBolt(self): 5,
-            MagicBarrier(self): 5,
-        }
 
 class Shaman(NPC, SpellcasterMixin):
     xp = 8
+    actions = {
+        BasicAttack("Strike"): 5,
+        MinorHeal(): 3,
+        SapMorale(): 5,
+        GroupHeal(): 3,
+    }
+
+    starting_stats = {"strength": 9, "dexterity": 9, "constitution": 8, "intelligence": 12}
 
     def __init__(self, tracker: Tracker):
-        super().__init__(
-            name="Shaman",
-            strength=9,
-            dexterity=9,
-            constitution=8,
-            intelligence=12,
-            tracker=tracker
-        )
+        super().__init__(name="Shaman", tracker=tracker, **self.starting_stats)
         self.mp_current = self.mp_max
-        self.actions = {
-            BasicAttack(self, "Strike"): 5,
-            MinorHeal(self): 3,
-            SapMorale(self): 5,
-            GroupHeal(self): 3,
-        }
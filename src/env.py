@@ -0,0 +1,247 @@
+import array
+import multiprocessing
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+from .abstract_classes import MODIFIER_NAMES, Action, Attack, Creature, Debuff, GameOver, Player, Policy, Spell, SpellcasterMixin, Tracker
+from .encounters import MAX_WAVE_SIZE
+from .game import ENEMY_CLASSES, new_encounter, play_turn
+from .rng import derive_seed
+
+MAX_ACTIONS = 4 # the most actions any class has
+MAX_ENEMIES = MAX_WAVE_SIZE # so every enemy in a wave is observed and targetable
+ENEMY_TYPES = list(ENEMY_CLASSES.values())
+# hp, hp_max, mp, mp_max, the four base stats, level, then each modifier
+PLAYER_FEATURES = 9 + len(MODIFIER_NAMES)
+# present, hp, hp_max, mp, then the class one-hot
+ENEMY_FEATURES = 4 + len(ENEMY_TYPES)
+OBSERVATION_SIZE = PLAYER_FEATURES + MAX_ENEMIES * ENEMY_FEATURES
+ACTION_COUNT = MAX_ACTIONS * MAX_ENEMIES # action index * MAX_ENEMIES + target index
+XP_REWARD = 0.01 # per xp gained
+DEATH_PENALTY = 1.0
+
+Observation = List[float]
+
+class EnvPolicy(Policy): # plays whatever move the environment was last given
+    action: Optional[Action]
+    target: int
+    level_up: str
+
+    def __init__(self, level_up: str):
+        self.action = None
+        self.target = 0
+        self.level_up = level_up
+
+    def choose_action(self, player: Player) -> Action:
+        return self.action
+
+    def choose_target(self, player: Player, action: Action, targets: List[Creature]) -> Creature:
+        return targets[self.target]
+
+    def choose_level_up(self, player: Player) -> str:
+        return self.level_up
+
+def targeted(action: Action) -> bool:
+    return isinstance(action, (Attack, Debuff)) and not action.is_multi_target
+
+def encode(tracker: Tracker, out: list) -> None: # appends the observation to out, which may be a list or an array
+    player = tracker.player
+    caster = isinstance(player, SpellcasterMixin)
+    out.extend((player.hp_current, player.hp_max, player.mp_current if caster else 0, player.mp_max if caster else 0,
+                player.strength, player.dexterity, player.constitution, player.intelligence, player.level))
+    out.extend(player.modifiers.values())
+    enemies = tracker.active_creatures[:MAX_ENEMIES]
+    for enemy in enemies:
+        out.extend((1, enemy.hp_current, enemy.hp_max, getattr(enemy, "mp_current", 0)))
+        out.extend([1 if type(enemy) is enemy_type else 0 for enemy_type in ENEMY_TYPES])
+    out.extend([0] * (ENEMY_FEATURES * (MAX_ENEMIES - len(enemies))))
+
+def action_mask(tracker: Tracker, out: list) -> None: # appends 1 for each legal action id and 0 for the rest
+    player = tracker.player
+    enemies = min(len(tracker.active_creatures), MAX_ENEMIES)
+    for index in range(MAX_ACTIONS):
+        if index >= len(player.actions):
+            out.extend([0] * MAX_ENEMIES)
+            continue
+        action = player.actions[index]
+        if isinstance(action, Spell) and isinstance(player, SpellcasterMixin) and action.mp_cost > player.mp_current:
+            out.extend([0] * MAX_ENEMIES)
+        elif targeted(action):
+            out.extend([1] * enemies + [0] * (MAX_ENEMIES - enemies))
+        else: # untargeted actions are played as target 0
+            out.extend([1] + [0] * (MAX_ENEMIES - 1))
+
+class DungeonEnv:
+    # One game as a reset/step environment, in the style of Gymnasium. An action id is the index into
+    # player.actions times MAX_ENEMIES plus the index of the target in tracker.active_creatures; the
+    # mask in info says which are legal. The reward is XP_REWARD per xp gained, less DEATH_PENALTY
+    # when the player dies. Level ups always go to the same attribute.
+    player_class: Type[Player]
+    seed: int
+    index: int # this game's place in a vector of them, which with the episode number picks its seeds
+    max_turns: int
+    episodes: int
+    tracker: Tracker
+    policy: EnvPolicy
+    total_xp: int
+
+    def __init__(self, player_class: Type[Player], seed: int = 0, index: int = 0, max_turns: int = 1000, level_up: str = "constitution"):
+        self.player_class = player_class
+        self.seed = seed
+        self.index = index
+        self.max_turns = max_turns
+        self.episodes = 0
+        self.policy = EnvPolicy(level_up)
+
+    def reset(self, seed: Optional[int] = None) -> Tuple[Observation, Dict]:
+        if seed is None:
+            seed = derive_seed(self.seed, "env", self.index, self.episodes)
+        self.episodes += 1
+        self.tracker = Tracker(seed, verbose=False)
+        player = self.player_class(self.player_class.__name__, self.tracker)
+        player.policy = self.policy
+        self.total_xp = 0
+        new_encounter(self.tracker)
+        return self.observe(), self.info()
+
+    def step(self, action: int) -> Tuple[Observation, float, bool, bool, Dict]:
+        # returns (observation, reward, terminated, truncated, info), as Gymnasium does
+        reward, terminated, truncated = self.advance(action)
+        return self.observe(), reward, terminated, truncated, self.info()
+
+    def advance(self, action: int) -> Tuple[float, bool, bool]:
+        tracker = self.tracker
+        player = tracker.player
+        index, target = divmod(action, MAX_ENEMIES)
+        mask = []
+        action_mask(tracker, mask)
+        if not 0 <= action < ACTION_COUNT or not mask[action]:
+            raise ValueError(f"action {action} is not legal now")
+        self.policy.action = player.actions[index]
+        self.policy.target = target
+        terminated = False
+        try:
+            play_turn(tracker)
+        except GameOver:
+            terminated = True
+        total_xp = player.xp + 100 * (player.level - 1)
+        reward = (total_xp - self.total_xp) * XP_REWARD - (DEATH_PENALTY if terminated else 0.0)
+        self.total_xp = total_xp
+        return reward, terminated, not terminated and tracker.turn >= self.max_turns
+
+    def observe(self) -> Observation:
+        observation = []
+        encode(self.tracker, observation)
+        return observation
+
+    def info(self) -> Dict:
+        mask = []
+        action_mask(self.tracker, mask)
+        return {"action_mask": mask, "turn": self.tracker.turn}
+
+class VectorEnv:
+    # Many independent games stepped together. Results come back as flat arrays, one row per game
+    # (observations are num_envs * OBSERVATION_SIZE, masks num_envs * ACTION_COUNT), which numpy can
+    # wrap without copying through np.frombuffer. A game that ends is reset straight away, so its row
+    # holds the first observation of the next episode.
+    envs: List[DungeonEnv]
+
+    def __init__(self, num_envs: int, player_class: Type[Player], seed: int = 0, max_turns: int = 1000, first: int = 0):
+        # first numbers the games, so a slice of a bigger vector plays the same games it would there
+        self.envs = [DungeonEnv(player_class, seed, first + i, max_turns) for i in range(num_envs)]
+
+    def __len__(self) -> int:
+        return len(self.envs)
+
+    def reset(self) -> Tuple[array.array, array.array]: # (observations, masks)
+        for env in self.envs:
+            env.reset()
+        return self.observations()
+
+    def step(self, actions: Sequence[int]) -> Tuple[array.array, array.array, array.array, array.array, array.array]:
+        # returns (observations, rewards, terminated, truncated, masks)
+        rewards = array.array("d")
+        terminated = array.array("b")
+        truncated = array.array("b")
+        for env, action in zip(self.envs, actions):
+            reward, ended, cut = env.advance(action)
+            rewards.append(reward)
+            terminated.append(ended)
+            truncated.append(cut)
+            if ended or cut:
+                env.reset()
+        observations, masks = self.observations()
+        return observations, rewards, terminated, truncated, masks
+
+    def observations(self) -> Tuple[array.array, array.array]:
+        observations = array.array("d")
+        masks = array.array("b")
+        for env in self.envs:
+            encode(env.tracker, observations)
+            action_mask(env.tracker, masks)
+        return observations, masks
+
+def serve_vector_env(connection, num_envs: int, player_class: Type[Player], seed: int, max_turns: int, first: int) -> None:
+    env = VectorEnv(num_envs, player_class, seed, max_turns, first)
+    while True:
+        command, data = connection.recv()
+        if command == "step":
+            connection.send(env.step(data))
+        elif command == "reset":
+            connection.send(env.reset())
+        else:
+            connection.close()
+            return
+
+class SubprocessVectorEnv:
+    # The same games as a VectorEnv of the same size and seed, split over worker processes that each
+    # step their share at once, so a batch uses every core. Results are joined in game order.
+    connections: list
+    processes: List[multiprocessing.Process]
+    sizes: List[int]
+
+    def __init__(self, num_envs: int, player_class: Type[Player], seed: int = 0, max_turns: int = 1000, workers: Optional[int] = None):
+        workers = min(workers or multiprocessing.cpu_count(), num_envs)
+        self.sizes = [num_envs // workers + (1 if i < num_envs % workers else 0) for i in range(workers)]
+        self.connections = []
+        self.processes = []
+        first = 0
+        for size in self.sizes:
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=serve_vector_env, args=(child, size, player_class, seed, max_turns, first), daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+            first += size
+
+    def __len__(self) -> int:
+        return sum(self.sizes)
+
+    def reset(self) -> Tuple[array.array, array.array]:
+        for connection in self.connections:
+            connection.send(("reset", None))
+        return self.gather()
+
+    def step(self, actions: Sequence[int]) -> Tuple[array.array, array.array, array.array, array.array, array.array]:
+        first = 0
+        for connection, size in zip(self.connections, self.sizes):
+            connection.send(("step", list(actions[first:first + size])))
+            first += size
+        return self.gather()
+
+    def gather(self) -> tuple:
+        results = [connection.recv() for connection in self.connections]
+        joined = results[0]
+        for result in results[1:]:
+            for whole, part in zip(joined, result):
+                whole.extend(part)
+        return joined
+
+    def close(self) -> None:
+        for connection in self.connections:
+            connection.send(("close", None))
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
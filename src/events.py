@@ -0,0 +1,278 @@
+import json
+import sys
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, TextIO
+
+
+class Event:
+    __slots__ = ()
+    kind: str
+
+    def describe(self) -> Optional[str]: # today's narration, or None for events that are not narrated
+        return None
+
+    def as_dict(self) -> Dict[str, Any]:
+        fields = {"event": self.kind}
+        for cls in type(self).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                fields[name] = getattr(self, name)
+        return fields
+
+class ActionUsed(Event):
+    __slots__ = ("actor", "action")
+    kind = "action"
+
+    def __init__(self, actor: str, action: str):
+        self.actor = actor
+        self.action = action
+
+    def describe(self):
+        return f"{self.actor} uses {self.action}"
+
+class AttackHit(Event):
+    __slots__ = ("attacker", "target", "action", "damage", "critical")
+    kind = "hit"
+
+    def __init__(self, attacker: str, target: str, action: str, damage: int, critical: bool):
+        self.attacker = attacker
+        self.target = target
+        self.action = action
+        self.damage = damage
+        self.critical = critical
+
+    def describe(self):
+        return f"{self.attacker} attacks {self.target} with {self.action} for {self.damage} damage"
+
+class AttackMissed(Event):
+    __slots__ = ("attacker", "target", "action")
+    kind = "miss"
+
+    def __init__(self, attacker: str, target: str, action: str):
+        self.attacker = attacker
+        self.target = target
+        self.action = action
+
+    def describe(self):
+        return f"{self.attacker} attacks {self.target} but misses"
+
+class DamageTaken(Event):
+    __slots__ = ("target", "damage", "hp")
+    kind = "damage"
+
+    def __init__(self, target: str, damage: int, hp: float):
+        self.target = target
+        self.damage = damage
+        self.hp = hp
+
+class Healed(Event):
+    __slots__ = ("healer", "target", "action", "amount")
+    kind = "heal"
+
+    def __init__(self, healer: str, target: str, action: str, amount: float):
+        self.healer = healer
+        self.target = target
+        self.action = action
+        self.amount = amount
+
+    def describe(self):
+        return f"{self.healer} heals {self.target} for {self.amount} hp"
+
+class Buffed(Event):
+    __slots__ = ("source", "target", "effect", "amount")
+    kind = "buff"
+
+    def __init__(self, source: str, target: str, effect: str, amount: int):
+        self.source = source
+        self.target = target
+        self.effect = effect
+        self.amount = amount
+
+    def describe(self):
+        return f"{self.source} buffs {self.effect} by {self.amount}"
+
+class Debuffed(Event):
+    __slots__ = ("source", "target", "effect", "amount")
+    kind = "debuff"
+
+    def __init__(self, source: str, target: str, effect: str, amount: int):
+        self.source = source
+        self.target = target
+        self.effect = effect
+        self.amount = amount
+
+    def describe(self):
+        return f"{self.source} debuffs {self.target}'s {self.effect} by {self.amount}"
+
+class Died(Event):
+    __slots__ = ("creature", "killer", "is_player")
+    kind = "death"
+
+    def __init__(self, creature: str, killer: Optional[str], is_player: bool):
+        self.creature = creature
+        self.killer = killer
+        self.is_player = is_player
+
+    def describe(self):
+        return "You are dead! Game over" if self.is_player else f"{self.creature} is dead"
+
+class Regenerated(Event):
+    __slots__ = ("creature", "resource", "amount")
+    kind = "regen"
+
+    def __init__(self, creature: str, resource: str, amount: int):
+        self.creature = creature
+        self.resource = resource
+        self.amount = amount
+
+    def describe(self):
+        return f"{self.creature} recovers {self.amount} {self.resource}"
+
+class XpGained(Event):
+    __slots__ = ("creature", "amount")
+    kind = "xp"
+
+    def __init__(self, creature: str, amount: int):
+        self.creature = creature
+        self.amount = amount
+
+    def describe(self):
+        return f"{self.creature} gained {self.amount} xp"
+
+class LevelledUp(Event):
+    __slots__ = ("creature", "attribute", "level")
+    kind = "level_up"
+
+    def __init__(self, creature: str, attribute: str, level: int):
+        self.creature = creature
+        self.attribute = attribute
+        self.level = level
+
+class SpellFailed(Event):
+    __slots__ = ("caster", "spell", "mp_cost", "mp_current")
+    kind = "spell_failed"
+
+    def __init__(self, caster: str, spell: str, mp_cost: int, mp_current: int):
+        self.caster = caster
+        self.spell = spell
+        self.mp_cost = mp_cost
+        self.mp_current = mp_current
+
+    def describe(self):
+        return f"Not enough mana! {self.spell} costs {self.mp_cost} and you have {self.mp_current}"
+
+class EncounterStarted(Event):
+    __slots__ = ("encounter",)
+    kind = "encounter"
+
+    def __init__(self, encounter: int):
+        self.encounter = encounter
+
+    def describe(self):
+        return "As you advance deeper into the dungeon, new enemies emerge to fight..."
+
+class Status(Event):
+    __slots__ = ("creature", "hp", "mp")
+    kind = "status"
+
+    def __init__(self, creature: str, hp: float, mp: Optional[int]):
+        self.creature = creature
+        self.hp = hp
+        self.mp = mp
+
+    def describe(self):
+        if self.mp is None:
+            return f'{self.creature} has {self.hp} hp.'
+        return f"{self.creature} has {self.hp} hp and {self.mp} mp"
+
+class TurnEnded(Event): # after the upkeep at the end of a turn, once the next turn's creatures are in play
+    __slots__ = ("turn",)
+    kind = "turn_end"
+
+    def __init__(self, turn: int):
+        self.turn = turn # turns played so far
+
+class Sink:
+    active: bool = True # sinks that ignore everything set this to False so events are not even built
+
+    def handle(self, event: Event) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+class NullSink(Sink):
+    active = False
+
+class TextSink(Sink): # renders events with the game's usual wording
+    stream: TextIO
+
+    def __init__(self, stream: Optional[TextIO] = None):
+        self.stream = stream
+
+    def handle(self, event: Event) -> None:
+        text = event.describe()
+        if text is not None:
+            print(text, file=self.stream or sys.stdout)
+
+class JsonLinesSink(Sink): # one JSON object per event, written in batches
+    stream: TextIO
+    buffer: List[str]
+    buffer_size: int
+
+    def __init__(self, stream: TextIO, buffer_size: int = 1000):
+        self.stream = stream
+        self.buffer = []
+        self.buffer_size = buffer_size
+
+    def handle(self, event: Event) -> None:
+        self.buffer.append(json.dumps(event.as_dict()))
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buffer:
+            self.stream.write("\n".join(self.buffer) + "\n")
+            self.buffer.clear()
+        self.stream.flush()
+
+class RingBufferSink(Sink): # keeps the most recent events in memory
+    events: Deque[Event]
+
+    def __init__(self, capacity: int = 1000):
+        self.events = deque(maxlen=capacity)
+
+    def handle(self, event: Event) -> None:
+        self.events.append(event)
+
+class EventBus:
+    sinks: List[Sink]
+    active: bool # False when no sink wants events, so callers can skip building them
+
+    def __init__(self, *sinks: Sink):
+        self.sinks = []
+        self.active = False
+        for sink in sinks:
+            self.subscribe(sink)
+
+    def subscribe(self, sink: Sink) -> None:
+        self.sinks.append(sink)
+        self.active = any(sink.active for sink in self.sinks)
+
+    def unsubscribe(self, sink: Sink) -> None:
+        self.sinks.remove(sink)
+        self.active = any(sink.active for sink in self.sinks)
+
+    def emit(self, event: Event) -> None:
+        for sink in self.sinks:
+            sink.handle(event)
+
+    def flush(self) -> None:
+        for sink in self.sinks:
+            sink.flush()
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
@@ -0,0 +1,92 @@
+import time
+from typing import Iterable, List, Type
+
+from .abstract_classes import NPC, Tracker
+from .encounters import ENEMY_CLASSES, encounter_pipeline
+from .events import EncounterStarted, TurnEnded
+
+def play_turn(tracker: Tracker):
+    profiler = tracker.profiler
+    if profiler.enabled:
+        start = time.perf_counter_ns()
+        play_round(tracker)
+        next_turn(tracker)
+        profiler.record_phase("turn", start)
+    else:
+        play_round(tracker)
+        next_turn(tracker)
+
+def play_round(tracker: Tracker): # everyone acts once, without the end of turn upkeep
+    if tracker.initiative is not None:
+        play_timeline(tracker)
+        return
+    tracker.player.choose_action()
+    play_creatures(tracker)
+
+def play_timeline(tracker: Tracker): # every act due this turn in initiative order, so some may act twice or not at all
+    # The round ends early once the encounter is cleared; acts still due stay on the timeline and come first in the next.
+    profiler = tracker.profiler
+    player = tracker.player
+    for creature in tracker.initiative.due(tracker.turn + 1):
+        if not tracker.active_creatures:
+            tracker.initiative.add(creature, tracker.initiative.now)
+            break
+        if profiler.enabled and creature is not player:
+            start = time.perf_counter_ns()
+            creature.choose_action()
+            profiler.record_phase("creature_turn", start)
+        else:
+            creature.choose_action()
+
+def play_creatures(tracker: Tracker):
+    profiler = tracker.profiler
+    for creature in tracker.active_creatures:
+        if profiler.enabled:
+            start = time.perf_counter_ns()
+            creature.choose_action()
+            profiler.record_phase("creature_turn", start)
+        else:
+            creature.choose_action()
+
+def next_turn(tracker: Tracker):
+    profiling = tracker.profiler.enabled
+    if profiling:
+        start = time.perf_counter_ns()
+    tracker.turn += 1
+    tracker.effects.expire(tracker.turn)
+    tracker.player.regen()
+    if tracker.events.active:
+        tracker.events.emit(tracker.player.status())
+        for creature in tracker.active_creatures:
+            tracker.events.emit(creature.status())
+    if profiling:
+        tracker.profiler.record_phase("upkeep", start)
+    if tracker.active_creatures == []:
+        new_encounter(tracker)
+    if tracker.events.active:
+        tracker.events.emit(TurnEnded(tracker.turn))
+
+def new_encounter(tracker: Tracker):
+    profiling = tracker.profiler.enabled
+    if profiling:
+        start = time.perf_counter_ns()
+    pipeline = encounter_pipeline(tracker)
+    place_encounter(tracker, pipeline.next_wave())
+    if profiling:
+        tracker.profiler.record_phase("new_encounter", start)
+        start = time.perf_counter_ns()
+    pipeline.prepare() # so the next wave is built and waiting by the time this one is cleared
+    if profiling:
+        tracker.profiler.record_phase("prepare_encounter", start)
+
+def spawn_encounter(tracker: Tracker, creature_classes: Iterable[Type[NPC]]): # a set encounter, rather than the next wave
+    place_encounter(tracker, [creature_class(tracker) for creature_class in creature_classes])
+
+def place_encounter(tracker: Tracker, creatures: List[NPC]):
+    tracker.encounters += 1
+    if tracker.events.active:
+        tracker.events.emit(EncounterStarted(tracker.encounters))
+    for creature in creatures:
+        if tracker.events.active:
+            tracker.events.emit(creature.status())
+        tracker.add_active_creature(creature)
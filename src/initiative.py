@@ -0,0 +1,44 @@
+import heapq
+from typing import Iterable, Iterator, List, Tuple
+
+BASE_SPEED = 12 # a creature this quick acts once a turn, one twice as quick twice a turn
+
+Entry = Tuple[float, float, int, "Creature"] # (time it acts, -speed, order scheduled, creature)
+
+class InitiativeScheduler:
+    # Who acts next, on a timeline measured in turns: a min-heap of each creature's next act, so an
+    # act costs O(log n) however many are in play. After acting a creature is put back BASE_SPEED /
+    # speed turns on, at its speed then. Ties go to the quicker creature, then to the one scheduled
+    # first. Creatures that die or leave play are not looked for: their entry is skipped when it
+    # comes up, which is within a few turns, as is any entry a creature no longer holds.
+    heap: List[Entry]
+    scheduled: int
+    now: float # when the last act was
+
+    def __init__(self, creatures: Iterable["Creature"] = (), now: float = 0.0):
+        self.heap = []
+        self.scheduled = 0
+        self.now = now
+        for creature in creatures:
+            self.add(creature, now)
+
+    def __len__(self) -> int: # entries, some of which may be stale
+        return len(self.heap)
+
+    def add(self, creature: "Creature", time: float) -> None:
+        # a creature joining at the start of a turn gets its first act in that turn
+        entry = (time, -creature.speed, self.scheduled, creature)
+        creature.timeline_entry = entry
+        heapq.heappush(self.heap, entry)
+        self.scheduled += 1
+
+    def due(self, end: float) -> Iterator["Creature"]: # each creature to act before end, in order
+        heap = self.heap
+        while heap and heap[0][0] < end:
+            entry = heapq.heappop(heap)
+            creature = entry[3]
+            if creature.timeline_entry is not entry or creature.handle is None:
+                continue
+            self.now = entry[0]
+            self.add(creature, self.now + BASE_SPEED / creature.speed)
+            yield creature
@@ -0,0 +1,222 @@
+import argparse
+import math
+import random
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .abstract_classes import Action, Attack, Creature, Debuff, GameOver, Player, Policy, Spell, SpellcasterMixin, Tracker
+from .game import play_turn
+from .policies import RandomPolicy
+from .simulator import PLAYER_CLASSES, Simulator
+from .snapshot import Snapshot
+
+Move = Tuple[int, Optional[int]] # (index into player.actions, index into active_creatures, or None if untargeted)
+Stats = List[List[float]] # [visits, total reward] per move
+
+class RolloutPolicy(RandomPolicy): # plays one scripted move, then random affordable moves
+    move: Optional[Move]
+    target: Optional[int]
+
+    def __init__(self, seed: Optional[int] = None):
+        super().__init__(seed)
+        self.move = None
+        self.target = None
+
+    def choose_action(self, player: Player) -> Action:
+        move, self.move = self.move, None
+        if move is None:
+            self.target = None
+            return super().choose_action(player)
+        self.target = move[1]
+        return player.actions[move[0]]
+
+    def choose_target(self, player: Player, action: Action, targets: List[Creature]) -> Creature:
+        if self.target is None:
+            return super().choose_target(player, action, targets)
+        target, self.target = targets[self.target], None
+        return target
+
+def legal_moves(player: Player, creatures: List[Creature]) -> List[Move]:
+    moves = []
+    for i, action in enumerate(player.actions):
+        if isinstance(action, Spell) and isinstance(player, SpellcasterMixin) and action.mp_cost > player.mp_current:
+            continue
+        if isinstance(action, (Attack, Debuff)) and not action.is_multi_target:
+            moves += [(i, target) for target in range(len(creatures))]
+        else:
+            moves.append((i, None))
+    return moves
+
+def state_key(snapshot: Snapshot) -> int:
+    # everything that decides how the fight goes from here, leaving out names, the turn counter and the generator
+    player = snapshot.player
+    effects = tuple([effect[:3] + (effect[3] - snapshot.turn,) + effect[4:] for effect in snapshot.effects])
+    return hash((player[0], player[2:], snapshot.xp, snapshot.level, effects,
+                 tuple([creature[0:1] + creature[2:] for creature in snapshot.creatures]), snapshot.weights))
+
+class Searcher: # runs rollouts from one snapshot, reusing a scratch game between them
+    scratch: Optional[Tracker]
+    policy: RolloutPolicy
+    rng: random.Random
+
+    def __init__(self, seed: Optional[int] = None):
+        self.scratch = None
+        self.policy = RolloutPolicy()
+        self.rng = random.Random(seed)
+
+    def rollout(self, snapshot: Snapshot, move: Move, depth: int) -> float:
+        # reward in [0, 1]: turns survived out of depth, with the hp left as the last part of a turn
+        self.scratch = tracker = snapshot.restore(self.scratch)
+        tracker.reseed(self.rng.getrandbits(64))
+        player = tracker.player
+        self.policy.rng.seed(self.rng.getrandbits(64))
+        self.policy.move = move
+        player.policy = self.policy
+        survived = 0
+        try:
+            while survived < depth:
+                play_turn(tracker)
+                survived += 1
+        except GameOver:
+            return survived / (depth + 1)
+        return (survived + min(max(player.hp_current / player.hp_max, 0.0), 1.0)) / (depth + 1)
+
+    def search(self, snapshot: Snapshot, moves: List[Move], priors: Stats, rollouts: int, seconds: Optional[float], depth: int, exploration: float) -> Stats:
+        # UCB1 over the moves, starting from what is already known about this state; returns only the new visits
+        stats = [[visits, total] for visits, total in priors]
+        new = [[0, 0.0] for move in moves]
+        deadline = None if seconds is None else time.perf_counter() + seconds
+        done = 0
+        while (deadline is None and done < rollouts) or (deadline is not None and time.perf_counter() < deadline):
+            visited = sum(visits for visits, total in stats)
+            best = max(range(len(moves)), key=lambda i: math.inf if stats[i][0] == 0 else
+                       stats[i][1] / stats[i][0] + exploration * math.sqrt(math.log(visited) / stats[i][0]))
+            reward = self.rollout(snapshot, moves[best], depth)
+            for entry in (stats[best], new[best]):
+                entry[0] += 1
+                entry[1] += reward
+            done += 1
+        return new
+
+_worker_searcher: Optional[Searcher] = None
+
+def search_in_worker(state: bytes, moves: List[Move], priors: Stats, rollouts: int, seconds: Optional[float], depth: int, exploration: float, seed: int) -> Stats:
+    global _worker_searcher
+    if _worker_searcher is None:
+        _worker_searcher = Searcher()
+    _worker_searcher.rng.seed(seed)
+    return _worker_searcher.search(Snapshot.from_bytes(state), moves, priors, rollouts, seconds, depth, exploration)
+
+class MCTSPolicy(Policy):
+    # Monte Carlo search over the player's moves with random rollouts through the real combat rules.
+    # Move statistics are kept in a transposition table keyed on the hashed game state, so a state
+    # that comes up again starts from what earlier searches learned about it.
+    rollouts: int # per decision, unless seconds is set
+    seconds: Optional[float] # per decision
+    depth: int # turns per rollout
+    exploration: float
+    table: Dict[int, Stats]
+    table_size: int
+    workers: int
+    executor: Optional[Executor]
+    searcher: Searcher
+    target: Optional[int]
+    decisions: int
+    thinking: float # seconds spent choosing actions
+
+    def __init__(self, rollouts: int = 200, seconds: Optional[float] = None, depth: int = 8, exploration: float = 0.5,
+                 seed: Optional[int] = None, workers: int = 0, executor: Optional[Executor] = None, table_size: int = 100000):
+        self.rollouts = rollouts
+        self.seconds = seconds
+        self.depth = depth
+        self.exploration = exploration
+        self.table = {}
+        self.table_size = table_size
+        self.workers = workers
+        self.executor = executor
+        self.searcher = Searcher(seed)
+        self.target = None
+        self.decisions = 0
+        self.thinking = 0.0
+
+    def choose_action(self, player: Player) -> Action:
+        start = time.perf_counter()
+        tracker = player.tracker
+        moves = legal_moves(player, tracker.active_creatures)
+        snapshot = Snapshot.capture(tracker, rng=False)
+        key = state_key(snapshot)
+        stats = self.table.get(key)
+        if stats is None or len(stats) != len(moves):
+            stats = [[0, 0.0] for move in moves]
+        if len(moves) > 1:
+            for i, found in enumerate(self.search(snapshot, moves, stats)):
+                stats[i][0] += found[0]
+                stats[i][1] += found[1]
+        if len(self.table) >= self.table_size:
+            self.table.clear()
+        self.table[key] = stats
+        action, self.target = moves[max(range(len(moves)), key=lambda i: stats[i][0])]
+        self.decisions += 1
+        self.thinking += time.perf_counter() - start
+        return player.actions[action]
+
+    def search(self, snapshot: Snapshot, moves: List[Move], priors: Stats) -> Stats:
+        if not self.workers:
+            return self.searcher.search(snapshot, moves, priors, self.rollouts, self.seconds, self.depth, self.exploration)
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.workers)
+        # each worker searches on its own share of the budget and the visits are added up afterwards
+        state = snapshot.to_bytes()
+        share = -(-self.rollouts // self.workers)
+        futures = [self.executor.submit(search_in_worker, state, moves, priors, share, self.seconds, self.depth, self.exploration,
+                                        self.searcher.rng.getrandbits(64)) for i in range(self.workers)]
+        total = [[0, 0.0] for move in moves]
+        for future in futures:
+            for entry, found in zip(total, future.result()):
+                entry[0] += found[0]
+                entry[1] += found[1]
+        return total
+
+    def choose_target(self, player: Player, action: Action, targets: List[Creature]) -> Creature:
+        return targets[self.target if self.target is not None and self.target < len(targets) else 0]
+
+    def choose_level_up(self, player: Player) -> str:
+        return "constitution"
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the search autopilot against the random policy.")
+    parser.add_argument("player_class", choices=PLAYER_CLASSES.keys())
+    parser.add_argument("games", type=int)
+    parser.add_argument("--rollouts", type=int, default=200, help="rollouts per decision")
+    parser.add_argument("--seconds", type=float, default=None, help="time per decision instead of a rollout count")
+    parser.add_argument("--depth", type=int, default=8, help="turns per rollout")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes for rollouts (0 runs them in this process)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=1000)
+    args = parser.parse_args()
+    player_class = PLAYER_CLASSES[args.player_class]
+    executor = ProcessPoolExecutor(args.workers) if args.workers else None
+    policies: List[MCTSPolicy] = []
+    def make_policy(seed: int) -> MCTSPolicy:
+        policy = MCTSPolicy(args.rollouts, args.seconds, args.depth, seed=seed, workers=args.workers, executor=executor)
+        policies.append(policy)
+        return policy
+    for name, factory in (("random", RandomPolicy), ("mcts", make_policy)):
+        start = time.perf_counter()
+        results = Simulator(player_class, factory, args.seed, args.max_turns).run(args.games)
+        elapsed = time.perf_counter() - start
+        turns = sorted(result.turns for result in results)
+        print(f"{name:6} mean turns survived {sum(turns) / len(turns):8.1f}  median {turns[len(turns) // 2]:5}  "
+              f"encounters cleared {sum(result.encounters_cleared for result in results) / len(results):6.2f}  in {elapsed:.1f}s")
+    decisions = sum(policy.decisions for policy in policies)
+    thinking = sum(policy.thinking for policy in policies)
+    print(f"mcts made {decisions} decisions at {decisions / thinking:.1f} decisions/s "
+          f"({args.rollouts if args.seconds is None else 'timed'} rollouts of {args.depth} turns each)")
+    if executor is not None:
+        executor.shutdown()
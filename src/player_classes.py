@@ -1,81 +1,66 @@
 from .abstract_classes import Player, SpellcasterMixin, Tracker
+from .stats import cached_stat
 from .actions import *
 
 class Warrior(Player):
+    actions = [
+        BasicAttack("Strike"),
+        PowerAttack(),
+        DefensiveStrike()
+    ]
+
+    starting_stats = {"strength": 15, "dexterity": 12, "constitution": 15, "intelligence": 5}
+
     def __init__(self, name: str, tracker: Tracker) -> None:
-        super().__init__(
-            name=name,
-            strength=15,
-            dexterity=12,
-            constitution=15,
-            intelligence=5,
-            tracker=tracker
-        )
-        self.actions = [
-            BasicAttack(self, "Strike"),
-            PowerAttack(self),
-            DefensiveStrike(self)
-        ]
+        super().__init__(name=name, tracker=tracker, **self.starting_stats)
 
 class Rogue(Player):
-    @property
+    actions = [
+        BasicAttack("Stab"),
+        SneakAttack(),
+        Dodge(),
+    ]
+
+    @cached_stat("crit_mult")
     def crit_mult(self):
         return 2 + (self.dexterity / 10.0) + self.modifiers["crit_mult"]
 
+    starting_stats = {"strength": 10, "dexterity": 20, "constitution": 10, "intelligence": 8}
+
     def __init__(self, name: str, tracker: Tracker) -> None:
-        super().__init__(
-            name=name,
-            strength=10,
-            dexterity=20,
-            constitution=10,
-            intelligence=8,
-            tracker=tracker
-        )
-        self.actions = [
-            BasicAttack(self, "Stab"),
-            SneakAttack(self),
-            Dodge(self),
-        ]
+        super().__init__(name=name, tracker=tracker, **self.starting_stats)
 
 class Mage(Player, SpellcasterMixin):
-    @property
+    actions = [
+        BasicAttack("Spark"),
+        LightningBolt(),
+        FireBall(),
+        MagicBarrier(),
+    ]
+
+    @cached_stat("attack")
     def attack(self):
         return ((self.intelligence + self.dexterity) / 2.0) + self.modifiers["attack"]
-    @property
+    @cached_stat("damage_base")
     def damage_base(self):
         return self.intelligence + (self.dexterity / 2.0) + self.modifiers["damage_base"]
 
+    starting_stats = {"strength": 5, "dexterity": 12, "constitution": 8, "intelligence": 20}
+
     def __init__(self, name: str, tracker: Tracker) -> None:
-        super().__init__(
-            name=name,
-            strength=5,
-            dexterity=12,
-            constitution=8,
-            intelligence=20,
-            tracker=tracker
-        )
+        super().__init__(name=name, tracker=tracker, **self.starting_stats)
         self.mp_current = self.mp_max
-        self.actions = [
-            BasicAttack(self, "Spark"),
-            LightningBolt(self),
-            FireBall(self),
-            MagicBarrier(self),
-        ]
 
 class Priest(Player, SpellcasterMixin):
+    actions = [
+        BasicAttack("Strike"),
+        MinorHeal(),
+        SapMorale(),
+        MajorHeal(),
+    ]
+
+    starting_stats = {"strength": 10, "dexterity": 10, "constitution": 10, "intelligence": 15}
+
     def __init__(self, name: str, tracker: Tracker) -> None:
-        super().__init__(
-            name=name,
-            strength=10,
-            dexterity=10,
-            constitution=10,
-            intelligence=15,
-            tracker=tracker
-        )
-        self.mp_current = self.mp_max
-        self.actions = [
-            BasicAttack(self, "Strike"),
-            MinorHeal(self),
-            SapMorale(self),
-            MajorHeal(self),
-        ]
\ No newline at end of file
+        super().__init__(name=name, tracker=tracker, **self.starting_stats)
+        self.mp_current = self.mp_max
\ No newline at end of file
@@ -0,0 +1,68 @@
+import random
+from typing import List, Optional
+
+from .abstract_classes import Action, Attack, Creature, Healing, Player, Policy, Spell, SpellcasterMixin, LEVEL_UP_ATTRIBUTES
+from .distributions import attack_distribution
+
+
+class RandomPolicy(Policy):
+    # uses its own generator so that the game's random stream does not depend on the policy
+    rng: random.Random
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+
+    def choose_action(self, player: Player) -> Action:
+        actions = player.actions
+        if isinstance(player, SpellcasterMixin):
+            actions = [action for action in actions if not isinstance(action, Spell) or action.mp_cost <= player.mp_current]
+        return self.rng.choice(actions)
+
+    def choose_target(self, player: Player, action: Action, targets: List[Creature]) -> Creature:
+        return self.rng.choice(targets)
+
+    def choose_level_up(self, player: Player) -> str:
+        return self.rng.choice(LEVEL_UP_ATTRIBUTES)
+
+class GreedyPolicy(Policy):
+    # Picks the attack and target with the best chance to kill this turn, then the most expected damage,
+    # from the memoized damage tables. Heals instead when below a third of its hp, if it can.
+    rng: random.Random # only for level ups
+    target: Optional[Creature] # picked along with the action
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+        self.target = None
+
+    def choose_action(self, player: Player) -> Action:
+        actions = player.actions
+        if isinstance(player, SpellcasterMixin):
+            actions = [action for action in actions if not isinstance(action, Spell) or action.mp_cost <= player.mp_current]
+        heals = [action for action in actions if isinstance(action, Healing)]
+        if heals and player.hp_current < player.hp_max / 3:
+            return max(heals, key=lambda action: action.base_power(player))
+        best, best_score = actions[0], None
+        self.target = None
+        for action in actions:
+            if not isinstance(action, Attack):
+                continue
+            targets = player.tracker.active_creatures
+            tables = [(target, attack_distribution(player, action, target)) for target in targets]
+            if action.is_multi_target:
+                options = [(None, sum(table.kill_chance(target.hp_current) for target, table in tables), sum(table.mean for target, table in tables))]
+            else:
+                options = [(target, table.kill_chance(target.hp_current), table.mean) for target, table in tables]
+            for target, kill, mean in options:
+                if best_score is None or (kill, mean) > best_score:
+                    best, best_score, self.target = action, (kill, mean), target
+        return best
+
+    def choose_target(self, player: Player, action: Action, targets: List[Creature]) -> Creature:
+        if self.target in targets:
+            return self.target
+        return max(targets, key=lambda target: attack_distribution(player, action, target).mean) if isinstance(action, Attack) else targets[0]
+
+    def choose_level_up(self, player: Player) -> str:
+        return self.rng.choice(LEVEL_UP_ATTRIBUTES)
+
+POLICIES = {"random": RandomPolicy, "greedy": GreedyPolicy} # the autopilots that need no more than a seed
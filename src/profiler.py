@@ -0,0 +1,81 @@
+import json
+import time
+from typing import Any, Dict, List, TextIO
+
+BUCKETS = 64 # bucket i holds durations of at most 2**i - 1 ns, by bit length; the last also holds anything longer
+
+class Histogram: # call count, total time and a power-of-two latency histogram, all in nanoseconds
+    __slots__ = ("count", "total", "buckets")
+    count: int
+    total: int
+    buckets: List[int]
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.buckets = [0] * BUCKETS
+
+    def add(self, duration: int) -> None:
+        self.count += 1
+        self.total += duration
+        self.buckets[min(duration.bit_length(), BUCKETS - 1)] += 1
+
+    def percentile(self, fraction: float) -> int: # an upper bound, to within a factor of two
+        remaining = fraction * self.count
+        for bucket, count in enumerate(self.buckets):
+            remaining -= count
+            if remaining <= 0 and count:
+                return (1 << bucket) - 1
+        return 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        last = max((bucket for bucket, count in enumerate(self.buckets) if count), default=-1)
+        return {"count": self.count, "total_ns": self.total, "mean_ns": self.total / self.count if self.count else 0.0,
+                "p50_ns": self.percentile(0.5), "p99_ns": self.percentile(0.99), "buckets": self.buckets[:last + 1]}
+
+class Profiler:
+    # Switched on and off at runtime through enabled. Every instrumented call site checks the flag
+    # before reading the clock, so a disabled profiler costs an attribute lookup and a branch.
+    enabled: bool
+    phases: Dict[str, Histogram] # turn phases, which nest: a creature's turn includes its do_action
+    actions: Dict[str, Histogram] # do_action, by action class
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.reset()
+
+    def reset(self) -> None:
+        self.phases = {}
+        self.actions = {}
+
+    def record_phase(self, phase: str, start: int) -> None:
+        duration = time.perf_counter_ns() - start
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = self.phases[phase] = Histogram()
+        histogram.add(duration)
+
+    def record_action(self, action: object, start: int) -> None:
+        duration = time.perf_counter_ns() - start
+        name = type(action).__name__
+        histogram = self.actions.get(name)
+        if histogram is None:
+            histogram = self.actions[name] = Histogram()
+        histogram.add(duration)
+        self.record_phase("do_action", start)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        return {"phases": {name: histogram.as_dict() for name, histogram in self.phases.items()},
+                "actions": {name: histogram.as_dict() for name, histogram in self.actions.items()}}
+
+    def export(self, stream: TextIO) -> None:
+        json.dump(self.snapshot(), stream, indent=2)
+
+    def report(self) -> str:
+        lines = [f"{'':22}{'calls':>10}{'total ms':>11}{'mean us':>10}{'p50 us':>9}{'p99 us':>9}"]
+        for title, histograms in (("phase", self.phases), ("action", self.actions)):
+            for name, histogram in sorted(histograms.items(), key=lambda item: -item[1].total):
+                stats = histogram.as_dict()
+                lines.append(f"{title + ' ' + name:22}{stats['count']:10}{stats['total_ns'] / 1e6:11.2f}{stats['mean_ns'] / 1e3:10.2f}"
+                             f"{stats['p50_ns'] / 1e3:9.2f}{stats['p99_ns'] / 1e3:9.2f}")
+        return "\n".join(lines)
@@ -0,0 +1,109 @@
+import sys
+from typing import List, Optional, TextIO
+
+from .events import Died, EncounterStarted, Event, Sink, Status, TurnEnded, XpGained
+
+class TerminalRenderer(Sink):
+    # Narrates like TextSink, but gathers each turn's text and writes it in a single call when the turn
+    # ends, so a fast game is not held up by one terminal write per line. For autoplay, every draws only
+    # each Nth turn and summaries only one line per encounter; the start of an encounter and the player's
+    # death are drawn regardless. With panel, everyone's hp and mp sit in a block at the bottom that is
+    # redrawn in place with ANSI cursor movement instead of scrolling past every turn.
+    stream: Optional[TextIO]
+    every: int
+    summaries: bool
+    panel: bool
+    lines: List[str] # the narration since the last draw
+    kept: List[str] # the part of it that is drawn even on turns that are skipped
+    pending: List[str] # the latest run of statuses, which makes up the next panel
+    listing: bool # whether the last event was a status, so the next one adds to the same run
+    statuses: List[str] # the panel as it is to be drawn
+    drawn: List[str] # the panel as it is on screen; empty once anything else was written below it
+    encounter: int
+    encounter_turns: int
+    defeated: int
+    xp: int
+
+    def __init__(self, stream: Optional[TextIO] = None, every: int = 1, summaries: bool = False, panel: bool = False):
+        self.stream = stream
+        self.every = every
+        self.summaries = summaries
+        self.panel = panel
+        self.lines = []
+        self.kept = []
+        self.pending = []
+        self.listing = False
+        self.statuses = []
+        self.drawn = []
+        self.encounter = 0
+        self.encounter_turns = 0
+        self.defeated = 0
+        self.xp = 0
+
+    def handle(self, event: Event) -> None:
+        if isinstance(event, TurnEnded):
+            self.encounter_turns += 1
+            self.draw(not self.summaries and event.turn % self.every == 0)
+            return
+        if isinstance(event, Status) and self.panel:
+            if not self.listing:
+                self.pending = []
+                self.listing = True
+            self.pending.append(event.describe())
+            return
+        # the statuses of a new encounter's enemies follow on from the end of turn ones
+        self.listing = self.listing and isinstance(event, EncounterStarted)
+        if isinstance(event, EncounterStarted):
+            if self.summaries and self.encounter:
+                self.kept.append(self.summary())
+            self.encounter = event.encounter
+            self.encounter_turns = self.defeated = self.xp = 0
+        elif isinstance(event, Died) and not event.is_player:
+            self.defeated += 1
+        elif isinstance(event, XpGained):
+            self.xp += event.amount
+        text = event.describe()
+        if text is None:
+            return
+        self.lines.append(text)
+        if isinstance(event, EncounterStarted) and not self.summaries:
+            self.kept.append(text)
+        elif isinstance(event, Died) and event.is_player:
+            if self.summaries:
+                self.kept.append(self.summary())
+            self.kept.append(text)
+            self.flush() # the game ends here, so nothing else would draw it
+
+    def summary(self) -> str:
+        return f"Encounter {self.encounter}: {self.defeated} defeated in {self.encounter_turns} turns, {self.xp} xp gained"
+
+    def draw(self, everything: bool) -> None:
+        lines = self.lines if everything else self.kept
+        if self.pending:
+            self.statuses, self.pending = self.pending, []
+        parts = []
+        if not self.panel:
+            parts = [line + "\n" for line in lines]
+        elif lines or len(self.statuses) != len(self.drawn):
+            if self.drawn: # back to the top of the old panel, and clear from there down
+                parts.append(f"\x1b[{len(self.drawn)}F\x1b[J")
+            parts += [line + "\n" for line in lines]
+            parts += [line + "\n" for line in self.statuses]
+        else:
+            for i, (old, new) in enumerate(zip(self.drawn, self.statuses)):
+                if old != new: # up to that line, rewrite it, and back down below the panel
+                    up = len(self.drawn) - i
+                    parts.append(f"\x1b[{up}F\x1b[2K{new}\x1b[{up}E")
+        self.drawn = self.statuses
+        self.lines = []
+        self.kept = []
+        if parts:
+            stream = self.stream or sys.stdout
+            stream.write("".join(parts))
+            stream.flush()
+
+    def flush(self) -> None:
+        # called before anything else writes to the terminal, such as a prompt, so the panel is drawn
+        # afresh below it next time
+        self.draw(not self.summaries)
+        self.drawn = []
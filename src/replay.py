@@ -0,0 +1,204 @@
+import argparse
+import struct
+import time
+from typing import BinaryIO, List, Tuple, Type
+
+from .abstract_classes import Action, Creature, GameOver, Player, Policy, Tracker, LEVEL_UP_ATTRIBUTES
+from .binio import FormatError, read_bytes, read_str, read_struct, read_varint, varint, write_str
+from .game import new_encounter, play_turn
+from .policies import RandomPolicy
+from .simulator import PLAYER_CLASSES
+from .snapshot import Snapshot
+
+MAGIC = b"SBRP"
+VERSION = 6
+ACTION, TARGET, LEVEL_UP = range(3) # decision kinds, in the low two bits of each decision
+
+class ReplayError(FormatError):
+    pass
+
+class Recording: # everything needed to reproduce a game: the seed, the player's decisions and periodic snapshots
+    player_class: str
+    player_name: str
+    seed: int
+    decisions: bytearray # a varint of choice << 2 | kind for each decision, in the order they were made
+    snapshots: List[Tuple[int, int, bytes]] # (turn, bytes of decisions made so far, packed state)
+
+    def __init__(self, player_class: str, player_name: str, seed: int):
+        self.player_class = player_class
+        self.player_name = player_name
+        self.seed = seed
+        self.decisions = bytearray()
+        self.snapshots = []
+
+    def add(self, kind: int, choice: int) -> None:
+        self.decisions += varint(choice << 2 | kind)
+
+    def decision_count(self) -> int: # the last byte of each varint is the only one below 0x80
+        return sum(byte < 0x80 for byte in self.decisions)
+
+    def save(self, stream: BinaryIO) -> None:
+        stream.write(struct.pack("<4sBQ", MAGIC, VERSION, self.seed))
+        write_str(stream, self.player_class)
+        write_str(stream, self.player_name)
+        stream.write(struct.pack("<I", len(self.decisions)))
+        stream.write(self.decisions)
+        stream.write(struct.pack("<I", len(self.snapshots)))
+        for turn, decision_count, state in self.snapshots:
+            stream.write(struct.pack("<III", turn, decision_count, len(state)))
+            stream.write(state)
+
+    @classmethod
+    def load(cls, stream: BinaryIO) -> "Recording":
+        magic, version, seed = read_struct(stream, "<4sBQ")
+        if magic != MAGIC or version != VERSION:
+            raise ReplayError("not a replay file, or written by an incompatible version")
+        recording = cls(read_str(stream), read_str(stream), seed)
+        length, = read_struct(stream, "<I")
+        recording.decisions = bytearray(read_bytes(stream, length))
+        snapshot_count, = read_struct(stream, "<I")
+        for i in range(snapshot_count):
+            turn, decisions_made, length = read_struct(stream, "<III")
+            recording.snapshots.append((turn, decisions_made, read_bytes(stream, length)))
+        return recording
+
+class RecordingPolicy(Policy): # passes decisions through from another policy and logs them
+    policy: Policy
+    recording: Recording
+
+    def __init__(self, policy: Policy, recording: Recording):
+        self.policy = policy
+        self.recording = recording
+
+    def choose_action(self, player: Player) -> Action:
+        action = self.policy.choose_action(player)
+        self.recording.add(ACTION, player.actions.index(action))
+        return action
+
+    def choose_target(self, player: Player, action: Action, targets: List[Creature]) -> Creature:
+        target = self.policy.choose_target(player, action, targets)
+        self.recording.add(TARGET, targets.index(target))
+        return target
+
+    def choose_level_up(self, player: Player) -> str:
+        attribute = self.policy.choose_level_up(player)
+        self.recording.add(LEVEL_UP, LEVEL_UP_ATTRIBUTES.index(attribute))
+        return attribute
+
+class ReplayPolicy(Policy): # feeds recorded decisions back in
+    decisions: bytearray
+    position: int # offset of the next decision, in bytes
+
+    def __init__(self, decisions: bytearray, position: int = 0):
+        self.decisions = decisions
+        self.position = position
+
+    def next_choice(self, kind: int) -> int:
+        if self.position >= len(self.decisions):
+            raise ReplayError("the recording ends here")
+        decision, position = read_varint(self.decisions, self.position)
+        if decision & 3 != kind:
+            raise ReplayError(f"replay diverged from the recording at byte {self.position} of its decisions")
+        self.position = position
+        return decision >> 2
+
+    def choose_action(self, player: Player) -> Action:
+        return player.actions[self.next_choice(ACTION)]
+
+    def choose_target(self, player: Player, action: Action, targets: List[Creature]) -> Creature:
+        return targets[self.next_choice(TARGET)]
+
+    def choose_level_up(self, player: Player) -> str:
+        return LEVEL_UP_ATTRIBUTES[self.next_choice(LEVEL_UP)]
+
+def record_game(player_class: Type[Player], policy: Policy, seed: int, snapshot_every: int = 100, max_turns: int = 10000) -> Recording:
+    tracker = Tracker(seed, verbose=False)
+    player = player_class(player_class.__name__, tracker)
+    recording = Recording(player_class.__name__, player.name, seed)
+    player.policy = RecordingPolicy(policy, recording)
+    try:
+        new_encounter(tracker)
+        recording.snapshots.append((tracker.turn, 0, pack_state(tracker)))
+        while tracker.turn < max_turns:
+            play_turn(tracker)
+            if tracker.turn % snapshot_every == 0:
+                recording.snapshots.append((tracker.turn, len(recording.decisions), pack_state(tracker)))
+    except GameOver:
+        pass
+    return recording
+
+class Replayer:
+    recording: Recording
+    tracker: Tracker
+    policy: ReplayPolicy
+    game_over: bool
+
+    def __init__(self, recording: Recording):
+        self.recording = recording
+        self.seek(0)
+
+    def seek(self, turn: int) -> Tracker:
+        # restore the latest snapshot at or before the turn, then play forward from there
+        snapshot = None
+        for candidate in self.recording.snapshots:
+            if candidate[0] > turn:
+                break
+            snapshot = candidate
+        if snapshot is None:
+            raise ReplayError("the recording has no snapshot to start from")
+        snapshot_turn, decisions_made, state = snapshot
+        self.tracker = unpack_state(state)
+        self.policy = ReplayPolicy(self.recording.decisions, decisions_made)
+        self.tracker.player.policy = self.policy
+        self.game_over = False
+        while self.tracker.turn < turn and not self.game_over:
+            self.step()
+        return self.tracker
+
+    def step(self) -> None:
+        try:
+            play_turn(self.tracker)
+        except GameOver:
+            self.game_over = True
+
+    def run(self) -> Tracker: # plays on until the player dies or the decisions run out
+        try:
+            while not self.game_over:
+                self.step()
+        except ReplayError:
+            pass
+        return self.tracker
+
+def pack_state(tracker: Tracker) -> bytes:
+    return Snapshot.capture(tracker).to_bytes()
+
+def unpack_state(state: bytes) -> Tracker:
+    return Snapshot.from_bytes(state).restore()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record a headless game, or replay a recorded one.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    record = subcommands.add_parser("record")
+    record.add_argument("player_class", choices=PLAYER_CLASSES.keys())
+    record.add_argument("path")
+    record.add_argument("--seed", type=int, default=0)
+    record.add_argument("--snapshot-every", type=int, default=100)
+    replay = subcommands.add_parser("replay")
+    replay.add_argument("path")
+    replay.add_argument("--turn", type=int, default=None, help="stop at this turn instead of the end")
+    args = parser.parse_args()
+    if args.command == "record":
+        recording = record_game(PLAYER_CLASSES[args.player_class], RandomPolicy(args.seed), args.seed, args.snapshot_every)
+        with open(args.path, "wb") as file:
+            recording.save(file)
+        print(f"recorded {recording.decision_count()} decisions in {len(recording.decisions)} bytes and {len(recording.snapshots)} snapshots")
+    else:
+        with open(args.path, "rb") as file:
+            replayer = Replayer(Recording.load(file))
+        start = time.perf_counter()
+        tracker = replayer.run() if args.turn is None else replayer.seek(args.turn)
+        elapsed = time.perf_counter() - start
+        print(f"turn {tracker.turn} reached in {elapsed * 1000:.1f}ms")
+        print(tracker.player.describe())
+        for creature in tracker.active_creatures:
+            print(creature.describe())
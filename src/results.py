@@ -0,0 +1,247 @@
+import argparse
+import sqlite3
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .events import ActionUsed, AttackHit, AttackMissed, Died, EncounterStarted, Event, Healed, Sink, TurnEnded, XpGained
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run INTEGER PRIMARY KEY, label TEXT, player_class TEXT, seed INTEGER, max_turns INTEGER, created REAL
+);
+CREATE TABLE IF NOT EXISTS games (
+    run INTEGER, game INTEGER, player_class TEXT, seed TEXT, turns INTEGER, encounters_cleared INTEGER,
+    xp INTEGER, level INTEGER, cause_of_death TEXT
+);
+CREATE TABLE IF NOT EXISTS encounters (
+    run INTEGER, game INTEGER, encounter INTEGER, turns INTEGER, defeated INTEGER, xp INTEGER,
+    damage_dealt INTEGER, damage_taken INTEGER, outcome TEXT
+);
+CREATE TABLE IF NOT EXISTS actions (
+    run INTEGER, game INTEGER, encounter INTEGER, side TEXT, actor TEXT, action TEXT,
+    uses INTEGER, hits INTEGER, misses INTEGER, damage INTEGER, healing REAL
+);
+"""
+
+CLEARED = "cleared"
+DIED = "died"
+UNFINISHED = "unfinished" # the game hit its turn limit during this encounter
+
+class ActionStats: # one creature type's use of one action over an encounter
+    __slots__ = ("uses", "hits", "misses", "damage", "healing")
+    uses: int
+    hits: int
+    misses: int
+    damage: int
+    healing: float
+
+    def __init__(self):
+        self.uses = self.hits = self.misses = self.damage = 0
+        self.healing = 0.0
+
+class EncounterStats:
+    encounter: int
+    start: int # turns played before it began
+    turns: int
+    defeated: int
+    xp: int
+    damage_dealt: int
+    damage_taken: int
+    outcome: Optional[str] # None while it is being fought
+    actions: Dict[Tuple[str, str, str], ActionStats] # by (side, actor, action)
+
+    def __init__(self, encounter: int, start: int):
+        self.encounter = encounter
+        self.start = start
+        self.turns = 0
+        self.defeated = 0
+        self.xp = 0
+        self.damage_dealt = 0
+        self.damage_taken = 0
+        self.outcome = None
+        self.actions = {}
+
+    def end(self, outcome: str, turn: int) -> None:
+        self.outcome = outcome
+        self.turns = turn - self.start
+
+class GameStats(Sink): # tallies one game's events into an EncounterStats per encounter
+    player: str
+    encounters: List[EncounterStats]
+    current: Optional[EncounterStats]
+    turn: int # turns played so far
+    handlers: Dict[type, Callable[["GameStats", Event], None]]
+
+    def __init__(self, player: str):
+        self.player = player
+        self.encounters = []
+        self.current = None
+        self.turn = 0
+
+    def tally(self, actor: str, action: str) -> ActionStats:
+        key = ("player" if actor == self.player else "enemy", actor, action)
+        stats = self.current.actions.get(key)
+        if stats is None:
+            stats = self.current.actions[key] = ActionStats()
+        return stats
+
+    def handle(self, event: Event) -> None:
+        handler = self.handlers.get(type(event)) # by exact type, which is cheaper than a chain of isinstance
+        if handler is not None and (self.current is not None or handler is GameStats.encounter_started):
+            handler(self, event)
+
+    def turn_ended(self, event: TurnEnded) -> None:
+        self.turn = event.turn
+
+    def encounter_started(self, event: EncounterStarted) -> None:
+        # a later encounter starts in the upkeep of the turn that cleared the last, before it has ended
+        start = self.turn
+        if self.current is not None:
+            start += 1
+            self.current.end(CLEARED, start)
+        self.current = EncounterStats(event.encounter, start)
+        self.encounters.append(self.current)
+
+    def action_used(self, event: ActionUsed) -> None:
+        self.tally(event.actor, event.action).uses += 1
+
+    def attack_hit(self, event: AttackHit) -> None:
+        stats = self.tally(event.attacker, event.action)
+        stats.hits += 1
+        stats.damage += event.damage
+        if event.target == self.player:
+            self.current.damage_taken += event.damage
+        else:
+            self.current.damage_dealt += event.damage
+
+    def attack_missed(self, event: AttackMissed) -> None:
+        self.tally(event.attacker, event.action).misses += 1
+
+    def healed(self, event: Healed) -> None:
+        self.tally(event.healer, event.action).healing += event.amount
+
+    def xp_gained(self, event: XpGained) -> None:
+        self.current.xp += event.amount
+
+    def died(self, event: Died) -> None:
+        if event.is_player: # partway through a turn, which like the game's turns is not counted
+            self.current.end(DIED, self.turn)
+        else:
+            self.current.defeated += 1
+
+    handlers = {TurnEnded: turn_ended, EncounterStarted: encounter_started, ActionUsed: action_used, AttackHit: attack_hit,
+                AttackMissed: attack_missed, Healed: healed, XpGained: xp_gained, Died: died}
+
+    def finish(self) -> List[EncounterStats]: # once the game is over, for however it ended
+        if self.current is not None and self.current.outcome is None:
+            self.current.end(UNFINISHED, self.turn)
+        return self.encounters
+
+class ResultsStore:
+    # Simulation results in a SQLite file that is only ever appended to: each run adds a row to runs,
+    # then a row per game, per encounter, and per action used in each encounter. Rows are held back
+    # and written batch_size games at a time, in one transaction, so a long run is not slowed by a
+    # commit per game. Aggregates are computed by SQLite, a row at a time, however big the file gets.
+    connection: sqlite3.Connection
+    batch_size: int
+    games: List[tuple]
+    encounters: List[tuple]
+    actions: List[tuple]
+
+    def __init__(self, path: str, batch_size: int = 1000):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.batch_size = batch_size
+        self.games = []
+        self.encounters = []
+        self.actions = []
+
+    def start_run(self, player_class: str, seed: int, max_turns: int, label: Optional[str] = None) -> int:
+        with self.connection:
+            cursor = self.connection.execute("INSERT INTO runs (label, player_class, seed, max_turns, created) VALUES (?, ?, ?, ?, ?)",
+                                             (label, player_class, seed, max_turns, time.time()))
+        return cursor.lastrowid
+
+    def add(self, run: int, game: int, result) -> None: # result is a simulator GameResult, played with record on
+        # game seeds use all 64 bits, past what an SQLite integer holds
+        self.games.append((run, game, result.player_class, str(result.seed), result.turns, result.encounters_cleared,
+                           result.xp, result.level, result.cause_of_death))
+        for encounter in result.encounters or ():
+            self.encounters.append((run, game, encounter.encounter, encounter.turns, encounter.defeated, encounter.xp,
+                                    encounter.damage_dealt, encounter.damage_taken, encounter.outcome))
+            for (side, actor, action), stats in encounter.actions.items():
+                self.actions.append((run, game, encounter.encounter, side, actor, action,
+                                     stats.uses, stats.hits, stats.misses, stats.damage, stats.healing))
+        if len(self.games) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        with self.connection:
+            self.connection.executemany("INSERT INTO games VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", self.games)
+            self.connection.executemany("INSERT INTO encounters VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", self.encounters)
+            self.connection.executemany("INSERT INTO actions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self.actions)
+        self.games.clear()
+        self.encounters.clear()
+        self.actions.clear()
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
+
+    def query(self, sql: str, runs: Optional[List[int]] = None) -> Iterable[tuple]:
+        # sql has a {where} where the run filter goes, which is empty for every run
+        where = f"WHERE run IN ({', '.join('?' * len(runs))})" if runs else ""
+        return self.connection.execute(sql.format(where=where), runs or ())
+
+    def class_summary(self, runs: Optional[List[int]] = None) -> Iterable[tuple]:
+        # per player class: games, deaths, mean turns, mean encounters cleared, mean level
+        return self.query("""SELECT player_class, COUNT(*), COUNT(cause_of_death), AVG(turns), AVG(encounters_cleared), AVG(level)
+                             FROM games {where} GROUP BY player_class ORDER BY player_class""", runs)
+
+    def encounter_summary(self, runs: Optional[List[int]] = None) -> Iterable[tuple]:
+        # per player class: encounters fought and won, mean turns and damage each way over those fought to the end
+        return self.query("""SELECT runs.player_class, COUNT(*), SUM(outcome = 'cleared'),
+                                    AVG(CASE WHEN outcome != 'unfinished' THEN turns END),
+                                    AVG(CASE WHEN outcome != 'unfinished' THEN damage_dealt END),
+                                    AVG(CASE WHEN outcome != 'unfinished' THEN damage_taken END)
+                             FROM (SELECT * FROM encounters {where}) JOIN runs USING (run)
+                             GROUP BY runs.player_class ORDER BY runs.player_class""", runs)
+
+    def action_summary(self, runs: Optional[List[int]] = None) -> Iterable[tuple]:
+        # per side, actor and action: uses, hits, misses, damage and healing, over every run given
+        return self.query("""SELECT side, actor, action, SUM(uses), SUM(hits), SUM(misses), SUM(damage), SUM(healing)
+                             FROM actions {where} GROUP BY side, actor, action ORDER BY side DESC, actor, SUM(damage) DESC""", runs)
+
+    def run_list(self) -> Iterable[tuple]:
+        return self.connection.execute("""SELECT run, label, player_class, seed, max_turns, created,
+                                                 (SELECT COUNT(*) FROM games WHERE games.run = runs.run)
+                                          FROM runs ORDER BY run""")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate the games in a results file written by the simulator's --results.")
+    parser.add_argument("path")
+    parser.add_argument("--run", type=int, action="append", dest="runs", help="only count this run (may be repeated)")
+    parser.add_argument("--runs", action="store_true", dest="list_runs", help="list the runs in the file and stop")
+    args = parser.parse_args()
+    store = ResultsStore(args.path)
+    if args.list_runs:
+        for run, label, player_class, seed, max_turns, created, games in store.run_list():
+            when = time.strftime("%Y-%m-%d %H:%M", time.localtime(created))
+            print(f"{run:4}  {when}  {player_class:8} seed {seed:<6} {games:8} games  max {max_turns} turns  {label or ''}")
+        exit(0)
+    print(f"{'class':8} {'games':>8} {'survived':>9} {'turns':>8} {'cleared':>8} {'level':>6}")
+    for player_class, games, deaths, turns, cleared, level in store.class_summary(args.runs):
+        print(f"{player_class:8} {games:8} {1 - deaths / games:9.2%} {turns:8.1f} {cleared:8.2f} {level:6.2f}")
+    print()
+    print(f"{'class':8} {'encounters':>10} {'won':>8} {'turns':>7} {'dealt':>7} {'taken':>7}")
+    for player_class, fought, won, turns, dealt, taken in store.encounter_summary(args.runs):
+        print(f"{player_class:8} {fought:10} {won / fought:8.2%} {turns or 0:7.1f} {dealt or 0:7.1f} {taken or 0:7.1f}")
+    print()
+    print(f"{'side':6} {'actor':9} {'action':16} {'uses':>9} {'hit rate':>8} {'damage':>11} {'per use':>8} {'healing':>10}")
+    for side, actor, action, uses, hits, misses, damage, healing in store.action_summary(args.runs):
+        attacks = hits + misses
+        hit_rate = f"{hits / attacks:8.2%}" if attacks else f"{'-':>8}"
+        print(f"{side:6} {actor:9} {action:16} {uses:9} {hit_rate} {damage:11} {damage / uses if uses else 0:8.2f} {healing:10.0f}")
+    store.connection.close()
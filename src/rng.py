@@ -0,0 +1,35 @@
+import hashlib
+import random
+from typing import Hashable, Iterable, Optional, Tuple
+
+SEED_MASK = (1 << 64) - 1 # seeds are kept to 64 bits, so that snapshots can store them
+
+def derive_seed(seed: int, *key: Hashable) -> int:
+    # the same in every process and on every run, unlike hash()
+    return int.from_bytes(hashlib.blake2b(repr((seed,) + key).encode(), digest_size=8).digest(), "little")
+
+class RngService:
+    # Independent random streams for one game, each seeded from the game's seed and the stream's key, so
+    # what one creature draws never shifts what another one does, and a seed plays the same game however
+    # a run's games are spread over workers. The streams are plain random.Random: a draw is one call
+    # into C, which in CPython is cheaper than reading from a buffer that Python code refills.
+    seed: int
+    game: random.Random # encounters and anything else no creature owns
+    spawned: int # creature streams handed out, which numbers the next one
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = random.getrandbits(64) if seed is None else seed & SEED_MASK
+        self.game = random.Random(derive_seed(self.seed, "game"))
+        self.spawned = 0
+
+    def spawn(self) -> Tuple[int, random.Random]: # (serial, stream) for a new creature
+        serial = self.spawned
+        self.spawned += 1
+        return serial, random.Random(derive_seed(self.seed, "creature", serial))
+
+    def reseed(self, seed: int, creatures: Iterable["Creature"]) -> None:
+        # starts every stream over from a new seed, including those of the creatures given
+        self.seed = seed & SEED_MASK
+        self.game.seed(derive_seed(self.seed, "game"))
+        for creature in creatures:
+            creature.rng.seed(derive_seed(self.seed, "creature", creature.serial))
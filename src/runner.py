@@ -0,0 +1,192 @@
+import argparse
+import io
+import os
+import struct
+import time
+from collections import Counter
+from typing import BinaryIO, List, Optional, Type
+
+from .abstract_classes import GameOver, Player, Tracker, LEVEL_UP_ATTRIBUTES
+from .binio import FormatError, read_bytes, read_generator, read_str, read_struct, write_generator, write_str
+from .game import new_encounter, play_turn
+from .policies import POLICIES
+from .rng import derive_seed
+from .simulator import PLAYER_CLASSES, GameResult
+from .snapshot import Snapshot
+
+MAGIC = b"SBCK"
+VERSION = 1
+
+class CheckpointError(FormatError):
+    pass
+
+class Checkpoint: # where a run is: what it was started with, the policy's generator, its level ups and the game state
+    seed: int
+    policy: str
+    policy_state: tuple
+    level_ups: List[str]
+    state: bytes # a packed Snapshot, with the generators
+
+    def __init__(self, seed: int, policy: str, policy_state: tuple, level_ups: List[str], state: bytes):
+        self.seed = seed
+        self.policy = policy
+        self.policy_state = policy_state
+        self.level_ups = level_ups
+        self.state = state
+
+    def save(self, stream: BinaryIO) -> None:
+        stream.write(struct.pack("<4sBQ", MAGIC, VERSION, self.seed))
+        write_str(stream, self.policy)
+        write_generator(stream, self.policy_state)
+        stream.write(struct.pack("<I", len(self.level_ups)))
+        stream.write(bytes([LEVEL_UP_ATTRIBUTES.index(attribute) for attribute in self.level_ups]))
+        stream.write(struct.pack("<I", len(self.state)))
+        stream.write(self.state)
+
+    @classmethod
+    def load(cls, stream: BinaryIO) -> "Checkpoint":
+        magic, version, seed = read_struct(stream, "<4sBQ")
+        if magic != MAGIC or version != VERSION:
+            raise CheckpointError("not a checkpoint, or written by an incompatible version")
+        policy = read_str(stream)
+        policy_state = read_generator(stream)
+        level_up_count, = read_struct(stream, "<I")
+        indices = read_bytes(stream, level_up_count)
+        if any(index >= len(LEVEL_UP_ATTRIBUTES) for index in indices):
+            raise CheckpointError("checkpoint has a level up this game does not know")
+        length, = read_struct(stream, "<I")
+        return cls(seed, policy, policy_state, [LEVEL_UP_ATTRIBUTES[index] for index in indices], read_bytes(stream, length))
+
+    def to_bytes(self) -> bytes:
+        stream = io.BytesIO()
+        self.save(stream)
+        return stream.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Checkpoint":
+        return cls.load(io.BytesIO(data))
+
+def write_atomically(path: str, data: bytes, fsync: bool = False) -> None:
+    # the old file stays whole until the new one has been written in full beside it and renamed over it;
+    # fsync makes that hold through a power cut too, and not only a crash, at a few milliseconds a time
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        file.write(data)
+        if fsync:
+            file.flush()
+            os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+class RunController:
+    # Plays one autopiloted game for as long as it lasts, headless, and hands back how it ended as a
+    # GameResult, death included. Every every_turns turns and every every_encounters encounters (0 for
+    # never) it writes a checkpoint to path, and when it stops at max_turns, so a controller started on
+    # a path that already holds one carries the run on from there, if it was started with the same seed
+    # and policy. A resumed run plays out exactly as it would have without the stop. A run that ends in
+    # death deletes its checkpoint, so the next controller on the path starts a new one.
+    player_class: Type[Player]
+    policy: str
+    seed: int
+    path: Optional[str]
+    every_turns: int
+    every_encounters: int
+    max_turns: Optional[int]
+    fsync: bool
+    tracker: Tracker
+    checkpoints: int # written by this controller
+    resumed_from: Optional[int] # the turn of the checkpoint it started from, if it did
+
+    def __init__(self, player_class: Type[Player], policy: str = "random", seed: int = 0, path: Optional[str] = None,
+                 every_turns: int = 1000, every_encounters: int = 0, max_turns: Optional[int] = None, fsync: bool = False):
+        self.player_class = player_class
+        self.policy = policy
+        self.seed = seed
+        self.path = path
+        self.every_turns = every_turns
+        self.every_encounters = every_encounters
+        self.max_turns = max_turns
+        self.fsync = fsync
+        self.checkpoints = 0
+        self.resumed_from = None
+        if path is not None and os.path.exists(path):
+            with open(path, "rb") as file:
+                self.resume(Checkpoint.load(file))
+        else:
+            self.tracker = Tracker(seed, verbose=False)
+            player = player_class(player_class.__name__, self.tracker)
+            player.policy = POLICIES[policy](derive_seed(seed, "policy"))
+
+    def resume(self, checkpoint: Checkpoint) -> None:
+        self.tracker = Snapshot.from_bytes(checkpoint.state).restore()
+        player = self.tracker.player
+        if type(player) is not self.player_class:
+            raise CheckpointError(f"checkpoint is of a {type(player).__name__}, not a {self.player_class.__name__}")
+        if checkpoint.seed != self.seed or checkpoint.policy != self.policy:
+            raise CheckpointError(f"checkpoint is of a run with seed {checkpoint.seed} and policy {checkpoint.policy}, "
+                                  f"not seed {self.seed} and policy {self.policy}")
+        player.policy = POLICIES[checkpoint.policy]()
+        player.policy.rng.setstate(checkpoint.policy_state)
+        player.level_ups = checkpoint.level_ups
+        self.resumed_from = self.tracker.turn
+
+    def checkpoint(self) -> None:
+        player = self.tracker.player
+        checkpoint = Checkpoint(self.seed, self.policy, player.policy.rng.getstate(), player.level_ups,
+                                Snapshot.capture(self.tracker).to_bytes())
+        write_atomically(self.path, checkpoint.to_bytes(), self.fsync)
+        self.checkpoints += 1
+
+    def run(self) -> GameResult:
+        tracker = self.tracker
+        player = tracker.player
+        cause_of_death = None
+        try:
+            if tracker.encounters == 0:
+                new_encounter(tracker)
+            next_turns = tracker.turn + self.every_turns if self.every_turns else None
+            next_encounters = tracker.encounters + self.every_encounters if self.every_encounters else None
+            while self.max_turns is None or tracker.turn < self.max_turns:
+                play_turn(tracker)
+                if self.path is None:
+                    continue
+                # checked between turns, where a snapshot holds all there is
+                if (next_turns is not None and tracker.turn >= next_turns) or (next_encounters is not None and tracker.encounters >= next_encounters):
+                    self.checkpoint()
+                    next_turns = tracker.turn + self.every_turns if self.every_turns else None
+                    next_encounters = tracker.encounters + self.every_encounters if self.every_encounters else None
+            if self.path is not None:
+                self.checkpoint()
+        except GameOver as game_over:
+            cause_of_death = game_over.cause
+            if self.path is not None and os.path.exists(self.path):
+                os.remove(self.path) # a finished run has nothing to resume
+        encounters_cleared = tracker.encounters - (1 if tracker.active_creatures else 0)
+        return GameResult(self.player_class.__name__, self.seed, tracker.turn, encounters_cleared,
+                          player.xp + 100 * (player.level - 1), player.level, cause_of_death)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play one long autopiloted game, checkpointing as it goes, and carry on from the last checkpoint if there is one.")
+    parser.add_argument("player_class", choices=PLAYER_CLASSES.keys())
+    parser.add_argument("--checkpoint", metavar="PATH", help="write checkpoints here, and resume from the one already here")
+    parser.add_argument("--every-turns", type=int, default=1000, metavar="N", help="checkpoint every N turns (0 for never)")
+    parser.add_argument("--every-encounters", type=int, default=0, metavar="N", help="checkpoint every N encounters (0 for never)")
+    parser.add_argument("--max-turns", type=int, help="stop here, checkpointed, if the player is still alive")
+    parser.add_argument("--policy", choices=POLICIES.keys(), default="greedy")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fsync", action="store_true", help="flush each checkpoint to disk before it replaces the last")
+    args = parser.parse_args()
+    try:
+        controller = RunController(PLAYER_CLASSES[args.player_class], args.policy, args.seed, args.checkpoint, args.every_turns,
+                                   args.every_encounters, args.max_turns, args.fsync)
+    except CheckpointError as error:
+        parser.exit(1, f"cannot resume from {args.checkpoint}: {error}\n")
+    if controller.resumed_from is not None:
+        print(f"resuming from turn {controller.resumed_from}")
+    start = time.perf_counter()
+    turn = controller.tracker.turn
+    result = controller.run()
+    elapsed = time.perf_counter() - start
+    print(result)
+    print(f"{result.turns - turn} turns in {elapsed:.2f}s ({(result.turns - turn) / elapsed:.0f} turns/s), {controller.checkpoints} checkpoints written")
+    level_ups = Counter(controller.tracker.player.level_ups)
+    print("level ups: " + ", ".join(f"{attribute} {level_ups[attribute]}" for attribute in LEVEL_UP_ATTRIBUTES))
@@ -0,0 +1,49 @@
+import random
+from typing import Dict, Generic, Hashable, List, Optional, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+class AliasTable(Generic[T]): # Walker's alias method: O(1) weighted sampling with a single random draw
+    items: List[T]
+    weights: List[float]
+    index: Dict[T, int]
+    total: float
+    probability: List[float]
+    alias: List[int]
+
+    def __init__(self, weights: Dict[T, float]):
+        self.items = list(weights)
+        self.weights = list(weights.values())
+        self.index = {item: i for i, item in enumerate(self.items)}
+        self.build()
+
+    def build(self) -> None: # Vose's O(n) construction
+        n = len(self.weights)
+        self.total = sum(self.weights)
+        self.probability = [1.0] * n
+        self.alias = list(range(n))
+        if self.total <= 0:
+            return
+        scaled = [weight * n / self.total for weight in self.weights]
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] += scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+        # anything left over only misses 1.0 through rounding error
+
+    def set_weight(self, item: T, weight: float) -> None:
+        i = self.index[item]
+        if self.weights[i] != weight:
+            self.weights[i] = weight
+            self.build()
+
+    def sample(self, rng: random.Random) -> Optional[T]: # None once every weight is 0
+        if self.total <= 0:
+            return None
+        u = rng.random() * len(self.items)
+        i = int(u)
+        return self.items[i] if u - i < self.probability[i] else self.items[self.alias[i]]
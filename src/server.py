@@ -0,0 +1,142 @@
+import argparse
+import asyncio
+from typing import List, Optional
+
+from .abstract_classes import (Action, Attack, Creature, Debuff, GameOver, Player, Policy, Spell, SpellcasterMixin,
+                               Tracker, LEVEL_UP_ATTRIBUTES)
+from .events import EventBus
+from .game import new_encounter, next_turn, play_creatures
+from .renderer import TerminalRenderer
+from .simulator import PLAYER_CLASSES
+
+PROMPT = "> "
+
+class SessionPolicy(Policy): # the session asks the client first, so the game only ever reads the answers back
+    action: Optional[Action]
+    target: Optional[Creature]
+
+    def __init__(self):
+        self.action = None
+        self.target = None
+
+    def choose_action(self, player: Player) -> Action:
+        return self.action
+
+    def choose_target(self, player: Player, action: Action, targets: List[Creature]) -> Creature:
+        return self.target
+
+    def choose_level_up(self, player: Player) -> Optional[str]:
+        return None # asked for once the player's action has resolved
+
+class WriterStream: # lets the renderer write straight into a connection's send buffer
+    writer: asyncio.StreamWriter
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+
+    def write(self, text: str) -> None:
+        self.writer.write(text.encode())
+
+    def flush(self) -> None:
+        pass
+
+class Session:
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    tracker: Tracker
+    player: Player
+    policy: SessionPolicy
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def send(self, text: str) -> None:
+        self.writer.write(text.encode())
+
+    async def ask(self, question: str, options: List[str]) -> int:
+        self.send(question + "\n" + "".join(f"{i + 1}: {option}\n" for i, option in enumerate(options)))
+        while True:
+            self.send(PROMPT)
+            await self.writer.drain()
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionResetError("client disconnected")
+            try:
+                choice = int(line) - 1
+            except ValueError:
+                self.send("Please enter a number:\n")
+                continue
+            if choice in range(len(options)):
+                return choice
+
+    async def play(self) -> None:
+        choice = await self.ask("Welcome to the dungeon! Please select a character class.", list(PLAYER_CLASSES))
+        player_class = list(PLAYER_CLASSES.values())[choice]
+        self.send("Please name your character:\n" + PROMPT)
+        await self.writer.drain()
+        name = (await self.reader.readline()).decode().strip() or player_class.__name__
+        # a turn's narration goes out as one write rather than one per line
+        self.tracker = Tracker(events=EventBus(TerminalRenderer(WriterStream(self.writer))))
+        self.player = player_class(name, self.tracker)
+        self.policy = SessionPolicy()
+        self.player.policy = self.policy
+        self.send(self.player.describe() + "\n")
+        try:
+            new_encounter(self.tracker)
+            while True:
+                await self.play_turn()
+        except GameOver:
+            await self.writer.drain()
+
+    async def play_turn(self) -> None:
+        player = self.player
+        self.tracker.events.flush()
+        while True:
+            action = player.actions[await self.ask("Choose an action by entering the number:", [action.describe() for action in player.actions])]
+            if isinstance(action, Spell) and isinstance(player, SpellcasterMixin) and action.mp_cost > player.mp_current:
+                self.send(f"Not enough mana! {action.name} costs {action.mp_cost} and you have {player.mp_current}\n")
+                continue
+            break
+        self.policy.action = action
+        self.policy.target = None
+        if isinstance(action, (Attack, Debuff)) and not action.is_multi_target:
+            targets = self.tracker.active_creatures
+            self.policy.target = targets[await self.ask("Choose a target by entering the number:", [target.name for target in targets])]
+        player.choose_action()
+        # only the player's action can kill an enemy, so level ups are settled before anyone else acts
+        self.tracker.events.flush()
+        while player.pending_level_ups:
+            player.pending_level_ups -= 1
+            choice = await self.ask("You level up! Choose an attribute to increase by entering the number:",
+                                    [f"{attribute.capitalize():13}(currently {getattr(player, attribute)})" for attribute in LEVEL_UP_ATTRIBUTES])
+            player.apply_level_up(LEVEL_UP_ATTRIBUTES[choice])
+        play_creatures(self.tracker)
+        next_turn(self.tracker)
+
+async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        await Session(reader, writer).play()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+async def serve(host: str = "127.0.0.1", port: int = 8765, unix_path: Optional[str] = None, backlog: int = 4096) -> asyncio.AbstractServer:
+    # a deep backlog so that thousands of players connecting at once are not dropped
+    if unix_path is not None:
+        return await asyncio.start_unix_server(handle_connection, unix_path, backlog=backlog)
+    return await asyncio.start_server(handle_connection, host, port, backlog=backlog)
+
+async def main(host: str, port: int, unix_path: Optional[str]) -> None:
+    server = await serve(host, port, unix_path)
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host many games in one process over TCP or a Unix socket.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, help="listen on this Unix socket path instead of TCP")
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, args.unix))
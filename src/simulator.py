@@ -0,0 +1,133 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, List, Optional, Type
+
+from .abstract_classes import GameOver, Player, Policy, Tracker
+from .events import EventBus
+from .game import new_encounter, play_turn
+from .player_classes import Warrior, Rogue, Mage, Priest
+from .policies import RandomPolicy
+from .profiler import Profiler
+from .results import EncounterStats, GameStats, ResultsStore
+from .rng import derive_seed
+
+PLAYER_CLASSES = {cls.__name__: cls for cls in (Warrior, Rogue, Mage, Priest)}
+MAX_CHUNK_SIZE = 500 # games per worker task, which bounds how many finished ones wait to be handed back
+
+class GameResult:
+    player_class: str
+    seed: int
+    turns: int
+    encounters_cleared: int
+    xp: int
+    level: int
+    cause_of_death: Optional[str] # None if the run hit the turn limit
+    encounters: Optional[List[EncounterStats]] # only kept by a simulator that records
+
+    def __init__(self, player_class: str, seed: int, turns: int, encounters_cleared: int, xp: int, level: int, cause_of_death: Optional[str],
+                 encounters: Optional[List[EncounterStats]] = None):
+        self.player_class = player_class
+        self.seed = seed
+        self.turns = turns
+        self.encounters_cleared = encounters_cleared
+        self.xp = xp
+        self.level = level
+        self.cause_of_death = cause_of_death
+        self.encounters = encounters
+
+    def __repr__(self):
+        return (f"GameResult({self.player_class}, seed={self.seed}, turns={self.turns}, "
+                f"encounters_cleared={self.encounters_cleared}, xp={self.xp}, level={self.level}, "
+                f"cause_of_death={self.cause_of_death!r})")
+
+class Simulator: # runs complete games in-process with no input() or print()
+    player_class: Type[Player]
+    policy_factory: Callable[[int], Policy]
+    seed: int
+    max_turns: int
+    profiler: Profiler # shared by every game, so it adds up over the whole run
+    record: bool # tally each encounter's actions into the results, for a ResultsStore
+    initiative: bool # order acts by speed rather than player first
+
+    def __init__(self, player_class: Type[Player], policy_factory: Callable[[int], Policy] = RandomPolicy, seed: int = 0, max_turns: int = 10000,
+                 profile: bool = False, record: bool = False, initiative: bool = False):
+        self.player_class = player_class
+        self.policy_factory = policy_factory
+        self.seed = seed
+        self.max_turns = max_turns
+        self.profiler = Profiler(profile)
+        self.record = record
+        self.initiative = initiative
+
+    def run_game(self, seed: int, policy_seed: int) -> GameResult:
+        stats = GameStats(self.player_class.__name__) if self.record else None
+        tracker = Tracker(seed, events=EventBus(stats) if stats else None, verbose=False)
+        tracker.profiler = self.profiler
+        player = self.player_class(self.player_class.__name__, tracker)
+        player.policy = self.policy_factory(policy_seed)
+        if self.initiative:
+            tracker.use_initiative()
+        cause_of_death = None
+        try:
+            new_encounter(tracker)
+            while tracker.turn < self.max_turns:
+                play_turn(tracker)
+        except GameOver as game_over:
+            cause_of_death = game_over.cause
+        encounters_cleared = tracker.encounters - (1 if tracker.active_creatures else 0)
+        return GameResult(self.player_class.__name__, seed, tracker.turn, encounters_cleared,
+                          player.xp + 100 * (player.level - 1), player.level, cause_of_death, stats.finish() if stats else None)
+
+    def run_index(self, game: int) -> GameResult:
+        # each game's seeds come from the run's seed and its index alone, so any worker can play any game
+        return self.run_game(derive_seed(self.seed, "game", game), derive_seed(self.seed, "policy", game))
+
+    def run(self, games: int, workers: int = 0) -> List[GameResult]:
+        return list(self.results(games, workers))
+
+    def results(self, games: int, workers: int = 0) -> Iterator[GameResult]: # as they finish, in game order
+        if not workers:
+            yield from map(self.run_index, range(games))
+            return
+        # the same results as playing them here, in the same order; profiles stay in the workers
+        with ProcessPoolExecutor(workers) as executor:
+            yield from executor.map(self.run_index, range(games), chunksize=min(max(games // (workers * 4), 1), MAX_CHUNK_SIZE))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run headless games and report throughput.")
+    parser.add_argument("player_class", choices=PLAYER_CLASSES.keys())
+    parser.add_argument("games", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=0, help="worker processes to spread the games over (0 plays them here)")
+    parser.add_argument("--profile", action="store_true", help="time each phase of a turn and each action class")
+    parser.add_argument("--profile-json", metavar="PATH", help="also write the profile to this file as JSON")
+    parser.add_argument("--results", metavar="PATH", help="append every game, encounter and action used to this results file")
+    parser.add_argument("--label", help="a note to keep with the run in the results file")
+    parser.add_argument("--initiative", action="store_true", help="order each turn's acts by speed, from dexterity")
+    args = parser.parse_args()
+    if args.workers and (args.profile or args.profile_json):
+        parser.error("profiles are only gathered without --workers")
+    simulator = Simulator(PLAYER_CLASSES[args.player_class], seed=args.seed, profile=args.profile or args.profile_json is not None,
+                          record=args.results is not None, initiative=args.initiative)
+    store = ResultsStore(args.results) if args.results else None
+    if store:
+        run = store.start_run(args.player_class, args.seed, simulator.max_turns, args.label)
+    turns = encounters_cleared = 0
+    start = time.perf_counter()
+    for game, result in enumerate(simulator.results(args.games, args.workers)):
+        turns += result.turns
+        encounters_cleared += result.encounters_cleared
+        if store:
+            store.add(run, game, result)
+    if store:
+        store.close()
+    elapsed = time.perf_counter() - start
+    print(f"{args.games} games in {elapsed:.2f}s ({args.games / elapsed:.1f} games/s)")
+    print(f"mean turns survived: {turns / args.games:.1f}")
+    print(f"mean encounters cleared: {encounters_cleared / args.games:.2f}")
+    if simulator.profiler.enabled:
+        print(simulator.profiler.report())
+    if args.profile_json:
+        with open(args.profile_json, "w") as file:
+            simulator.profiler.export(file)
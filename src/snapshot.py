@@ -0,0 +1,231 @@
+import io
+import struct
+from typing import BinaryIO, List, Optional, Tuple
+
+from .abstract_classes import MODIFIER_NAMES, Creature, SpellcasterMixin, Tracker
+from .binio import FormatError, read_generator, read_str, read_struct, write_generator, write_str
+from .effects import REFRESH, STACK
+from .game import ENEMY_CLASSES, encounter_pipeline
+from .simulator import PLAYER_CLASSES
+
+MAGIC = b"SBSS"
+VERSION = 4
+
+# (class, name, strength, dexterity, constitution, intelligence, hp_current, mp_current)
+CreatureState = Tuple[type, str, int, int, int, int, float, int]
+# (creature: 0 for the player, then 1 + its index among the enemies, modifier, amount, expires, source, stacking)
+EffectState = Tuple[int, str, int, int, str, str]
+STACKING_RULES = (STACK, REFRESH)
+# (seed, streams spawned, the game's stream, then (serial, stream) for the player and each enemy)
+RngState = Tuple[int, int, tuple, Tuple[Tuple[int, tuple], ...]]
+# the enemy classes of each wave rolled but not yet fought, the next first
+WaveState = Tuple[Tuple[type, ...], ...]
+
+class SnapshotError(FormatError):
+    pass
+
+class Snapshot: # the whole game state as flat tuples, so taking and keeping one copies no objects
+    __slots__ = ("turn", "encounters", "upcoming", "rng_state", "effects", "player", "xp", "level", "pending_level_ups",
+                 "creatures", "weights")
+    turn: int
+    encounters: int
+    upcoming: WaveState
+    rng_state: Optional[RngState] # None when captured without it, and then restoring leaves the generators alone
+    effects: Tuple[EffectState, ...] # the creatures' modifiers are the sum of these
+    player: CreatureState
+    xp: int
+    level: int
+    pending_level_ups: int
+    creatures: Tuple[CreatureState, ...]
+    weights: Tuple[Tuple[int, ...], ...] # each NPC's action weights, in the order of its actions
+
+    def __init__(self, turn: int, encounters: int, upcoming: WaveState, rng_state: Optional[RngState], effects: Tuple[EffectState, ...],
+                 player: CreatureState, xp: int, level: int, pending_level_ups: int, creatures: Tuple[CreatureState, ...],
+                 weights: Tuple[Tuple[int, ...], ...]):
+        self.turn = turn
+        self.encounters = encounters
+        self.upcoming = upcoming
+        self.rng_state = rng_state
+        self.effects = effects
+        self.player = player
+        self.xp = xp
+        self.level = level
+        self.pending_level_ups = pending_level_ups
+        self.creatures = creatures
+        self.weights = weights
+
+    @classmethod
+    def capture(cls, tracker: Tracker, rng: bool = True) -> "Snapshot":
+        # Copying the generators' states is most of the cost of a capture. Lookahead searches that reseed
+        # every rollout anyway can leave them out.
+        player = tracker.player
+        creatures = tracker.active_creatures
+        waves = tracker.waves
+        upcoming = tuple(waves.upcoming) if waves is not None else ()
+        rng_state = None
+        if rng:
+            # a wave built ahead of time is left out, and builds again on restore from the same streams
+            spawned = tracker.rngs.spawned - (len(waves.ready) if waves is not None and waves.ready else 0)
+            rng_state = (tracker.rngs.seed, spawned, tracker.rng.getstate(),
+                         tuple([(creature.serial, creature.rng.getstate()) for creature in [player] + creatures]))
+        return cls(tracker.turn, tracker.encounters, upcoming, rng_state, _effect_states(player, creatures),
+                   _creature_state(player), player.xp, player.level, player.pending_level_ups,
+                   tuple([_creature_state(creature) for creature in creatures]),
+                   tuple([tuple(creature.actions.values()) for creature in creatures]))
+
+    def restore(self, tracker: Optional[Tracker] = None) -> Tracker:
+        # Writes the state into the tracker, reusing its creatures where their classes line up, which is
+        # much cheaper than building new ones. Without a tracker, a new headless one is made.
+        if tracker is None:
+            tracker = Tracker(verbose=False)
+        tracker.turn = self.turn
+        tracker.encounters = self.encounters
+        encounter_pipeline(tracker).reset(self.upcoming)
+        if self.rng_state is not None:
+            tracker.rngs.seed = self.rng_state[0]
+            tracker.rng.setstate(self.rng_state[2])
+        tracker.effects.clear()
+        player = getattr(tracker, "player", None)
+        if type(player) is not self.player[0]:
+            if player is not None and player in tracker.creatures:
+                tracker.creatures.remove(player)
+            player = self.player[0](self.player[1], tracker)
+        _restore_creature(player, self.player)
+        player.xp = self.xp
+        player.level = self.level
+        player.pending_level_ups = self.pending_level_ups
+        existing = list(tracker.active_creatures)
+        for creature in existing:
+            tracker.remove_active_creature(creature)
+        tracker.creatures.dying.clear()
+        for i, (state, weights) in enumerate(zip(self.creatures, self.weights)):
+            creature = existing[i] if i < len(existing) and type(existing[i]) is state[0] else state[0](tracker)
+            _restore_creature(creature, state)
+            creature.set_action_weights(weights)
+            tracker.add_active_creature(creature)
+        creatures = tracker.active_creatures
+        if self.rng_state is not None:
+            # after any creatures were made above, which took streams of their own
+            tracker.rngs.spawned = self.rng_state[1]
+            for creature, (serial, state) in zip([player] + creatures, self.rng_state[3]):
+                creature.serial = serial
+                creature.rng.setstate(state)
+        for index, modifier, amount, expires, source, stacking in self.effects:
+            tracker.effects.apply(player if index == 0 else creatures[index - 1], modifier, amount, expires, source, stacking)
+        return tracker
+
+    def save(self, stream: BinaryIO) -> None:
+        stream.write(struct.pack("<4sBII?", MAGIC, VERSION, self.turn, self.encounters, self.rng_state is not None))
+        stream.write(struct.pack("<B", len(self.upcoming)))
+        for wave in self.upcoming:
+            stream.write(struct.pack("<B", len(wave)))
+            for creature_class in wave:
+                _write_class(stream, creature_class, ENEMY_CLASSES)
+        if self.rng_state is not None:
+            seed, spawned, game_state, streams = self.rng_state
+            stream.write(struct.pack("<QIH", seed, spawned, len(streams)))
+            write_generator(stream, game_state)
+            for serial, state in streams:
+                stream.write(struct.pack("<I", serial))
+                write_generator(stream, state)
+        stream.write(struct.pack("<H", len(self.effects)))
+        for index, modifier, amount, expires, source, stacking in self.effects:
+            stream.write(struct.pack("<HBiIB", index, MODIFIER_NAMES.index(modifier), amount, expires, STACKING_RULES.index(stacking)))
+            write_str(stream, source)
+        _write_creature(stream, self.player, PLAYER_CLASSES)
+        stream.write(struct.pack("<iHH", self.xp, self.level, self.pending_level_ups))
+        stream.write(struct.pack("<H", len(self.creatures)))
+        for state, weights in zip(self.creatures, self.weights):
+            _write_creature(stream, state, ENEMY_CLASSES)
+            stream.write(struct.pack(f"<B{len(weights)}i", len(weights), *weights))
+
+    @classmethod
+    def load(cls, stream: BinaryIO) -> "Snapshot":
+        magic, version, turn, encounters, has_rng = read_struct(stream, "<4sBII?")
+        if magic != MAGIC or version != VERSION:
+            raise SnapshotError("not a snapshot, or written by an incompatible version")
+        wave_count, = read_struct(stream, "<B")
+        upcoming = tuple([tuple([_read_class(stream, ENEMY_CLASSES) for j in range(read_struct(stream, "<B")[0])]) for i in range(wave_count)])
+        rng_state = None
+        if has_rng:
+            seed, spawned, stream_count = read_struct(stream, "<QIH")
+            game_state = read_generator(stream)
+            rng_state = (seed, spawned, game_state, tuple([(read_struct(stream, "<I")[0], read_generator(stream)) for i in range(stream_count)]))
+        effect_count, = read_struct(stream, "<H")
+        effects = []
+        for i in range(effect_count):
+            index, modifier, amount, expires, stacking = read_struct(stream, "<HBiIB")
+            if modifier >= len(MODIFIER_NAMES) or stacking >= len(STACKING_RULES):
+                raise SnapshotError("snapshot has an effect this game does not know")
+            effects.append((index, MODIFIER_NAMES[modifier], amount, expires, read_str(stream), STACKING_RULES[stacking]))
+        player = _read_creature(stream, PLAYER_CLASSES)
+        xp, level, pending_level_ups = read_struct(stream, "<iHH")
+        creature_count, = read_struct(stream, "<H")
+        creatures = []
+        weights = []
+        for i in range(creature_count):
+            creatures.append(_read_creature(stream, ENEMY_CLASSES))
+            weight_count, = read_struct(stream, "<B")
+            weights.append(read_struct(stream, f"<{weight_count}i"))
+        if any(effect[0] > creature_count for effect in effects):
+            raise SnapshotError("snapshot has an effect on a creature that is not in it")
+        if rng_state is not None and len(rng_state[3]) != 1 + creature_count:
+            raise SnapshotError("snapshot has a random stream for a creature that is not in it")
+        return cls(turn, encounters, upcoming, rng_state, tuple(effects), player, xp, level, pending_level_ups, tuple(creatures), tuple(weights))
+
+    def to_bytes(self) -> bytes:
+        stream = io.BytesIO()
+        self.save(stream)
+        return stream.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Snapshot":
+        return cls.load(io.BytesIO(data))
+
+def clone(tracker: Tracker, into: Optional[Tracker] = None, rng: bool = True) -> Tracker:
+    return Snapshot.capture(tracker, rng).restore(into)
+
+def _creature_state(creature: Creature) -> CreatureState:
+    return (type(creature), creature.name, creature.strength, creature.dexterity, creature.constitution, creature.intelligence,
+            creature.hp_current, creature.mp_current if isinstance(creature, SpellcasterMixin) else 0)
+
+def _effect_states(player: Creature, creatures: List[Creature]) -> Tuple[EffectState, ...]:
+    return tuple([(index, effect.modifier, effect.amount, effect.expires, effect.source, effect.stacking)
+                  for index, creature in enumerate([player] + creatures) for effect in creature.effects.values()])
+
+def _restore_creature(creature: Creature, state: CreatureState) -> None:
+    cls, creature.name, strength, dexterity, constitution, intelligence, creature.hp_current, mp = state
+    # base stats clear the stat cache when written, so only the ones that differ are
+    if creature.strength != strength:
+        creature.strength = strength
+    if creature.dexterity != dexterity:
+        creature.dexterity = dexterity
+    if creature.constitution != constitution:
+        creature.constitution = constitution
+    if creature.intelligence != intelligence:
+        creature.intelligence = intelligence
+    if isinstance(creature, SpellcasterMixin):
+        creature.mp_current = mp
+
+def _write_class(stream: BinaryIO, cls: type, classes: dict) -> None:
+    if classes.get(cls.__name__) is not cls:
+        raise SnapshotError(f"{cls.__name__} is not a class that can be saved")
+    write_str(stream, cls.__name__)
+
+def _read_class(stream: BinaryIO, classes: dict) -> type:
+    class_name = read_str(stream)
+    if class_name not in classes:
+        raise SnapshotError(f"unknown creature class {class_name}")
+    return classes[class_name]
+
+def _write_creature(stream: BinaryIO, state: CreatureState, classes: dict) -> None:
+    cls, name, strength, dexterity, constitution, intelligence, hp, mp = state
+    _write_class(stream, cls, classes)
+    write_str(stream, name)
+    stream.write(struct.pack("<4hdi", strength, dexterity, constitution, intelligence, hp, mp))
+
+def _read_creature(stream: BinaryIO, classes: dict) -> CreatureState:
+    cls, name = _read_class(stream, classes), read_str(stream)
+    strength, dexterity, constitution, intelligence, hp, mp = read_struct(stream, "<4hdi")
+    # hp is a float once healed, and an int otherwise
+    return (cls, name, strength, dexterity, constitution, intelligence, int(hp) if hp.is_integer() else hp, mp)
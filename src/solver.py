@@ -0,0 +1,436 @@
+import argparse
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple, Type
+
+from .abstract_classes import (MODIFIER_NAMES, Action, Attack, Buff, Creature, Debuff, GameOver, Healing, NPC, Player, Policy, PoweredAction, Spell,
+                               SpellcasterMixin, Tracker)
+from .distributions import damage_distribution, truncated_uniform_pmf
+from .effects import STACK
+from .game import ENEMY_CLASSES, next_turn, play_round, spawn_encounter
+from .simulator import PLAYER_CLASSES
+
+NO_MODIFIERS = (0,) * len(MODIFIER_NAMES)
+WIN = "win"
+LOSS = "loss"
+
+# Between turns the fight is fully described by the player's hp and mp and the (slot, hp, mp) of every
+# living enemy, where slot is the enemy's position in the original encounter. Enemies are kept in the
+# creature store's order, which decides who acts first. Within a turn every creature's modifiers are
+# tracked too, the player's first and then the enemies' by slot; all effects wear off at the next turn.
+Enemy = Tuple[int, int, int]
+State = Tuple[int, int, Tuple[Enemy, ...]]
+Modifiers = Tuple[Tuple[int, ...], ...]
+Branch = Tuple[int, int, Tuple[Enemy, ...], Modifiers]
+Outcomes = List[Tuple[float, object]] # (probability, Branch or WIN/LOSS)
+
+class SolverLimitError(Exception): # the fight has more states, or takes longer, than the solver was allowed
+    pass
+
+class SolverPolicy(ABC): # the fixed player policy the solver evaluates
+    def uses_mp(self, player: Player) -> bool: # False if neither the decisions nor the actions chosen depend on mana
+        return True
+
+    @abstractmethod
+    def decide(self, player_hp: int, player_mp: int, enemies: Tuple[Enemy, ...]) -> Tuple[int, int]:
+        # returns (index into player.actions, position of the target among the living enemies); mana is
+        # only to be compared against spell costs, as the solver may cap it at the most any spell costs
+        pass
+
+class AttackWeakest(SolverPolicy):
+    action: int
+
+    def __init__(self, action: int = 0):
+        self.action = action
+
+    def uses_mp(self, player: Player) -> bool:
+        return isinstance(player.actions[self.action], Spell)
+
+    def decide(self, player_hp: int, player_mp: int, enemies: Tuple[Enemy, ...]) -> Tuple[int, int]:
+        return self.action, min(range(len(enemies)), key=lambda position: enemies[position][1])
+
+class GamePolicy(Policy): # plays a SolverPolicy in the real game, so simulations can be checked against the solver
+    policy: SolverPolicy
+    slots: Dict[int, int]
+    target: int
+
+    def __init__(self, policy: SolverPolicy):
+        self.policy = policy
+        self.slots = {}
+        self.target = 0
+
+    def choose_action(self, player: Player) -> Action:
+        creatures = player.tracker.active_creatures
+        for creature in creatures:
+            self.slots.setdefault(id(creature), len(self.slots))
+        enemies = tuple((self.slots[id(creature)], creature.hp_current, getattr(creature, "mp_current", 0)) for creature in creatures)
+        action, self.target = self.policy.decide(player.hp_current, getattr(player, "mp_current", 0), enemies)
+        return player.actions[action]
+
+    def choose_target(self, player: Player, action: Action, targets: List[Creature]) -> Creature:
+        return targets[self.target]
+
+    def choose_level_up(self, player: Player) -> str:
+        return "constitution"
+
+class SolverResult:
+    win_probability: float
+    loss_probability: float
+    unresolved: float # probability mass still fighting at the turn limit, or pruned as negligible
+    expected_turns: float # over resolved fights
+    expected_turns_to_win: float
+    states: int # distinct between-turn states visited
+
+    def __init__(self, win_probability: float, loss_probability: float, unresolved: float, expected_turns: float, expected_turns_to_win: float, states: int):
+        self.win_probability = win_probability
+        self.loss_probability = loss_probability
+        self.unresolved = unresolved
+        self.expected_turns = expected_turns
+        self.expected_turns_to_win = expected_turns_to_win
+        self.states = states
+
+    def __repr__(self):
+        return (f"SolverResult(win={self.win_probability:.6f}, loss={self.loss_probability:.6f}, unresolved={self.unresolved:.2e}, "
+                f"expected_turns={self.expected_turns:.3f}, expected_turns_to_win={self.expected_turns_to_win:.3f}, states={self.states})")
+
+class EncounterSolver:
+    # Exact win probability for one player against one enemy group, by pushing the probability
+    # distribution over fight states forward one turn at a time. Healing adds a fractional amount
+    # of hp in the game; here it is truncated to whole hp, which is the only discretisation.
+    # Level ups during the fight are not modelled.
+    player: Player
+    enemies: List[NPC]
+    policy: SolverPolicy
+    prune: float
+    hp_regen: int
+    mp_regen: int
+    mp_cap: float
+
+    def __init__(self, player_class: Type[Player], enemy_classes: Sequence[Type[NPC]], policy: Optional[SolverPolicy] = None, cache_size: int = 1 << 16, prune: float = 1e-12):
+        # template creatures in a scratch tracker; only their stats and actions are used
+        tracker = Tracker(verbose=False)
+        self.player = player_class(player_class.__name__, tracker)
+        self.enemies = [enemy_class(tracker) for enemy_class in enemy_classes]
+        self.policy = policy or AttackWeakest()
+        self.prune = prune
+        for action in list(self.player.actions) + [action for enemy in self.enemies for action in enemy.actions]:
+            if isinstance(action, (Buff, Debuff)) and (action.duration != 1 or action.stacking != STACK):
+                raise ValueError(f"{action.name} has effects that last past the turn or do not stack, which the solver does not model")
+        self.no_modifiers = (NO_MODIFIERS,) * (1 + len(self.enemies))
+        # the same amounts as Player.regen
+        self.hp_regen = max(int(self.player.constitution / 10), 1)
+        self.mp_regen = max(int(self.player.intelligence / 10), 1) if isinstance(self.player, SpellcasterMixin) else 0
+        # Mana that keeps growing would make every turn's states new ones. It is not tracked at all for a
+        # policy that never spends it, and once regeneration pays for the dearest spell every turn, mana
+        # above that cost can never run short again, so it is capped there.
+        costs = [action.mp_cost for action in self.player.actions if isinstance(action, Spell)]
+        if not self.policy.uses_mp(self.player):
+            self.mp_cap = 0
+        elif costs and self.mp_regen >= max(costs):
+            self.mp_cap = max(costs)
+        else:
+            self.mp_cap = math.inf
+        # each cached phase holds every outcome of one state; the default keeps a two-Goblin fight within a
+        # few hundred MB, and a quarter of it makes that fight over five times slower
+        self.player_phase = lru_cache(maxsize=cache_size)(self._player_phase)
+        self.enemy_turn = lru_cache(maxsize=cache_size)(self._enemy_turn)
+        self.stats = lru_cache(maxsize=None)(self._stats)
+        self.power = lru_cache(maxsize=None)(self._power)
+        self.attack_damage = lru_cache(maxsize=None)(self._attack_damage)
+        self.heal_amounts = lru_cache(maxsize=None)(self._heal_amounts)
+
+    def initial_state(self) -> State:
+        return (self.player.hp_current, min(getattr(self.player, "mp_current", 0), self.mp_cap),
+                tuple((slot, enemy.hp_current, getattr(enemy, "mp_current", 0)) for slot, enemy in enumerate(self.enemies)))
+
+    def solve(self, max_turns: int = 1000, tolerance: float = 1e-9, max_states: Optional[int] = 100_000,
+              time_limit: Optional[float] = None) -> SolverResult:
+        # Larger groups can take minutes and hundreds of thousands of states (a Mage casting Fireball at
+        # two Goblins visits about 375,000), so it gives up with a SolverLimitError past max_states
+        # states or time_limit seconds, checked between turns; None for no limit.
+        start = time.perf_counter()
+        frontier: Dict[State, float] = {self.initial_state(): 1.0}
+        win = loss = win_turns = loss_turns = pruned = 0.0
+        seen = set()
+        largest = len(self.enemies)
+        for turn in range(1, max_turns + 1):
+            seen.update(frontier)
+            if max_states is not None and len(seen) > max_states:
+                raise SolverLimitError(f"more than {max_states} states by turn {turn}")
+            if time_limit is not None and time.perf_counter() - start > time_limit:
+                raise SolverLimitError(f"over {time_limit}s by turn {turn}, with {len(seen)} states")
+            # The turn is pushed through one phase at a time, merging equal branches between phases, so
+            # the work grows with the sum of the phase outcomes rather than with their product.
+            branches: Dict[object, float] = defaultdict(float)
+            for state, probability in frontier.items():
+                for outcome_probability, branch in self.player_phase(state):
+                    branches[branch] += probability * outcome_probability
+            # enemies only die to the player, so each branch's enemy list is fixed for the rest of the turn
+            for position in range(largest):
+                stepped: Dict[object, float] = defaultdict(float)
+                for branch, probability in branches.items():
+                    if branch is LOSS or position >= len(branch[2]):
+                        stepped[branch] += probability
+                        continue
+                    for outcome_probability, outcome in self.enemy_turn(branch, position):
+                        stepped[outcome] += probability * outcome_probability
+                branches = stepped
+            following: Dict[State, float] = defaultdict(float)
+            end_of_turn = self.end_of_turn
+            for branch, probability in branches.items():
+                outcome = branch if branch is LOSS else end_of_turn(branch)
+                if outcome is WIN:
+                    win += probability
+                    win_turns += turn * probability
+                elif outcome is LOSS:
+                    loss += probability
+                    loss_turns += turn * probability
+                else:
+                    following[outcome] += probability
+            frontier = {}
+            for state, probability in following.items():
+                if probability < self.prune:
+                    pruned += probability
+                else:
+                    frontier[state] = probability
+            if sum(frontier.values()) < tolerance:
+                break
+        unresolved = pruned + sum(frontier.values())
+        resolved = win + loss
+        return SolverResult(win, loss, unresolved,
+                            (win_turns + loss_turns) / resolved if resolved else math.inf,
+                            win_turns / win if win else math.inf, len(seen))
+
+    def _stats(self, creature: Creature, modifiers: Tuple[int, ...]) -> Tuple[float, float, float, float]:
+        with with_modifiers(creature, modifiers):
+            return creature.attack, creature.defence, creature.crit_chance, creature.crit_mult
+
+    def _power(self, user: Creature, action: PoweredAction, modifiers: Tuple[int, ...]) -> Tuple[float, float]:
+        with with_modifiers(user, modifiers):
+            return action.base_power(user), action.power_variance(user)
+
+    def _player_phase(self, state: State) -> Outcomes:
+        player_hp, player_mp, enemies = state
+        modifiers = self.no_modifiers
+        action_index, target = self.policy.decide(player_hp, player_mp, enemies)
+        action = self.player.actions[action_index]
+        if isinstance(action, Spell):
+            if action.mp_cost > player_mp:
+                raise ValueError(f"the policy chose {action.name} without the mana to cast it")
+            player_mp -= action.mp_cost
+        branches: Outcomes = [(1.0, (player_hp, player_mp, enemies, modifiers))]
+        # same order as Player.choose_target: self-targeted effects, then the attack or debuff
+        if isinstance(action, (Healing, Buff)):
+            branches = self.apply_to_player(branches, self.player, action, True)
+        if isinstance(action, (Attack, Debuff)):
+            branches = self.player_targets(branches, action, None if action.is_multi_target else target)
+        return merge(branches)
+
+    def player_targets(self, branches: Outcomes, action: Action, target: Optional[int]) -> Outcomes:
+        results: Outcomes = []
+        for probability, branch in branches:
+            positions = range(len(branch[2])) if target is None else [target]
+            walking: Outcomes = [(probability, branch)]
+            for position in positions:
+                stepped: Outcomes = []
+                for p, current in walking:
+                    stepped += [(p * q, after) for q, after in self.hit_enemy(current, action, position)]
+                walking = stepped
+            # the dead leave the creature store once the action is over, in the order they died
+            results += [(p, (player_hp, player_mp, bury(enemies), modifiers)) for p, (player_hp, player_mp, enemies, modifiers) in walking]
+        return results
+
+    def hit_enemy(self, branch: Branch, action: Action, position: int) -> Outcomes:
+        player_hp, player_mp, enemies, modifiers = branch
+        slot, hp, mp = enemies[position]
+        if isinstance(action, Debuff):
+            modifiers = apply_effects(modifiers, 1 + slot, action.debuff_effects)
+        if not isinstance(action, Attack):
+            return [(1.0, (player_hp, player_mp, enemies, modifiers))]
+        return [(probability, (player_hp, player_mp, replace_enemy(enemies, position, (slot, hp - damage, mp)), modifiers))
+                for probability, damage in self.attack_damage(self.player, action, self.enemies[slot], modifiers[0], modifiers[1 + slot])]
+
+    def _attack_damage(self, attacker: Creature, action: Attack, defender: Creature,
+                       attacker_modifiers: Tuple[int, ...], defender_modifiers: Tuple[int, ...]) -> Tuple[Tuple[float, int], ...]:
+        attack, _, crit_chance, crit_mult = self.stats(attacker, attacker_modifiers)
+        defence = self.stats(defender, defender_modifiers)[1]
+        base_power, variance = self.power(attacker, action, attacker_modifiers)
+        distribution = damage_distribution(attack, defence, crit_chance, crit_mult, base_power, variance)
+        return tuple((p, value) for value, p in distribution.items())
+
+    def _heal_amounts(self, user: Creature, action: Healing, modifiers: Tuple[int, ...]) -> Tuple[Tuple[int, float], ...]:
+        base_power, variance = self.power(user, action, modifiers)
+        return tuple(truncated_uniform_pmf(base_power - variance / 2, base_power + variance / 2).items())
+
+    def apply_to_player(self, branches: Outcomes, user: Creature, action: Action, positive: bool) -> Outcomes:
+        results: Outcomes = []
+        for probability, (player_hp, player_mp, enemies, modifiers) in branches:
+            if isinstance(action, Buff):
+                modifiers = apply_effects(modifiers, 0, action.buff_effects)
+            if isinstance(action, Healing):
+                for amount, p in self.heal_amounts(user, action, modifiers[0]):
+                    results.append((probability * p, (min(player_hp + amount, self.player.hp_max), player_mp, enemies, modifiers)))
+            else:
+                results.append((probability, (player_hp, player_mp, enemies, modifiers)))
+        return results
+
+    def _enemy_turn(self, branch: Branch, position: int) -> Outcomes:
+        player_hp, player_mp, enemies, modifiers = branch
+        slot, _, mp = enemies[position]
+        npc = self.enemies[slot]
+        # NPCs never regain mana, so redrawing past unaffordable spells is the same as leaving them out
+        choices = [(action, weight) for action, weight in npc.actions.items()
+                   if weight > 0 and not (isinstance(action, Spell) and action.mp_cost > mp)]
+        total = sum(weight for action, weight in choices)
+        if total == 0:
+            return [(1.0, branch)]
+        outcomes: Outcomes = []
+        for action, weight in choices:
+            chosen = weight / total
+            current = branch
+            if isinstance(action, Spell):
+                current = (player_hp, player_mp, replace_enemy(enemies, position, (slot, enemies[position][1], mp - action.mp_cost)), modifiers)
+            # same order as NPC.choose_target: attack or debuff the player, then heal or buff
+            branches: Outcomes = [(chosen, current)]
+            if isinstance(action, (Attack, Debuff)):
+                branches = self.enemy_hits_player(branches, npc, slot, action)
+            if isinstance(action, (Healing, Buff)):
+                branches = self.enemy_supports(branches, npc, slot, action)
+            outcomes += branches
+        return merge(outcomes)
+
+    def enemy_hits_player(self, branches: Outcomes, npc: NPC, slot: int, action: Action) -> Outcomes:
+        results: Outcomes = []
+        for probability, current in branches:
+            if current is LOSS:
+                results.append((probability, LOSS))
+                continue
+            player_hp, player_mp, enemies, modifiers = current
+            if isinstance(action, Debuff):
+                modifiers = apply_effects(modifiers, 0, action.debuff_effects)
+            if not isinstance(action, Attack):
+                results.append((probability, (player_hp, player_mp, enemies, modifiers)))
+                continue
+            for p, damage in self.attack_damage(npc, action, self.player, modifiers[1 + slot], modifiers[0]):
+                hp = player_hp - damage
+                results.append((probability * p, LOSS if hp <= 0 else (hp, player_mp, enemies, modifiers)))
+        return results
+
+    def enemy_supports(self, branches: Outcomes, npc: NPC, slot: int, action: Action) -> Outcomes:
+        results: Outcomes = []
+        for probability, current in branches:
+            if current is LOSS:
+                results.append((probability, LOSS))
+                continue
+            targets = [enemy[0] for enemy in current[2]] if action.is_multi_target else [slot]
+            walking: Outcomes = [(probability, current)]
+            for target in targets:
+                stepped: Outcomes = []
+                for p, (player_hp, player_mp, enemies, modifiers) in walking:
+                    if isinstance(action, Buff):
+                        modifiers = apply_effects(modifiers, 1 + target, action.buff_effects)
+                    if not isinstance(action, Healing):
+                        stepped.append((p, (player_hp, player_mp, enemies, modifiers)))
+                        continue
+                    position = next(i for i, enemy in enumerate(enemies) if enemy[0] == target)
+                    _, hp, mp = enemies[position]
+                    cap = self.enemies[target].hp_max
+                    for amount, q in self.heal_amounts(npc, action, modifiers[1 + slot]):
+                        healed = replace_enemy(enemies, position, (target, min(hp + amount, cap), mp))
+                        stepped.append((p * q, (player_hp, player_mp, healed, modifiers)))
+                walking = stepped
+            results += walking
+        return results
+
+    def end_of_turn(self, branch: Branch) -> object:
+        player_hp, player_mp, enemies, modifiers = branch
+        if not enemies:
+            return WIN
+        # effects expire and the player regenerates, as in next_turn
+        return (player_hp + self.hp_regen, min(player_mp + self.mp_regen, self.mp_cap), enemies)
+
+@contextmanager
+def with_modifiers(creature: Creature, modifiers: Tuple[int, ...]):
+    # reads the template creature's real formulas under the given modifiers, then puts the old ones back
+    saved = tuple(creature.modifiers.values())
+    for modifier, value in zip(MODIFIER_NAMES, modifiers):
+        creature.modifiers[modifier] = value
+    try:
+        yield
+    finally:
+        for modifier, value in zip(MODIFIER_NAMES, saved):
+            creature.modifiers[modifier] = value
+
+def apply_effects(modifiers: Modifiers, index: int, effects: Dict[str, int]) -> Modifiers:
+    changed = tuple(value + effects.get(modifier, 0) for modifier, value in zip(MODIFIER_NAMES, modifiers[index]))
+    return modifiers[:index] + (changed,) + modifiers[index + 1:]
+
+def replace_enemy(enemies: Tuple[Enemy, ...], position: int, enemy: Enemy) -> Tuple[Enemy, ...]:
+    return enemies[:position] + (enemy,) + enemies[position + 1:]
+
+def bury(enemies: Tuple[Enemy, ...]) -> Tuple[Enemy, ...]:
+    # CreatureStore.remove: the last creature takes the place of the one removed
+    if all(enemy[1] > 0 for enemy in enemies):
+        return enemies
+    living = list(enemies)
+    for dead in [enemy for enemy in enemies if enemy[1] <= 0]:
+        position = living.index(dead)
+        last = living.pop()
+        if position < len(living):
+            living[position] = last
+    return tuple(living)
+
+def merge(outcomes: Outcomes) -> Outcomes:
+    merged: Dict[object, float] = defaultdict(float)
+    for probability, outcome in outcomes:
+        merged[outcome] += probability
+    return [(probability, outcome) for outcome, probability in merged.items()]
+
+def simulate(player_class: Type[Player], enemy_classes: Sequence[Type[NPC]], policy: SolverPolicy, games: int, seed: int = 0, max_turns: int = 1000) -> Tuple[float, float]:
+    # Monte Carlo estimate of the same quantities, for comparison
+    wins = 0
+    turns = 0
+    for game in range(games):
+        tracker = Tracker(seed + game, verbose=False)
+        player = player_class(player_class.__name__, tracker)
+        player.policy = GamePolicy(policy)
+        spawn_encounter(tracker, enemy_classes)
+        try:
+            while tracker.turn < max_turns:
+                play_round(tracker)
+                if not tracker.active_creatures:
+                    wins += 1
+                    break
+                next_turn(tracker)
+        except GameOver:
+            pass
+        turns += tracker.turn + 1
+    return wins / games, turns / games
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Exact win probability of one encounter under a fixed player policy.")
+    parser.add_argument("player_class", choices=PLAYER_CLASSES.keys())
+    parser.add_argument("enemies", nargs="+", choices=ENEMY_CLASSES.keys())
+    parser.add_argument("--action", type=int, default=1, help="number of the action the player always uses on the weakest enemy")
+    parser.add_argument("--tolerance", type=float, default=1e-9, help="stop once less than this much probability is still fighting")
+    parser.add_argument("--max-states", type=int, default=100_000, help="give up past this many states (0 for no limit)")
+    parser.add_argument("--time-limit", type=float, help="give up after this many seconds")
+    parser.add_argument("--simulate", type=int, default=0, help="also run this many Monte Carlo games for comparison")
+    args = parser.parse_args()
+    enemy_classes = [ENEMY_CLASSES[name] for name in args.enemies]
+    policy = AttackWeakest(args.action - 1)
+    start = time.perf_counter()
+    try:
+        result = EncounterSolver(PLAYER_CLASSES[args.player_class], enemy_classes, policy).solve(
+            tolerance=args.tolerance, max_states=args.max_states or None, time_limit=args.time_limit)
+    except SolverLimitError as error:
+        parser.exit(1, f"solver gave up: {error}\n")
+    print(f"solver:      {result} in {time.perf_counter() - start:.3f}s")
+    if args.simulate:
+        start = time.perf_counter()
+        win_rate, mean_turns = simulate(PLAYER_CLASSES[args.player_class], enemy_classes, policy, args.simulate)
+        print(f"monte carlo: win={win_rate:.4f}, mean turns={mean_turns:.2f} over {args.simulate} games in {time.perf_counter() - start:.3f}s")
@@ -0,0 +1,58 @@
+from typing import Callable, Dict, Set, Tuple
+
+
+CACHED_STATS: Set[str] = set() # names of every cached_stat, all cleared when a base stat changes
+
+class cached_stat: # like functools.cached_property, but cleared whenever something it depends on changes
+    formula: Callable
+    name: str
+    modifiers: Tuple[str, ...] # the modifier entries the formula reads, directly or through another stat
+
+    def __init__(self, *modifiers: str):
+        self.modifiers = modifiers
+
+    def __call__(self, formula: Callable) -> "cached_stat":
+        self.formula = formula
+        self.name = formula.__name__
+        self.__doc__ = formula.__doc__
+        return self
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        CACHED_STATS.add(name)
+        for modifier in self.modifiers:
+            Modifiers.dependents.setdefault(modifier, set()).add(name)
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        # stored under the same name, so later reads are plain attribute lookups that skip this method
+        value = instance.__dict__[self.name] = self.formula(instance)
+        return value
+
+class base_stat: # an attribute that cached stats are derived from
+    def __set_name__(self, owner, name):
+        self.attribute = "_" + name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return instance.__dict__[self.attribute]
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.attribute] = value
+        instance.invalidate_stats()
+
+class Modifiers(dict): # a creature's own modifiers; when an entry changes, clears the cached stats that depend on it
+    dependents: Dict[str, Set[str]] = {} # modifier -> names of the stats derived from it
+    owner: object
+
+    def __init__(self, owner, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.owner = owner
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        cache = self.owner.__dict__
+        for stat in self.dependents.get(key, ()):
+            cache.pop(stat, None)
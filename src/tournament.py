@@ -0,0 +1,110 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations_with_replacement
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .abstract_classes import GameOver, Tracker
+from .encounters import MAX_WAVE_SIZE
+from .game import ENEMY_CLASSES, next_turn, play_round, spawn_encounter
+from .policies import RandomPolicy
+from .rng import derive_seed
+from .simulator import PLAYER_CLASSES
+
+CHUNK_SIZE = 50 # games per task, fixed so the work split does not depend on the worker count
+
+class MatchupResult:
+    player_class: str
+    enemies: Tuple[str, ...]
+    games: int
+    wins: int
+    turns: int # total turns over all games, to the win or to the player's death
+
+    def __init__(self, player_class: str, enemies: Tuple[str, ...], games: int = 0, wins: int = 0, turns: int = 0):
+        self.player_class = player_class
+        self.enemies = enemies
+        self.games = games
+        self.wins = wins
+        self.turns = turns
+
+    @property
+    def win_rate(self) -> float:
+        return self.wins / self.games if self.games else 0.0
+
+    @property
+    def mean_turns(self) -> float:
+        return self.turns / self.games if self.games else 0.0
+
+    def merge(self, other: "MatchupResult") -> None:
+        self.games += other.games
+        self.wins += other.wins
+        self.turns += other.turns
+
+def matchups() -> List[Tuple[str, Tuple[str, ...]]]:
+    # every class against every enemy mix a wave can hold
+    return [(player_class, enemies)
+            for player_class in PLAYER_CLASSES
+            for size in range(1, MAX_WAVE_SIZE + 1)
+            for enemies in combinations_with_replacement(ENEMY_CLASSES, size)]
+
+def task_seed(master_seed: int, player_class: str, enemies: Tuple[str, ...], chunk: int) -> int:
+    # derived like every other seed in the game, so each task gets an independent, reproducible stream
+    return derive_seed(master_seed, "tournament", player_class, enemies, chunk)
+
+def fight(player_class: str, enemies: Tuple[str, ...], seed: int, policy_seed: int, max_turns: int) -> Tuple[bool, int]:
+    tracker = Tracker(seed, verbose=False)
+    player = PLAYER_CLASSES[player_class](player_class, tracker)
+    player.policy = RandomPolicy(policy_seed)
+    spawn_encounter(tracker, [ENEMY_CLASSES[name] for name in enemies])
+    try:
+        while tracker.turn < max_turns:
+            play_round(tracker)
+            if not tracker.active_creatures:
+                return True, tracker.turn + 1
+            next_turn(tracker)
+    except GameOver:
+        return False, tracker.turn + 1
+    return False, tracker.turn
+
+def run_task(task: Tuple[str, Tuple[str, ...], int, int, int]) -> MatchupResult:
+    player_class, enemies, games, seed, max_turns = task
+    result = MatchupResult(player_class, enemies)
+    for i in range(games):
+        won, turns = fight(player_class, enemies, derive_seed(seed, "game", i), derive_seed(seed, "policy", i), max_turns)
+        result.games += 1
+        result.wins += won
+        result.turns += turns
+    return result
+
+def run_tournament(games: int, seed: int = 0, workers: Optional[int] = None, max_turns: int = 1000) -> List[MatchupResult]:
+    tasks = []
+    for player_class, enemies in matchups():
+        for chunk, start in enumerate(range(0, games, CHUNK_SIZE)):
+            tasks.append((player_class, enemies, min(CHUNK_SIZE, games - start), task_seed(seed, player_class, enemies, chunk), max_turns))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return merge_results(map(run_task, tasks))
+    with ProcessPoolExecutor(workers) as executor:
+        return merge_results(executor.map(run_task, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+
+def merge_results(partials: Iterable[MatchupResult]) -> List[MatchupResult]:
+    # map yields in task order, so merging is deterministic whatever the number of workers
+    results: Dict[Tuple[str, Tuple[str, ...]], MatchupResult] = {}
+    for partial in partials:
+        key = (partial.player_class, partial.enemies)
+        if key not in results:
+            results[key] = partial
+        else:
+            results[key].merge(partial)
+    return list(results.values())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run every player class against every enemy mix.")
+    parser.add_argument("games", type=int, help="games per matchup")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes, defaults to the number of cores")
+    args = parser.parse_args()
+    results = run_tournament(args.games, args.seed, args.workers)
+    width = max(len(" + ".join(result.enemies)) for result in results)
+    for result in results:
+        print(f"{result.player_class:8} vs {' + '.join(result.enemies):{width}} win rate {result.win_rate:6.1%}  mean turns {result.mean_turns:5.1f}")
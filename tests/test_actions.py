@@ -0,0 +1,41 @@
+import pytest
+
+from src.abstract_classes import PoweredAction, Tracker
+from src.actions import BasicAttack, LightningBolt, SapMorale
+from src.enemies import DarkMage
+from src.player_classes import Mage
+
+class Fizzle(PoweredAction): # no base_power
+    name = "Fizzle"
+
+    def describe(self):
+        return self.name
+
+def test_actions_shared_by_every_creature_of_a_class():
+    tracker = Tracker(1, verbose=False)
+    Mage("Mage", tracker) # for them to act on
+    first, second = DarkMage(tracker), DarkMage(tracker)
+    assert first.actions is second.actions is DarkMage.actions
+    first.choose_action()
+    assert first.action_sampler is second.action_sampler is DarkMage.action_sampler
+    assert Mage("Mage", tracker).actions[0] is Mage("Mage", tracker).actions[0]
+
+def test_changed_weights_copied_to_the_creature():
+    tracker = Tracker(1, verbose=False)
+    Mage("Mage", tracker) # for them to act on
+    first, second = DarkMage(tracker), DarkMage(tracker)
+    second.choose_action()
+    bolt = next(action for action in DarkMage.actions if isinstance(action, LightningBolt))
+    first.set_action_weight(bolt, 0)
+    assert first.actions[bolt] == 0 and DarkMage.actions[bolt] == 5 and second.actions is DarkMage.actions
+    assert first.action_sampler is not DarkMage.action_sampler
+    assert all(first.action_sampler.sample(first.rng) is not bolt for i in range(200))
+    first.set_action_weights(list(DarkMage.actions.values()))
+    assert first.actions is DarkMage.actions and first.action_sampler is DarkMage.action_sampler
+
+def test_only_damage_and_healing_have_power():
+    with pytest.raises(TypeError):
+        Fizzle()
+    assert not hasattr(SapMorale(), "base_power")
+    mage = Mage("Mage", Tracker(1, verbose=False))
+    assert BasicAttack("Spark").base_power(mage) == mage.damage_base
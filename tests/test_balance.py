@@ -0,0 +1,33 @@
+import pytest
+
+from src.balance import ABOVE, BELOW, INSIDE, UNDECIDED, Candidate, SequentialTest
+
+def test_wilson_interval():
+    test = SequentialTest(0.4, 0.6, 0.05, 1)
+    low, high = test.interval(50, 100)
+    assert low == pytest.approx(0.4038, abs=1e-4) and high == pytest.approx(0.5962, abs=1e-4)
+    assert test.interval(0, 0) == (0.0, 1.0)
+    # each of more looks is made at a smaller alpha, so the interval is wider
+    assert SequentialTest(0.4, 0.6, 0.05, 10).interval(50, 100)[0] < low
+
+def test_stops_once_the_interval_is_clear_of_an_edge():
+    test = SequentialTest(0.4, 0.6, 0.05, 20)
+    assert test.verdict(500, 1000) == INSIDE
+    assert test.verdict(200, 1000) == BELOW
+    assert test.verdict(800, 1000) == ABOVE
+    assert test.verdict(5, 10) is None # too few games to tell
+    assert test.verdict(395, 1000) is None # straddling the low edge
+
+def test_candidate_counts_batches_in_order_and_gives_up_at_the_last():
+    test = SequentialTest(0.4, 0.6, 0.05, 3)
+    candidate = Candidate(())
+    candidate.finish(1, 40, 100, test, 3) # back before batch 0, so held until it is
+    assert candidate.counted == 0 and candidate.verdict is None
+    candidate.finish(0, 45, 100, test, 3)
+    assert candidate.counted == 2 and candidate.win_rate == 0.425 and candidate.verdict is None
+    candidate.finish(2, 40, 100, test, 3)
+    assert candidate.counted == 3 and candidate.verdict == UNDECIDED
+    decided = Candidate(())
+    decided.finish(0, 5, 100, test, 3)
+    decided.finish(1, 50, 100, test, 3)
+    assert decided.verdict == BELOW and decided.counted == 1 # batches after a verdict are not counted
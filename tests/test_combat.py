@@ -0,0 +1,34 @@
+from src.abstract_classes import Tracker
+from src.combat import hit_chance
+from src.enemies import Goblin
+from src.events import AttackHit, AttackMissed, EventBus, Sink
+from src.player_classes import Rogue
+
+class AttackLog(Sink):
+    def __init__(self):
+        self.attacks = []
+
+    def handle(self, event):
+        if isinstance(event, AttackHit):
+            self.attacks.append((True, event.critical, event.damage))
+        elif isinstance(event, AttackMissed):
+            self.attacks.append((False, False, 0))
+
+def test_hit_chance_floor():
+    assert hit_chance(0, 10) == 0.05
+    assert hit_chance(-3, 10) == 0.05
+    assert hit_chance(10, 10) == 0.5
+
+def test_make_attack_hits_at_hit_chance():
+    log = AttackLog()
+    tracker = Tracker(3, events=EventBus(log))
+    player = Rogue("Rogue", tracker)
+    target = Goblin(tracker)
+    target.hp_current = float("inf")
+    count = 4000
+    for i in range(count):
+        player.make_attack(player.actions[0], target)
+    hits = sum(hit for hit, critical, damage in log.attacks)
+    expected = hit_chance(player.attack, target.defence) * count
+    assert abs(hits - expected) < 4 * (expected * (1 - expected / count)) ** 0.5
+    assert all(damage > 0 for hit, critical, damage in log.attacks if hit)
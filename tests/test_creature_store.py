@@ -0,0 +1,66 @@
+from src.abstract_classes import Tracker
+from src.actions import FireBall
+from src.creature_store import ALLIES, ENEMIES, CreatureStore
+from src.enemies import Goblin
+from src.events import AttackHit, AttackMissed, Died, EventBus, Sink
+from src.player_classes import Mage
+
+class Witness(Sink): # notes each attack and death, and how many enemies were in play when it happened
+    def __init__(self, tracker: Tracker):
+        self.tracker = tracker
+        self.seen = []
+
+    def handle(self, event):
+        if isinstance(event, (AttackHit, AttackMissed, Died)):
+            self.seen.append((type(event).__name__, getattr(event, "target", None) or event.creature,
+                              len(self.tracker.active_creatures)))
+
+def test_removing_from_the_middle_keeps_other_handles():
+    tracker = Tracker(1, verbose=False)
+    store = CreatureStore()
+    goblins = [Goblin(tracker) for i in range(5)]
+    handles = [store.add(goblin) for goblin in goblins]
+    middle, last = goblins[2], goblins[4]
+    store.remove(middle)
+    assert store.get(handles[2]) is None and middle not in store and middle.handle is None
+    assert store.get(handles[4]) is last and last.store_index == 2 # swapped into the gap
+    assert [creature.store_index for creature in store] == list(range(4))
+    assert all(store.get(handle) is goblin for handle, goblin in zip(handles, goblins) if goblin is not middle)
+    replacement = Goblin(tracker)
+    assert store.add(replacement)[0] == handles[2][0] # reuses the slot under a new generation
+    assert store.get(handles[2]) is None and store.get(replacement.handle) is replacement
+    assert len(store.faction(ENEMIES)) == 5 and store.faction(ALLIES) == []
+
+def test_fireball_hits_each_target_once_and_deaths_wait_for_the_action():
+    tracker = Tracker(5)
+    witness = Witness(tracker)
+    tracker.events = EventBus(witness)
+    player = Mage("Mage", tracker)
+    player.modifiers["attack"] = 1000 # never misses
+    goblins = [Goblin(tracker) for i in range(6)]
+    for i, goblin in enumerate(goblins):
+        goblin.name = f"Goblin {i}"
+        goblin.hp_current = 1 if i % 2 == 0 else 1000 # every other one dies to the blast
+        tracker.add_active_creature(goblin)
+    fireball = next(action for action in player.actions if isinstance(action, FireBall))
+    player.do_action(fireball, tracker.active_creatures, False)
+    hits = [(target, in_play) for kind, target, in_play in witness.seen if kind == "AttackHit"]
+    deaths = [target for kind, target, in_play in witness.seen if kind == "Died"]
+    assert sorted(target for target, in_play in hits) == [goblin.name for goblin in goblins]
+    assert all(in_play == 6 for target, in_play in hits) # nobody left the store mid-blast
+    assert witness.seen[:6] == [("AttackHit", target, 6) for target, in_play in hits] # every hit before any death
+    assert sorted(deaths) == ["Goblin 0", "Goblin 2", "Goblin 4"]
+    assert sorted(creature.name for creature in tracker.active_creatures) == ["Goblin 1", "Goblin 3", "Goblin 5"]
+    assert not tracker.creatures.dying
+
+def test_a_killed_creature_stays_in_play_until_deaths_are_processed():
+    tracker = Tracker(5, verbose=False)
+    player = Mage("Mage", tracker)
+    player.modifiers["attack"] = 1000
+    goblin = Goblin(tracker)
+    goblin.hp_current = 1
+    tracker.add_active_creature(goblin)
+    player.make_attack(player.actions[0], goblin)
+    assert goblin.dying and goblin in tracker.creatures and player.xp == 0
+    tracker.creatures.process_deaths()
+    assert goblin not in tracker.creatures and tracker.active_creatures == [] and player.xp == goblin.xp
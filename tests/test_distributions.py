@@ -0,0 +1,77 @@
+import math
+
+from src.abstract_classes import Attack, Tracker
+from src.actions import BasicAttack, PowerAttack, SneakAttack
+from src.distributions import DamageDistribution, attack_distribution, current_distribution, with_effects
+from src.enemies import DarkMage, Goblin, Shaman
+from src.player_classes import Mage, Rogue, Warrior
+from src.policies import RandomPolicy
+
+def setup(player_class=Rogue, enemy_class=Goblin, seed=3):
+    tracker = Tracker(seed, verbose=False)
+    player = player_class("Tester", tracker)
+    player.policy = RandomPolicy(seed)
+    enemy = enemy_class(tracker)
+    tracker.add_active_creature(enemy)
+    return tracker, player, enemy
+
+def sampled_mean(distribution: DamageDistribution, attack, target, draws: int = 20000) -> None:
+    # plays the attack the way the game does, and checks the damage it deals against the distribution
+    total = 0
+    for i in range(draws):
+        target.hp_current = 10**9
+        attack()
+        total += 10**9 - target.hp_current
+    variance = sum(damage * damage * p for damage, p in distribution.items()) - distribution.mean ** 2
+    assert abs(total / draws - distribution.mean) < 4 * math.sqrt(variance / draws)
+
+def test_distributions_sum_to_one():
+    for player_class in (Warrior, Rogue, Mage):
+        for enemy_class in (Goblin, DarkMage, Shaman):
+            tracker, player, enemy = setup(player_class, enemy_class)
+            matchups = [(player, action, enemy) for action in player.actions]
+            matchups += [(enemy, action, player) for action in enemy.actions]
+            for attacker, action, defender in matchups:
+                if isinstance(action, Attack):
+                    distribution = attack_distribution(attacker, action, defender)
+                    assert math.isclose(sum(distribution.probabilities), 1.0)
+                    assert all(p > 0 for p in distribution.probabilities)
+
+def test_mean_matches_played_attacks():
+    tracker, player, goblin = setup()
+    basic = BasicAttack()
+    sampled_mean(attack_distribution(player, basic, goblin), lambda: player.make_attack(basic, goblin), goblin)
+    power = PowerAttack() # its debuff on the target lands before it strikes
+    def power_attack():
+        player.choose_target(power)
+        tracker.effects.dispel(goblin)
+    sampled_mean(attack_distribution(player, power, goblin), power_attack, goblin)
+
+def test_buffs_land_first_for_players_only():
+    tracker, player, goblin = setup()
+    sneak = SneakAttack()
+    with with_effects(player, sneak.buff_effects):
+        buffed = current_distribution(player, sneak, goblin)
+    assert attack_distribution(player, sneak, goblin) is buffed is not current_distribution(player, sneak, goblin)
+    def player_sneak(): # buffs itself, then strikes
+        player.choose_target(sneak)
+        tracker.effects.dispel(player)
+    sampled_mean(attack_distribution(player, sneak, goblin), player_sneak, goblin)
+    assert attack_distribution(goblin, sneak, player) is current_distribution(goblin, sneak, player)
+    def goblin_sneak(): # strikes, then buffs itself
+        goblin.choose_target(sneak)
+        tracker.effects.dispel(goblin)
+    sampled_mean(attack_distribution(goblin, sneak, player), goblin_sneak, player)
+
+def test_kill_chance_at_hp_boundaries():
+    distribution = DamageDistribution({0: 0.5, 3: 0.3, 5: 0.2}, 0.5, 0.0)
+    assert distribution.kill_chance(0) == 1.0
+    assert distribution.kill_chance(-4) == 1.0
+    assert math.isclose(distribution.kill_chance(2.5), 0.5) # hp is rounded up, as damage is whole
+    assert math.isclose(distribution.kill_chance(3), 0.5)
+    assert math.isclose(distribution.kill_chance(3.01), 0.2)
+    assert math.isclose(distribution.kill_chance(5), 0.2)
+    assert distribution.kill_chance(6) == 0.0
+    assert math.isclose(distribution.kill_chance(5, attacks=2), 0.2 * 0.5 * 2 + 0.3 * 0.3 + 0.3 * 0.2 * 2 + 0.2 * 0.2)
+    assert math.isclose(distribution.kill_chance(6, attacks=2), 0.3 * 0.3 + 0.3 * 0.2 * 2 + 0.2 * 0.2)
+    assert distribution.kill_chance(11, attacks=2) == 0.0
@@ -0,0 +1,49 @@
+from src.abstract_classes import Tracker
+from src.actions import DefensiveStrike
+from src.effects import REFRESH, STACK
+from src.enemies import Goblin
+from src.game import next_turn
+from src.player_classes import Warrior
+
+class LongGuard(DefensiveStrike): # lasts three turns, and restarts rather than adding up when used again
+    duration = 3
+    stacking = REFRESH
+
+def test_modifiers_belong_to_each_creature():
+    tracker = Tracker(1, verbose=False)
+    first, second = Goblin(tracker), Goblin(tracker)
+    defence = second.defence
+    tracker.effects.apply(first, "defence", 5, 1, "test")
+    assert first.modifiers["defence"] == 5 and first.defence == defence + 5
+    assert second.modifiers["defence"] == 0 and second.defence == defence
+    assert Goblin(tracker).modifiers["defence"] == 0
+    assert first.modifiers is not second.modifiers
+
+def test_effects_expire_at_the_start_of_their_turn():
+    tracker = Tracker(1, verbose=False)
+    player = Warrior("Warrior", tracker)
+    tracker.add_active_creature(Goblin(tracker)) # so next_turn does not start a new encounter
+    defence = player.defence
+    player.buff_target(LongGuard(), player) # on turn 0, so it wears off as turn 3 starts
+    for turn in (1, 2):
+        next_turn(tracker)
+        assert tracker.turn == turn and player.defence == defence + 3
+    next_turn(tracker)
+    assert player.defence == defence and not player.effects and len(tracker.effects) == 0
+
+def test_refresh_restarts_and_stack_adds():
+    tracker = Tracker(1, verbose=False)
+    goblin = Goblin(tracker)
+    effects = tracker.effects
+    effects.apply(goblin, "attack", -2, 2, "Sap", REFRESH)
+    effects.apply(goblin, "attack", -2, 4, "Sap", REFRESH)
+    assert goblin.modifiers["attack"] == -2 and len(effects) == 1
+    effects.apply(goblin, "attack", 1, 2, "Rally", STACK)
+    effects.apply(goblin, "attack", 1, 3, "Rally", STACK)
+    assert goblin.modifiers["attack"] == 0 and len(effects) == 3
+    effects.expire(2) # the first Sap was replaced, so only a Rally ends here
+    assert goblin.modifiers["attack"] == -1
+    effects.expire(3)
+    assert goblin.modifiers["attack"] == -2
+    effects.expire(4)
+    assert goblin.modifiers["attack"] == 0 and not goblin.effects
@@ -0,0 +1,35 @@
+import random
+
+from src.encounters import ENEMY_CHANCES, MAX_WAVE_SIZE, roll_wave
+from src.env import ACTION_COUNT, MAX_ENEMIES, OBSERVATION_SIZE, ENEMY_FEATURES, DungeonEnv, action_mask, encode
+from src.game import ENEMY_CLASSES, spawn_encounter
+from src.player_classes import Warrior
+from src.sampling import AliasTable
+from src.tournament import matchups
+
+def test_every_enemy_of_the_largest_wave_is_observed_and_targetable():
+    env = DungeonEnv(Warrior, seed=1)
+    observation, info = env.reset()
+    assert len(observation) == OBSERVATION_SIZE and len(info["action_mask"]) == ACTION_COUNT
+    tracker = env.tracker
+    for creature in list(tracker.active_creatures):
+        tracker.remove_active_creature(creature)
+    spawn_encounter(tracker, [ENEMY_CLASSES["Goblin"]] * MAX_WAVE_SIZE)
+    observation, mask = [], []
+    encode(tracker, observation)
+    action_mask(tracker, mask)
+    assert observation[-ENEMY_FEATURES] == 1 # the last enemy is in view
+    assert mask[:MAX_ENEMIES] == [1] * MAX_WAVE_SIZE # and Slash can hit every one of them
+    env.step(MAX_WAVE_SIZE - 1)
+
+def test_tournament_covers_every_wave():
+    rng = random.Random(5)
+    table = AliasTable(ENEMY_CHANCES)
+    order = list(ENEMY_CLASSES.values())
+    mixes = {enemies for player_class, enemies in matchups()}
+    sizes = set()
+    for i in range(2000):
+        wave = sorted(roll_wave(rng, table, rng.uniform(10, 400)), key=order.index)
+        assert tuple(enemy.__name__ for enemy in wave) in mixes
+        sizes.add(len(wave))
+    assert max(sizes) == MAX_WAVE_SIZE
@@ -0,0 +1,56 @@
+import io
+import json
+
+from src.abstract_classes import GameOver, Tracker
+from src.events import (AttackHit, AttackMissed, EncounterStarted, Event, EventBus, JsonLinesSink, NullSink, RingBufferSink,
+                        Sink, TurnEnded)
+from src.game import new_encounter, play_turn
+from src.player_classes import Warrior
+from src.policies import RandomPolicy
+
+class Recorder(Sink):
+    def __init__(self):
+        self.events = []
+
+    def handle(self, event):
+        self.events.append(event)
+
+def play(tracker: Tracker, turns: int) -> None:
+    Warrior("Warrior", tracker).policy = RandomPolicy(1)
+    new_encounter(tracker)
+    try:
+        for i in range(turns):
+            play_turn(tracker)
+    except GameOver:
+        pass
+
+def test_no_events_built_without_a_sink_that_wants_them(monkeypatch):
+    def refuse(self, *args, **kwargs):
+        raise AssertionError(f"{type(self).__name__} built with no sink to receive it")
+    for event_class in Event.__subclasses__():
+        monkeypatch.setattr(event_class, "__init__", refuse)
+    for bus in (EventBus(), EventBus(NullSink())):
+        assert not bus.active
+        play(Tracker(2, events=bus), 50)
+
+def test_sinks_get_every_event_in_order():
+    first, second = Recorder(), RingBufferSink(100000)
+    stream = io.StringIO()
+    bus = EventBus(first, second, JsonLinesSink(stream, buffer_size=7))
+    assert bus.active
+    tracker = Tracker(2, events=bus)
+    play(tracker, 50)
+    bus.flush()
+    events = first.events
+    assert events == list(second.events)
+    assert [json.loads(line) for line in stream.getvalue().splitlines()] == [event.as_dict() for event in events]
+    assert isinstance(events[0], EncounterStarted)
+    turns = [event.turn for event in events if isinstance(event, TurnEnded)]
+    assert turns == list(range(1, len(turns) + 1)) and turns
+    assert any(isinstance(event, (AttackHit, AttackMissed)) for event in events)
+
+def test_unsubscribing_the_last_sink_deactivates_the_bus():
+    sink = Recorder()
+    bus = EventBus(sink)
+    bus.unsubscribe(sink)
+    assert not bus.active and bus.sinks == []
@@ -0,0 +1,48 @@
+from src.abstract_classes import Tracker
+from src.enemies import Goblin
+from src.initiative import BASE_SPEED, InitiativeScheduler
+
+def goblins(*dexterities: int):
+    tracker = Tracker(1, verbose=False)
+    creatures = []
+    for i, dexterity in enumerate(dexterities):
+        goblin = Goblin(tracker)
+        goblin.name = f"Goblin {i}"
+        goblin.dexterity = dexterity
+        tracker.add_active_creature(goblin)
+        creatures.append(goblin)
+    return tracker, creatures
+
+def names(creatures) -> list:
+    return [creature.name for creature in creatures]
+
+def test_quicker_creatures_act_first():
+    tracker, creatures = goblins(8, 12, 10, 3)
+    scheduler = InitiativeScheduler(creatures)
+    assert names(scheduler.due(1.0)) == ["Goblin 1", "Goblin 2", "Goblin 0", "Goblin 3"]
+
+def test_a_creature_twice_as_quick_acts_twice_as_often():
+    tracker, creatures = goblins(BASE_SPEED, 2 * BASE_SPEED, BASE_SPEED // 2)
+    scheduler = InitiativeScheduler(creatures)
+    acted = names(scheduler.due(4.0))
+    assert [acted.count(creature.name) for creature in creatures] == [4, 8, 2]
+    assert acted[:3] == ["Goblin 1", "Goblin 0", "Goblin 2"]
+    assert scheduler.now == 3.5
+
+def test_ties_go_to_the_creature_scheduled_first():
+    for order in ([0, 1, 2], [2, 0, 1]):
+        tracker, creatures = goblins(BASE_SPEED, BASE_SPEED, BASE_SPEED)
+        scheduler = InitiativeScheduler(creatures[i] for i in order)
+        expected = [f"Goblin {i}" for i in order]
+        assert names(scheduler.due(3.0)) == expected * 3
+
+def test_a_creature_removed_mid_round_never_acts():
+    tracker, creatures = goblins(12, 10, 11, 5)
+    scheduler = InitiativeScheduler(creatures)
+    acted = []
+    for creature in scheduler.due(1.0):
+        acted.append(creature.name)
+        if creature is creatures[0]: # first to act, and takes out one yet to act this round
+            tracker.creatures.remove(creatures[2])
+    assert acted == ["Goblin 0", "Goblin 1", "Goblin 3"]
+    assert "Goblin 2" not in names(scheduler.due(5.0))
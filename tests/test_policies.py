@@ -0,0 +1,39 @@
+import builtins
+import sys
+
+from src.abstract_classes import ConsolePolicy, Policy, Tracker
+from src.enemies import Goblin
+from src.player_classes import Mage
+
+class Stubborn(Policy): # asks for Lightning Bolt far more times than recursion could survive, then settles for Spark
+    def __init__(self, refusals: int):
+        self.refusals = refusals
+        self.asked = 0
+
+    def choose_action(self, player):
+        self.asked += 1
+        return player.actions[1] if self.asked <= self.refusals else player.actions[0]
+
+    def choose_target(self, player, action, targets):
+        return targets[0]
+
+    def choose_level_up(self, player):
+        return "constitution"
+
+def test_console_target_prompt_asks_again_after_bad_input(monkeypatch, capsys):
+    tracker = Tracker(1, verbose=False)
+    player = Mage("Mage", tracker)
+    goblins = [Goblin(tracker), Goblin(tracker)]
+    answers = iter(["second", "", "2"])
+    monkeypatch.setattr(builtins, "input", lambda prompt: next(answers))
+    assert ConsolePolicy().choose_target(player, player.actions[0], goblins) is goblins[1]
+    assert capsys.readouterr().out.count("Please enter a number:") == 2
+
+def test_unaffordable_spell_is_asked_again_without_recursing():
+    tracker = Tracker(1, verbose=False)
+    player = Mage("Mage", tracker)
+    tracker.add_active_creature(Goblin(tracker))
+    player.mp_current = 0
+    player.policy = Stubborn(sys.getrecursionlimit() + 10)
+    player.choose_action()
+    assert player.policy.asked == player.policy.refusals + 1 and player.mp_current == 0
@@ -0,0 +1,41 @@
+import time
+
+from src.abstract_classes import GameOver, Tracker
+from src.actions import BasicAttack
+from src.game import new_encounter, play_turn
+from src.player_classes import Warrior
+from src.policies import RandomPolicy
+from src.profiler import BUCKETS, Histogram, Profiler
+
+def test_histogram_buckets_by_bit_length():
+    histogram = Histogram()
+    for duration in (0, 1, 2, 3, 1023, 1024, 2 ** 63, 2 ** 80):
+        histogram.add(duration)
+    assert histogram.count == 8 and histogram.total == 2053 + 2 ** 63 + 2 ** 80
+    assert histogram.buckets[:3] == [1, 1, 2] and histogram.buckets[10] == 1 and histogram.buckets[11] == 1
+    assert histogram.buckets[BUCKETS - 1] == 2 # the longest clamp into the last bucket
+    assert histogram.percentile(0.5) == 3 and histogram.percentile(1.0) == 2 ** 63 - 1
+    assert histogram.as_dict()["buckets"] == histogram.buckets
+
+def test_record_action_counts_into_the_action_and_do_action():
+    profiler = Profiler(enabled=True)
+    now = time.perf_counter_ns()
+    profiler.record_action(BasicAttack("Slash"), now - 5000)
+    profiler.record_action(BasicAttack("Stab"), now - 7000)
+    attack = profiler.actions["BasicAttack"]
+    assert attack.count == 2 and attack.total >= 12000
+    assert profiler.phases["do_action"].count == 2 and profiler.phases["do_action"].total >= attack.total
+
+def test_every_action_in_a_game_is_counted():
+    tracker = Tracker(4, verbose=False)
+    tracker.profiler.enabled = True
+    Warrior("Warrior", tracker).policy = RandomPolicy(4)
+    new_encounter(tracker)
+    try:
+        for i in range(30):
+            play_turn(tracker)
+    except GameOver:
+        pass
+    profiler = tracker.profiler
+    assert sum(histogram.count for histogram in profiler.actions.values()) == profiler.phases["do_action"].count > 0
+    assert profiler.phases["turn"].count == tracker.turn
@@ -0,0 +1,59 @@
+import io
+import re
+
+from src.abstract_classes import GameOver, Tracker
+from src.events import EventBus, TextSink
+from src.game import new_encounter, play_turn
+from src.player_classes import Rogue
+from src.policies import RandomPolicy
+from src.renderer import TerminalRenderer
+
+def play(sink, seed: int = 6) -> Tracker:
+    tracker = Tracker(seed, events=EventBus(sink))
+    Rogue("Rogue", tracker).policy = RandomPolicy(seed)
+    new_encounter(tracker)
+    try:
+        while tracker.turn < 2000:
+            play_turn(tracker)
+    except GameOver:
+        pass
+    return tracker
+
+def rendered(**options) -> str:
+    stream = io.StringIO()
+    renderer = TerminalRenderer(stream, **options)
+    tracker = play(renderer)
+    renderer.flush()
+    return stream.getvalue(), tracker
+
+def narration() -> str:
+    stream = io.StringIO()
+    play(TextSink(stream))
+    return stream.getvalue()
+
+def test_every_turn_drawn_as_text_sink_narrates_it():
+    text, tracker = rendered()
+    assert text == narration()
+    assert text.rstrip().endswith("You are dead! Game over") and tracker.encounters > 1
+
+def test_every_nth_turn_keeps_encounter_starts_and_the_death():
+    full = narration().splitlines()
+    text, tracker = rendered(every=5)
+    lines = text.splitlines()
+    assert len(lines) < len(full) and set(lines) <= set(full)
+    assert sum(line.startswith("As you advance deeper") for line in lines) == tracker.encounters
+    assert lines[-1] == "You are dead! Game over"
+
+def test_summaries_give_one_line_per_encounter():
+    text, tracker = rendered(summaries=True)
+    lines = text.splitlines()
+    assert len(lines) == tracker.encounters + 1
+    assert all(re.fullmatch(rf"Encounter {i + 1}: \d+ defeated in \d+ turns, \d+ xp gained", line) for i, line in enumerate(lines[:-1]))
+    assert lines[-1] == "You are dead! Game over"
+
+def test_panel_is_redrawn_in_place():
+    text, tracker = rendered(panel=True)
+    assert "\x1b[" in text
+    assert "You are dead! Game over" in text
+    plain = re.sub(r"\x1b\[\d*[A-Za-z]", "\n", text)
+    assert tracker.player.name in plain and "Rogue has" in plain
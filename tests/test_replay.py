@@ -0,0 +1,45 @@
+import io
+
+from src.abstract_classes import GameOver, Tracker
+from src.binio import read_varint, varint
+from src.game import new_encounter, play_turn
+from src.player_classes import Rogue
+from src.policies import RandomPolicy
+from src.replay import TARGET, Recording, Replayer, ReplayPolicy, record_game
+from src.snapshot import Snapshot
+
+def straight_states(seed: int) -> dict: # the packed state after every turn of a game played without recording it
+    tracker = Tracker(seed, verbose=False)
+    Rogue("Rogue", tracker).policy = RandomPolicy(seed)
+    new_encounter(tracker)
+    states = {0: Snapshot.capture(tracker).to_bytes()}
+    try:
+        while True:
+            play_turn(tracker)
+            states[tracker.turn] = Snapshot.capture(tracker).to_bytes()
+    except GameOver:
+        pass
+    return states
+
+def test_seek_reaches_the_state_of_the_game_played_straight():
+    states = straight_states(3)
+    recording = record_game(Rogue, RandomPolicy(3), 3, snapshot_every=10)
+    assert len(recording.snapshots) > 2
+    stream = io.BytesIO()
+    recording.save(stream)
+    replayer = Replayer(Recording.load(io.BytesIO(stream.getvalue())))
+    last = max(states) - 1 # the turn that killed the player is never captured whole
+    for turn in (last, 0, 7, 10, 19, 20, 21, last // 2):
+        assert Snapshot.capture(replayer.seek(turn)).to_bytes() == states[turn]
+
+def test_choices_past_a_byte_survive_the_round_trip():
+    for value in (0, 1, 127, 128, 300, 16383, 16384, 2 ** 40):
+        assert read_varint(varint(value) + b"\x05", 0) == (value, len(varint(value)))
+    recording = Recording("Rogue", "Rogue", 0)
+    recording.add(TARGET, 300)
+    recording.add(TARGET, 2)
+    assert recording.decision_count() == 2
+    targets = list(range(400))
+    policy = ReplayPolicy(recording.decisions)
+    assert policy.choose_target(None, None, targets) == 300
+    assert policy.choose_target(None, None, targets) == 2
@@ -0,0 +1,75 @@
+from src.events import ActionUsed, AttackHit, AttackMissed, Died, EncounterStarted, Healed, TurnEnded, XpGained
+from src.results import CLEARED, DIED, UNFINISHED, EncounterStats, GameStats, ResultsStore
+from src.simulator import GameResult
+
+def scripted(*events) -> GameStats:
+    stats = GameStats("Warrior")
+    for event in events:
+        stats.handle(event)
+    return stats
+
+def test_game_stats_tally_each_encounter():
+    stats = scripted(
+        AttackHit("Warrior", "Goblin", "Slash", 5, False), # before any encounter, so not counted
+        EncounterStarted(1),
+        ActionUsed("Warrior", "Slash"), AttackHit("Warrior", "Goblin", "Slash", 7, False),
+        ActionUsed("Goblin", "Stab"), AttackMissed("Goblin", "Warrior", "Stab"),
+        TurnEnded(1),
+        ActionUsed("Warrior", "Slash"), AttackHit("Warrior", "Goblin", "Slash", 9, True),
+        Died("Goblin", "Warrior", False), XpGained("Warrior", 20),
+        EncounterStarted(2), # in the upkeep of the turn that cleared the first
+        TurnEnded(2),
+        ActionUsed("Shaman", "Heal"), Healed("Shaman", "Shaman", "Heal", 4.5),
+        ActionUsed("Shaman", "Zap"), AttackHit("Shaman", "Warrior", "Zap", 30, False),
+        Died("Warrior", "Shaman", True),
+    )
+    first, second = stats.finish()
+    assert (first.encounter, first.start, first.turns, first.outcome) == (1, 0, 2, CLEARED)
+    assert (first.defeated, first.xp, first.damage_dealt, first.damage_taken) == (1, 20, 16, 0)
+    slash = first.actions[("player", "Warrior", "Slash")]
+    assert (slash.uses, slash.hits, slash.misses, slash.damage) == (2, 2, 0, 16)
+    stab = first.actions[("enemy", "Goblin", "Stab")]
+    assert (stab.uses, stab.hits, stab.misses, stab.damage) == (1, 0, 1, 0)
+    assert (second.encounter, second.start, second.turns, second.outcome) == (2, 2, 0, DIED)
+    assert (second.defeated, second.damage_dealt, second.damage_taken) == (0, 0, 30)
+    assert second.actions[("enemy", "Shaman", "Heal")].healing == 4.5
+
+def test_game_stats_marks_the_last_encounter_unfinished():
+    stats = scripted(EncounterStarted(1), TurnEnded(1), Died("Goblin", "Warrior", False),
+                     EncounterStarted(2), TurnEnded(2), TurnEnded(3), TurnEnded(4))
+    first, second = stats.finish()
+    assert first.outcome == CLEARED
+    assert (second.start, second.turns, second.outcome) == (2, 2, UNFINISHED)
+    assert stats.finish()[-1].outcome == UNFINISHED # finishing again leaves it as it was
+    assert GameStats("Warrior").finish() == []
+
+def result(player_class: str, seed: int, cause_of_death=None) -> GameResult:
+    encounter = EncounterStats(1, 0)
+    encounter.end(DIED if cause_of_death else UNFINISHED, 4)
+    stats = GameStats(player_class)
+    stats.current = encounter
+    stats.tally(player_class, "Slash").uses += 3
+    return GameResult(player_class, seed, 4, 0, 10, 1, cause_of_death, [encounter])
+
+def count(store: ResultsStore, table: str) -> int:
+    return store.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+def test_results_store_writes_in_batches():
+    store = ResultsStore(":memory:", batch_size=3)
+    run = store.start_run("Warrior", 1, 100)
+    store.add(run, 0, result("Warrior", 2**64 - 1, "Goblin"))
+    store.add(run, 1, result("Warrior", 5))
+    assert count(store, "games") == 0 # held back until the batch fills
+    store.add(run, 2, result("Warrior", 6, "Shaman"))
+    assert (count(store, "games"), count(store, "encounters"), count(store, "actions")) == (3, 3, 3)
+    assert store.games == store.encounters == store.actions == []
+    other = store.start_run("Mage", 1, 100)
+    store.add(other, 0, result("Mage", 7, "DarkMage"))
+    assert count(store, "games") == 3
+    store.flush()
+    assert count(store, "games") == 4
+    assert list(store.class_summary()) == [("Mage", 1, 1, 4.0, 0.0, 1.0), ("Warrior", 3, 2, 4.0, 0.0, 1.0)]
+    assert list(store.class_summary([run])) == [("Warrior", 3, 2, 4.0, 0.0, 1.0)]
+    assert store.connection.execute("SELECT seed FROM games WHERE game = 0 AND run = ?", (run,)).fetchone() == (str(2**64 - 1),)
+    assert list(store.action_summary([other])) == [("player", "Mage", "Slash", 3, 0, 0, 0, 0.0)]
+    store.close()
@@ -0,0 +1,19 @@
+import pytest
+
+from src.player_classes import Priest
+from src.runner import CheckpointError, RunController
+
+def test_resumed_run_ends_as_an_uninterrupted_one(tmp_path):
+    path = str(tmp_path / "run.ck")
+    whole = RunController(Priest, "greedy", 3).run()
+    first = RunController(Priest, "greedy", 3, path, every_turns=5, max_turns=whole.turns // 2)
+    first.run()
+    assert first.checkpoints >= 1
+    with pytest.raises(CheckpointError, match="seed 3"):
+        RunController(Priest, "greedy", 4, path)
+    with pytest.raises(CheckpointError, match="policy greedy"):
+        RunController(Priest, "random", 3, path)
+    second = RunController(Priest, "greedy", 3, path, every_turns=5)
+    assert second.resumed_from == whole.turns // 2
+    assert repr(second.run()) == repr(whole)
+    assert not (tmp_path / "run.ck").exists() # deleted once the player died
@@ -0,0 +1,46 @@
+import random
+from collections import Counter
+
+from src.abstract_classes import NPC, SpellcasterMixin, Tracker
+from src.actions import LightningBolt, MagicBarrier
+from src.player_classes import Warrior
+from src.sampling import AliasTable
+
+class Hexer(NPC, SpellcasterMixin): # has nothing but spells, so runs out of things to do once out of mana
+    xp = 1
+    actions = {LightningBolt(): 2, MagicBarrier(): 1}
+
+    def __init__(self, tracker: Tracker):
+        super().__init__(name="Hexer", strength=5, dexterity=5, constitution=5, intelligence=5, tracker=tracker)
+        self.mp_current = 0
+
+def chi_square(counts: Counter, weights: dict, draws: int) -> float:
+    total = sum(weights.values())
+    return sum((counts[item] - draws * weight / total) ** 2 / (draws * weight / total) for item, weight in weights.items() if weight)
+
+def test_alias_sampling_matches_random_choices():
+    weights = {"a": 1, "b": 2.5, "c": 0, "d": 7, "e": 3}
+    draws = 100000
+    table = AliasTable(weights)
+    rng = random.Random(11)
+    aliased = Counter(table.sample(rng) for i in range(draws))
+    chosen = Counter(random.Random(11).choices(list(weights), list(weights.values()), k=draws))
+    assert aliased["c"] == chosen["c"] == 0
+    # four degrees of freedom; 18.47 is the 0.1% tail
+    assert chi_square(aliased, weights, draws) < 18.47 and chi_square(chosen, weights, draws) < 18.47
+    table.set_weight("c", 7)
+    table.set_weight("d", 0)
+    moved = Counter(table.sample(rng) for i in range(draws))
+    assert moved["d"] == 0 and chi_square(moved, {**weights, "c": 7, "d": 0}, draws) < 18.47
+
+def test_every_weight_at_zero_leaves_nothing_to_do():
+    assert AliasTable({"a": 0, "b": 0}).sample(random.Random(1)) is None
+    tracker = Tracker(1, verbose=False)
+    player = Warrior("Warrior", tracker)
+    hexer, other = Hexer(tracker), Hexer(tracker)
+    hp = player.hp_current
+    for i in range(3):
+        hexer.choose_action() # drops both spells, then does nothing, without calling itself again
+    assert set(hexer.actions.values()) == {0} and player.hp_current == hp
+    assert list(Hexer.actions.values()) == [2, 1]
+    assert other.actions is Hexer.actions # the class's table is left alone
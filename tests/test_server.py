@@ -0,0 +1,57 @@
+import asyncio
+
+from src.server import PROMPT, serve
+
+async def read_prompt(reader: asyncio.StreamReader) -> str:
+    return (await asyncio.wait_for(reader.readuntil(PROMPT.encode()), 10)).decode()
+
+async def play(port: int, answers: int) -> str:
+    # picks the first class and then the first option at every prompt, for up to that many prompts
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    transcript = await read_prompt(reader)
+    writer.write(b"1\n")
+    transcript += await read_prompt(reader)
+    writer.write(b"Tester\n")
+    try:
+        for i in range(answers):
+            transcript += await read_prompt(reader)
+            writer.write(b"1\n")
+    except asyncio.IncompleteReadError as error: # the server hung up once the game ended
+        transcript += error.partial.decode()
+    writer.close()
+    return transcript
+
+def test_sessions_play_turns_until_death_or_disconnect():
+    async def scenario():
+        server = await serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            # a client that drops out mid-game, alongside one that plays on, then one that connects after
+            transcripts = await asyncio.gather(play(port, 3), play(port, 2000))
+            later = await play(port, 3)
+        return transcripts, later
+    (short, long), later = asyncio.run(scenario())
+    assert short.startswith("Welcome to the dungeon!")
+    assert "Warrior" in short and short.count("Choose an action") >= 2
+    assert "You are dead! Game over" in long or long.count("Choose an action") > 100
+    assert later.count("Choose an action") >= 2
+
+def test_session_asks_again_after_bad_input():
+    async def scenario():
+        server = await serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            await read_prompt(reader)
+            writer.write(b"warrior\n")
+            retry = await read_prompt(reader)
+            writer.write(b"9\n")
+            out_of_range = await read_prompt(reader)
+            writer.write(b"2\n")
+            name = await read_prompt(reader)
+            writer.close()
+        return retry, out_of_range, name
+    retry, out_of_range, name = asyncio.run(scenario())
+    assert retry == "Please enter a number:\n" + PROMPT
+    assert out_of_range == PROMPT
+    assert name.startswith("Please name your character")
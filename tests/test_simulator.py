@@ -0,0 +1,8 @@
+from src.simulator import PLAYER_CLASSES, Simulator
+
+def test_same_seed_same_results_whatever_the_worker_count():
+    for name in ("Rogue", "Priest"):
+        simulator = Simulator(PLAYER_CLASSES[name], seed=9)
+        here, one, two = (list(map(repr, simulator.run(24, workers))) for workers in (0, 1, 2))
+        assert here == one == two
+        assert len(set(here)) > 1 # the games differ from one another
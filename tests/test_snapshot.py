@@ -0,0 +1,50 @@
+import io
+
+import pytest
+
+from src.abstract_classes import GameOver, Tracker
+from src.binio import FormatError
+from src.game import new_encounter, play_turn
+from src.player_classes import Priest
+from src.policies import RandomPolicy
+from src.replay import Recording, ReplayError
+from src.snapshot import Snapshot, SnapshotError
+
+def played(seed: int, turns: int) -> Tracker:
+    tracker = Tracker(seed, verbose=False)
+    Priest("Priest", tracker).policy = RandomPolicy(seed)
+    new_encounter(tracker)
+    for i in range(turns):
+        play_turn(tracker)
+    return tracker
+
+def test_restored_snapshot_plays_on_the_same():
+    tracker = played(4, 5)
+    data = Snapshot.capture(tracker).to_bytes()
+    copy = Snapshot.from_bytes(data).restore()
+    # the policy is not part of the game state, so the copy's carries on from the original's
+    copy.player.policy = RandomPolicy()
+    copy.player.policy.rng.setstate(tracker.player.policy.rng.getstate())
+    assert Snapshot.capture(copy).to_bytes() == data
+    try:
+        for i in range(20):
+            play_turn(tracker)
+            play_turn(copy)
+            assert Snapshot.capture(copy).to_bytes() == Snapshot.capture(tracker).to_bytes()
+    except GameOver:
+        pass
+
+def test_truncated_data_is_a_format_error():
+    data = Snapshot.capture(played(4, 1)).to_bytes()
+    with pytest.raises(FormatError):
+        Snapshot.from_bytes(data[:-3])
+    with pytest.raises(SnapshotError):
+        Snapshot.from_bytes(b"XXXX" + data[4:])
+    stream = io.BytesIO()
+    recording = Recording("Priest", "Priest", 4)
+    recording.snapshots.append((0, 0, data))
+    recording.save(stream)
+    assert Recording.load(io.BytesIO(stream.getvalue())).snapshots == recording.snapshots
+    with pytest.raises(FormatError):
+        Recording.load(io.BytesIO(stream.getvalue()[:-1]))
+    assert issubclass(ReplayError, FormatError)
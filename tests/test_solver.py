@@ -0,0 +1,24 @@
+import pytest
+
+from src.enemies import Goblin
+from src.player_classes import Mage, Warrior
+from src.solver import AttackWeakest, EncounterSolver, SolverLimitError, SolverPolicy
+
+class Sage(Mage): # regenerates enough mana to cast any of its spells every turn
+    starting_stats = {**Mage.starting_stats, "intelligence": 100}
+
+def test_policy_must_decide():
+    with pytest.raises(TypeError):
+        SolverPolicy()
+
+def test_mana_capped_once_regeneration_pays_for_every_spell():
+    assert EncounterSolver(Mage, [Goblin], AttackWeakest(2)).initial_state()[1] == 200
+    assert EncounterSolver(Mage, [Goblin], AttackWeakest(0)).initial_state()[1] == 0
+    assert EncounterSolver(Sage, [Goblin], AttackWeakest(2)).initial_state()[1] == 10
+
+def test_solve_gives_up_past_its_limits():
+    solver = EncounterSolver(Warrior, [Goblin, Goblin])
+    with pytest.raises(SolverLimitError, match="more than 100 states"):
+        solver.solve(max_states=100)
+    with pytest.raises(SolverLimitError, match="over 0s"):
+        solver.solve(max_states=None, time_limit=0)
@@ -0,0 +1,58 @@
+import random
+
+from src.abstract_classes import MODIFIER_NAMES, Tracker
+from src.enemies import Goblin
+from src.player_classes import Mage, Warrior
+from src.stats import CACHED_STATS
+
+def fresh_stats(creature):
+    # every cached stat worked out from scratch, by clearing the cache first
+    creature.invalidate_stats()
+    return {stat: getattr(creature, stat) for stat in CACHED_STATS if hasattr(type(creature), stat)}
+
+def cached_stats(creature):
+    return {stat: getattr(creature, stat) for stat in CACHED_STATS if hasattr(type(creature), stat)}
+
+def test_level_up_clears_the_cache():
+    player = Warrior("Warrior", Tracker(1, verbose=False))
+    attack, hp_max = player.attack, player.hp_max
+    player.apply_level_up("strength")
+    assert player.attack == attack + 0.5 and player.hp_max == hp_max
+    player.apply_level_up("constitution")
+    assert player.hp_max == hp_max + 10 and player.hp_current == player.hp_max
+
+def test_effects_clear_the_stats_they_change_when_applied_and_expired():
+    tracker = Tracker(1, verbose=False)
+    goblin = Goblin(tracker)
+    defence, damage_range = goblin.defence, goblin.damage_range_base
+    tracker.effects.apply(goblin, "defence", 3, 1, "test")
+    tracker.effects.apply(goblin, "damage_base", 4, 2, "test")
+    assert goblin.defence == defence + 3 and goblin.damage_range_base == damage_range + 4 * 0.15
+    tracker.effects.expire(1)
+    assert goblin.defence == defence and goblin.damage_range_base == damage_range + 4 * 0.15
+    tracker.effects.expire(2)
+    assert goblin.damage_range_base == damage_range
+
+def test_overridden_formula_is_the_one_cached_and_cleared():
+    mage = Mage("Mage", Tracker(1, verbose=False))
+    assert mage.attack == (mage.intelligence + mage.dexterity) / 2.0
+    damage_range = mage.damage_range_base
+    mage.intelligence += 2 # Mage's attack and damage_base read intelligence, unlike the base formulas
+    assert mage.attack == (mage.intelligence + mage.dexterity) / 2.0
+    assert mage.damage_range_base == damage_range + 2 * 0.15
+    mage.modifiers["attack"] = 1
+    assert mage.attack == (mage.intelligence + mage.dexterity) / 2.0 + 1
+
+def test_cache_never_goes_stale():
+    rng = random.Random(7)
+    tracker = Tracker(1, verbose=False)
+    for creature in (Warrior("Warrior", tracker), Mage("Mage", tracker), Goblin(tracker)):
+        for i in range(300):
+            if rng.random() < 0.5:
+                attribute = rng.choice(["strength", "dexterity", "constitution", "intelligence"])
+                setattr(creature, attribute, getattr(creature, attribute) + rng.randint(-2, 2))
+            else:
+                modifier = rng.choice(MODIFIER_NAMES)
+                creature.modifiers[modifier] += rng.randint(-2, 2)
+            cached = cached_stats(creature)
+            assert cached == fresh_stats(creature)